@@ -2,7 +2,10 @@ from django.contrib import admin
 from .models import (
     LearnerProfile, Course, Chapter, Concept, Roadmap, ConceptProgress,
     Assessment, AssessmentResult, DailyTask, Notification, UserProgress, Lab,
-    StudySession, NotificationLog, MentorProfile, MentorSlot, Booking
+    StudySession, NotificationLog, MentorProfile, MentorSlot, Booking,
+    LeaderboardScore, VideoSearchCache, RoadmapGenerationJob, WarmupTask,
+    NotificationOutbox, ReminderCampaign, CertificateArtifact, DailyActivity,
+    StudySessionSummary
 )
 
 @admin.register(LearnerProfile)
@@ -41,12 +44,28 @@ class ConceptAdmin(admin.ModelAdmin):
     list_filter = ('content_type',)
     search_fields = ('title', 'chapter__title')
 
+@admin.action(description='Issue certificate IDs for selected (completed) roadmaps')
+def generate_roadmap_certificates(modeladmin, request, queryset):
+    # Only the (single UPDATE) ID assignment runs in the request; PDFs render on first
+    # download, or in bulk with the management command outside the web workers
+    from .utils.certificate_batch import assign_certificate_ids
+    roadmaps = list(queryset.filter(progress__gte=100).select_related('course'))
+    issued = assign_certificate_ids(roadmaps)
+    ids = ' '.join(str(roadmap.id) for roadmap in roadmaps)
+    modeladmin.message_user(
+        request,
+        f"{len(roadmaps)} completed roadmap(s): {len(issued)} new certificate ID(s). "
+        f"To pre-render the PDFs run: python manage.py generate_certificates --roadmaps {ids}"
+        if roadmaps else "No completed roadmaps selected."
+    )
+
 @admin.register(Roadmap)
 class RoadmapAdmin(admin.ModelAdmin):
-    list_display = ('user', 'course', 'progress', 'current_chapter', 'current_concept', 'last_accessed_at')
+    list_display = ('user', 'course', 'progress', 'completed_concepts', 'total_concepts', 'current_chapter', 'current_concept', 'last_accessed_at')
     list_editable = ('progress', 'current_chapter', 'current_concept')
     list_filter = ('course',)
     search_fields = ('user__username', 'course__title')
+    actions = [generate_roadmap_certificates]
 
 @admin.register(ConceptProgress)
 class ConceptProgressAdmin(admin.ModelAdmin):
@@ -154,3 +173,55 @@ class BookingAdmin(admin.ModelAdmin):
     list_display = ('learner', 'mentor', 'topic', 'status', 'amount_paid', 'created_at')
     list_filter = ('status', 'created_at')
     search_fields = ('learner__username', 'mentor__user__username', 'topic')
+
+@admin.register(LeaderboardScore)
+class LeaderboardScoreAdmin(admin.ModelAdmin):
+    list_display = ('username', 'points', 'concepts_completed', 'roadmaps_count', 'updated_at')
+    search_fields = ('username',)
+
+@admin.register(VideoSearchCache)
+class VideoSearchCacheAdmin(admin.ModelAdmin):
+    list_display = ('query', 'is_fallback', 'expires_at', 'created_at')
+    list_filter = ('is_fallback',)
+    search_fields = ('query',)
+
+@admin.register(RoadmapGenerationJob)
+class RoadmapGenerationJobAdmin(admin.ModelAdmin):
+    list_display = ('user', 'topic', 'status', 'stage', 'attempts', 'created_at')
+    list_filter = ('status', 'stage')
+    search_fields = ('user__username', 'topic')
+
+@admin.register(WarmupTask)
+class WarmupTaskAdmin(admin.ModelAdmin):
+    list_display = ('concept', 'kind', 'priority', 'status', 'attempts', 'run_after')
+    list_filter = ('status', 'kind')
+    search_fields = ('concept__title',)
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'channel', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    list_filter = ('status', 'channel')
+    search_fields = ('recipient', 'user__username', 'subject')
+    exclude = ('attachment_content',)
+
+@admin.register(ReminderCampaign)
+class ReminderCampaignAdmin(admin.ModelAdmin):
+    list_display = ('date', 'status', 'users_processed', 'sent', 'failed', 'started_at', 'finished_at')
+    list_filter = ('status',)
+
+@admin.register(CertificateArtifact)
+class CertificateArtifactAdmin(admin.ModelAdmin):
+    list_display = ('certificate_id', 'template_version', 'size', 'created_at')
+    search_fields = ('certificate_id',)
+    exclude = ('pdf',)
+
+@admin.register(DailyActivity)
+class DailyActivityAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'concepts_completed', 'minutes_learned', 'sessions', 'focus_seconds', 'distractions')
+    search_fields = ('user__username',)
+    date_hierarchy = 'date'
+
+@admin.register(StudySessionSummary)
+class StudySessionSummaryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'total_sessions', 'total_focus_seconds', 'total_study_seconds', 'total_distractions', 'updated_at')
+    search_fields = ('user__username',)
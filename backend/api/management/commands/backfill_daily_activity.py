@@ -0,0 +1,17 @@
+import time
+from django.core.management.base import BaseCommand
+from api.utils.activity import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailyActivity rollups from ConceptProgress and StudySession history (and heal streaks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Users per chunk/transaction')
+        parser.add_argument('--skip-streaks', action='store_true', help='Leave UserProgress streaks untouched')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_rollups(batch_size=options['batch_size'], heal_streaks=not options['skip_streaks'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {count} daily activity rows in {elapsed:.2f}s'))
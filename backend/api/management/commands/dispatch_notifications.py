@@ -0,0 +1,31 @@
+import time
+from django.core.management.base import BaseCommand
+from api.utils.notifications import dispatch_pending, requeue_stale
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued email/WhatsApp notifications from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows claimed per batch (default NOTIFICATION_BATCH_SIZE)')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the outbox is empty')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Notification dispatcher started')
+
+        while True:
+            requeued = requeue_stale()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale notification(s)'))
+
+            counts = dispatch_pending(options['batch_size'])
+            if any(counts.values()):
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ Sent {counts['sent']}, retrying {counts['retrying']}, dead {counts['dead']}"
+                ))
+
+            if options['once']:
+                break
+            if not any(counts.values()):
+                time.sleep(options['poll_interval'])
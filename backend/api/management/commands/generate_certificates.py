@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Roadmap
+from api.utils.certificate_batch import generate_certificates
+
+
+class Command(BaseCommand):
+    help = 'Issue certificates for completed roadmaps in bulk (e.g. a whole cohort)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, help='Every completed roadmap of this course')
+        parser.add_argument('--roadmaps', type=int, nargs='+', help='Specific roadmap ids')
+        parser.add_argument('--all', action='store_true', help='Every completed roadmap')
+        parser.add_argument('--workers', type=int, default=None, help='Render processes (default CERTIFICATE_BATCH_WORKERS or CPU count)')
+        parser.add_argument('--email', action='store_true', help='Email each learner their certificate')
+
+    def handle(self, *args, **options):
+        roadmaps = Roadmap.objects.all()
+        if options['course']:
+            roadmaps = roadmaps.filter(course_id=options['course'])
+        if options['roadmaps']:
+            roadmaps = roadmaps.filter(id__in=options['roadmaps'])
+        if not (options['course'] or options['roadmaps'] or options['all']):
+            raise CommandError('Pass --course, --roadmaps or --all')
+
+        def progress(done, total):
+            if done == total or done % 25 == 0:
+                self.stdout.write(f'  rendered {done}/{total}')
+
+        stats = generate_certificates(
+            roadmaps, workers=options['workers'], email=options['email'], on_progress=progress
+        )
+        for cert_id, error in stats['errors'].items():
+            self.stderr.write(f'  ❌ {cert_id}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats['roadmaps']} completed roadmap(s): {stats['issued']} new ID(s), "
+            f"{stats['rendered']} rendered, {stats['failed']} failed, {stats['skipped']} already stored, "
+            f"{stats['emailed']} emailed in {stats['seconds']}s ({stats['per_second']} certs/s)"
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.utils.video_cache import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired rows from the YouTube search cache table'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'✅ Removed {deleted} expired cache entries'))
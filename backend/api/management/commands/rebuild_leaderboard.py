@@ -0,0 +1,16 @@
+import time
+from django.core.management.base import BaseCommand
+from api.utils.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized leaderboard scores from ConceptProgress and Roadmap'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT batch')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_leaderboard(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {count} leaderboard rows in {elapsed:.2f}s'))
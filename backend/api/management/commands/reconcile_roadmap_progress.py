@@ -0,0 +1,16 @@
+import time
+from django.core.management.base import BaseCommand
+from api.utils.roadmap_progress import reconcile_roadmaps
+
+
+class Command(BaseCommand):
+    help = 'Recount Roadmap completed/total concept counters and progress from ConceptProgress (heals drift)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per fetch/UPDATE batch')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        fixed = reconcile_roadmaps(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Reconciled roadmap progress: {fixed} rows fixed in {elapsed:.2f}s'))
@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from api.utils.roadmap_generation import run_pending, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'Process queued AI roadmap generation jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Roadmap worker started')
+
+        while True:
+            requeued = requeue_stale_jobs()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale job(s)'))
+
+            processed = run_pending()
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f'✅ Processed {processed} job(s)'))
+
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['poll_interval'])
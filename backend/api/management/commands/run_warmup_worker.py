@@ -0,0 +1,32 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.utils.rate_limit import TokenBucket
+from api.utils.warmup import run_pending, requeue_stale_tasks
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate AI notes and quizzes ahead of learners (priority queue, rate limited)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--rate', type=int, default=settings.WARMUP_RATE_PER_MINUTE, help='Max Gemini calls per minute (0 = unlimited)')
+
+    def handle(self, *args, **options):
+        limiter = TokenBucket(options['rate']) if options['rate'] > 0 else None
+        self.stdout.write(f"Warmup worker started ({options['rate'] or 'unlimited'} calls/min)")
+
+        while True:
+            requeued = requeue_stale_tasks()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale task(s)'))
+
+            processed = run_pending(limiter=limiter)
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f'✅ Processed {processed} task(s)'))
+
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['poll_interval'])
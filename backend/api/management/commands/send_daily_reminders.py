@@ -0,0 +1,41 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+from api.utils.reminders import CHANNELS, run_campaign
+
+
+class Command(BaseCommand):
+    help = "Send study reminders to learners who haven't studied today (resumable)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, default=None, help='Campaign date (YYYY-MM-DD), default today')
+        parser.add_argument('--channels', nargs='+', choices=['email', 'whatsapp'], default=['email', 'whatsapp'])
+        parser.add_argument('--batch-size', type=int, default=None, help='Users per batch (default REMINDER_BATCH_SIZE)')
+        parser.add_argument('--restart', action='store_true', help='Start the day over instead of resuming')
+
+    def handle(self, *args, **options):
+        channels = tuple(channel for channel in CHANNELS if channel.lower() in options['channels'])
+        started = time.monotonic()
+
+        def progress(campaign):
+            elapsed = max(time.monotonic() - started, 0.001)
+            self.stdout.write(
+                f"  {campaign.users_processed} users, {campaign.sent} sent, {campaign.failed} failed "
+                f"({campaign.users_processed / elapsed:.0f} users/s)"
+            )
+
+        campaign = run_campaign(
+            day=options['date'],
+            channels=channels,
+            batch_size=options['batch_size'],
+            restart=options['restart'],
+            on_batch=progress,
+        )
+        if campaign is None:
+            self.stdout.write(self.style.WARNING('Another run is already sending these reminders, exiting'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Reminders for {campaign.date}: {campaign.sent} sent, {campaign.failed} failed, '
+            f'{campaign.users_processed} users'
+        ))
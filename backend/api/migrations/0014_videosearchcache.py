@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_leaderboardscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoSearchCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query_key', models.CharField(max_length=64, unique=True)),
+                ('query', models.TextField()),
+                ('video_url', models.URLField(max_length=500)),
+                ('thumbnail', models.URLField(blank=True, max_length=500)),
+                ('is_fallback', models.BooleanField(default=False)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
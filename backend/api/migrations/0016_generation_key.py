@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_roadmapgenerationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='generation_key',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='roadmapgenerationjob',
+            name='generation_key',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
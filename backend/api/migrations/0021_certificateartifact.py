@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_remindercampaign'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('certificate_id', models.CharField(db_index=True, max_length=50)),
+                ('template_version', models.IntegerField()),
+                ('pdf', models.BinaryField()),
+                ('etag', models.CharField(max_length=64)),
+                ('size', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('certificate_id', 'template_version')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:37
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    # Same recount as `manage.py reconcile_roadmap_progress`, so existing
+    # roadmaps don't restart from 0/0 on their next completion
+    Roadmap = apps.get_model('api', 'Roadmap')
+    Concept = apps.get_model('api', 'Concept')
+    ConceptProgress = apps.get_model('api', 'ConceptProgress')
+    totals = dict(
+        Concept.objects.values('chapter__course_id').annotate(count=models.Count('id')).values_list('chapter__course_id', 'count')
+    )
+    completed = {
+        (user_id, course_id): count
+        for user_id, course_id, count in ConceptProgress.objects.filter(completed=True)
+        .values('user_id', 'concept__chapter__course_id').annotate(count=models.Count('id'))
+        .values_list('user_id', 'concept__chapter__course_id', 'count')
+    }
+    roadmaps = list(Roadmap.objects.only('id', 'user_id', 'course_id'))
+    for roadmap in roadmaps:
+        roadmap.total_concepts = totals.get(roadmap.course_id, 0)
+        roadmap.completed_concepts = completed.get((roadmap.user_id, roadmap.course_id), 0)
+    Roadmap.objects.bulk_update(roadmaps, ['total_concepts', 'completed_concepts'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_certificateartifact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roadmap',
+            name='completed_concepts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='roadmap',
+            name='total_concepts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_roadmap_progress_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conceptprogress',
+            index=models.Index(fields=['user', 'completed', 'completed_at'], name='concept_progress_activity_idx'),
+        ),
+    ]
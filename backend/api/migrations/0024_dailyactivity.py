@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    # Same per-day aggregation as `manage.py backfill_daily_activity`, inlined
+    # against the historical models so the activity charts aren't blank after
+    # deploy. Streaks are already current.
+    tz = timezone.get_current_timezone()
+    DailyActivity = apps.get_model('api', 'DailyActivity')
+    rollups = {}
+
+    def row(user_id, day):
+        if (user_id, day) not in rollups:
+            rollups[(user_id, day)] = DailyActivity(user_id=user_id, date=day)
+        return rollups[(user_id, day)]
+
+    completions = apps.get_model('api', 'ConceptProgress').objects.filter(
+        completed=True, completed_at__isnull=False
+    ).annotate(day=TruncDate('completed_at', tzinfo=tz)).values('user_id', 'day').annotate(
+        minutes=models.Sum('concept__duration'), count=models.Count('id')
+    ).order_by()
+    for item in completions:
+        rollup = row(item['user_id'], item['day'])
+        rollup.concepts_completed = item['count']
+        rollup.minutes_learned = item['minutes'] or 0
+
+    sessions = apps.get_model('api', 'StudySession').objects.annotate(
+        day=TruncDate('started_at', tzinfo=tz)
+    ).values('user_id', 'day').annotate(
+        focus=models.Sum('focus_duration'), distractions=models.Sum('distraction_count')
+    ).order_by()
+    for item in sessions:
+        rollup = row(item['user_id'], item['day'])
+        rollup.focus_seconds = item['focus'] or 0
+        rollup.distractions = item['distractions'] or 0
+
+    DailyActivity.objects.bulk_create(rollups.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_concept_progress_activity_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('concepts_completed', models.IntegerField(default=0)),
+                ('minutes_learned', models.IntegerField(default=0)),
+                ('focus_seconds', models.IntegerField(default=0)),
+                ('distractions', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_sessions(apps, schema_editor):
+    # Fills the new StudySessionSummary table and the new sessions/study_seconds
+    # columns from StudySession (one GROUP BY each), so the Study Room totals
+    # and windows are right after deploy. The rest of DailyActivity was
+    # backfilled by 0024 and is not rebuilt here.
+    StudySession = apps.get_model('api', 'StudySession')
+    StudySessionSummary = apps.get_model('api', 'StudySessionSummary')
+    DailyActivity = apps.get_model('api', 'DailyActivity')
+
+    totals = StudySession.objects.values('user_id').annotate(
+        sessions=models.Count('id'), focus=models.Sum('focus_duration'), study=models.Sum('total_duration'),
+        distractions=models.Sum('distraction_count'), percentage_sum=models.Sum('focus_percentage'),
+    ).order_by()
+    StudySessionSummary.objects.bulk_create([
+        StudySessionSummary(
+            user_id=item['user_id'],
+            total_sessions=item['sessions'],
+            total_focus_seconds=item['focus'] or 0,
+            total_study_seconds=item['study'] or 0,
+            total_distractions=item['distractions'] or 0,
+            focus_percentage_sum=item['percentage_sum'] or 0.0,
+        )
+        for item in totals
+    ], batch_size=1000)
+
+    per_day = {
+        (item['user_id'], item['day']): item
+        for item in StudySession.objects.annotate(
+            day=TruncDate('started_at', tzinfo=timezone.get_current_timezone())
+        ).values('user_id', 'day').annotate(
+            sessions=models.Count('id'), study=models.Sum('total_duration')
+        ).order_by()
+    }
+    # 0024 already created a row for every day with a session
+    rows = [
+        rollup for rollup in DailyActivity.objects.only('id', 'user_id', 'date').iterator(chunk_size=2000)
+        if (rollup.user_id, rollup.date) in per_day
+    ]
+    for rollup in rows:
+        item = per_day[(rollup.user_id, rollup.date)]
+        rollup.sessions = item['sessions']
+        rollup.study_seconds = item['study'] or 0
+    DailyActivity.objects.bulk_update(rows, ['sessions', 'study_seconds'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_dailyactivity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyactivity',
+            name='sessions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dailyactivity',
+            name='study_seconds',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='StudySessionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_sessions', models.IntegerField(default=0)),
+                ('total_focus_seconds', models.IntegerField(default=0)),
+                ('total_study_seconds', models.IntegerField(default=0)),
+                ('total_distractions', models.IntegerField(default=0)),
+                ('focus_percentage_sum', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='study_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(backfill_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_course_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='remindercampaign',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class LearnerProfile(models.Model):
@@ -46,6 +47,9 @@ class Course(models.Model):
     difficulty = models.CharField(max_length=20, choices=DIFFICULTY_CHOICES, default='beginner')
     estimated_hours = models.IntegerField(default=10)
     tags = models.JSONField(default=list, blank=True)  # e.g., ['React', 'JavaScript']
+    generation_key = models.CharField(max_length=64, blank=True, db_index=True)  # Set on AI-generated courses, see utils/roadmap_generation.py
+    # Bumped on every course/chapter/concept change (api/signals.py); keys the tree cache and ETags
+    content_version = models.IntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -106,6 +110,9 @@ class Roadmap(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='roadmaps')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='roadmaps')
     progress = models.IntegerField(default=0)  # Percentage 0-100
+    # Maintained incrementally by utils/roadmap_progress.py; progress = completed * 100 // total
+    completed_concepts = models.IntegerField(default=0)
+    total_concepts = models.IntegerField(default=0)
     current_chapter = models.IntegerField(default=0)
     current_concept = models.IntegerField(default=0)
     started_at = models.DateTimeField(auto_now_add=True)
@@ -134,6 +141,10 @@ class ConceptProgress(models.Model):
 
     class Meta:
         unique_together = ['user', 'concept']
+        indexes = [
+            # Per-day activity windows (utils/activity.py)
+            models.Index(fields=['user', 'completed', 'completed_at'], name='concept_progress_activity_idx'),
+        ]
 
 
 class Assessment(models.Model):
@@ -276,6 +287,7 @@ class NotificationLog(models.Model):
         ('WHATSAPP', 'WhatsApp')
     ]
     STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
         ('SENT', 'Sent'),
         ('FAILED', 'Failed')
     ]
@@ -377,3 +389,274 @@ class InterviewSession(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+
+
+class LeaderboardScore(models.Model):
+    """
+    Denormalized leaderboard points per user (concepts * 10 + roadmaps * 50).
+    Kept up to date incrementally; rebuild with `manage.py rebuild_leaderboard`.
+    """
+    CONCEPT_POINTS = 10
+    ROADMAP_POINTS = 50
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='leaderboard_score')
+    username = models.CharField(max_length=150)  # Copied from User for the (points, username) index
+    concepts_completed = models.IntegerField(default=0)
+    roadmaps_count = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.username} - {self.points} pts"
+
+    class Meta:
+        ordering = ['-points', 'username']
+        indexes = [
+            models.Index(fields=['-points', 'username'], name='leaderboard_rank_idx'),
+        ]
+
+
+class VideoSearchCache(models.Model):
+    """
+    Persistent tier of the YouTube search cache (see utils/video_cache.py).
+    Fallback search URLs are stored too, with a shorter TTL (negative caching).
+    """
+    query_key = models.CharField(max_length=64, unique=True)  # sha256 of the normalized query
+    query = models.TextField()
+    video_url = models.URLField(max_length=500)
+    thumbnail = models.URLField(max_length=500, blank=True)
+    is_fallback = models.BooleanField(default=False)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.query
+
+
+class RoadmapGenerationJob(models.Model):
+    """
+    Queued AI roadmap generation, processed by `manage.py run_roadmap_worker`.
+    The client polls the job until it reaches SUCCEEDED (roadmap set) or FAILED.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+    ]
+    STAGE_CHOICES = [
+        ('queued', 'Queued'),
+        ('outline', 'Generating outline'),
+        ('enriching', 'Enriching videos'),
+        ('persisting', 'Saving course'),
+        ('done', 'Done'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='roadmap_jobs')
+    topic = models.CharField(max_length=200)
+    skill_level = models.CharField(max_length=20, default='beginner')
+    generation_key = models.CharField(max_length=64, blank=True, db_index=True)  # Same as Course.generation_key
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    error = models.TextField(blank=True)
+    roadmap = models.ForeignKey(Roadmap, on_delete=models.SET_NULL, null=True, blank=True, related_name='generation_jobs')
+    run_after = models.DateTimeField(default=timezone.now)  # Retry backoff
+    locked_at = models.DateTimeField(null=True, blank=True)  # When a worker claimed it
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.topic} ({self.status})"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='roadmap_job_queue_idx'),
+        ]
+
+
+class GenerationLock(models.Model):
+    """
+    Lock row for single-flight AI generation (see utils/single_flight.py).
+    The unique key makes creating the row the lock; expired rows are taken over.
+    """
+    key = models.CharField(max_length=100, unique=True)  # e.g. "notes:42"
+    acquired_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.key
+
+
+class WarmupTask(models.Model):
+    """
+    Background pre-generation of a concept's notes or quiz ahead of the learner
+    (see utils/warmup.py). One row per (concept, kind); higher priority runs first.
+    """
+    KIND_CHOICES = [
+        ('notes', 'Notes'),
+        ('quiz', 'Quiz'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    concept = models.ForeignKey(Concept, on_delete=models.CASCADE, related_name='warmup_tasks')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    priority = models.IntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)  # Retry backoff
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind}:{self.concept_id} (p{self.priority}, {self.status})"
+
+    class Meta:
+        unique_together = ['concept', 'kind']
+        ordering = ['-priority', 'created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'created_at'], name='warmup_queue_idx'),
+        ]
+
+
+class NotificationOutbox(models.Model):
+    """
+    Notification waiting to be delivered by `manage.py dispatch_notifications`
+    (see utils/notifications.py). Views queue rows instead of calling SMTP/Twilio
+    inside the request; failed sends are retried with backoff until DEAD.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('DEAD', 'Dead'),  # Gave up: permanent error or out of attempts
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='outbox_notifications')
+    channel = models.CharField(max_length=20, choices=NotificationLog.TYPE_CHOICES)
+    recipient = models.CharField(max_length=255)  # Email or Phone Number
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    attachment_name = models.CharField(max_length=255, blank=True)
+    attachment_content = models.BinaryField(null=True, blank=True)
+    attachment_mimetype = models.CharField(max_length=100, blank=True)
+    log = models.OneToOneField(NotificationLog, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbox')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)  # When a dispatcher claimed it
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} ({self.status})"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_queue_idx'),
+        ]
+
+
+class ReminderCampaign(models.Model):
+    """
+    One day's run of `manage.py send_daily_reminders` (see utils/reminders.py).
+    Users are processed in id order; `cursor` is the last finished user id so an
+    interrupted run resumes where it stopped. `locked_at` is the lease of the run
+    currently sending (refreshed every batch), so two runs never send at once.
+    """
+    STATUS_CHOICES = [
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+    ]
+
+    date = models.DateField(unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='RUNNING')
+    cursor = models.IntegerField(default=0)
+    users_processed = models.IntegerField(default=0)
+    sent = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Reminders {self.date} ({self.status})"
+
+    class Meta:
+        ordering = ['-date']
+
+
+class CertificateArtifact(models.Model):
+    """
+    Rendered certificate PDF cached by (certificate_id, template_version)
+    (see utils/certificate_cache.py). Certificates are immutable once issued,
+    so bumping certificate.TEMPLATE_VERSION is the only invalidation.
+    """
+    certificate_id = models.CharField(max_length=50, db_index=True)
+    template_version = models.IntegerField()
+    pdf = models.BinaryField()
+    etag = models.CharField(max_length=64)  # sha256 of the PDF bytes
+    size = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.certificate_id} (v{self.template_version})"
+
+    class Meta:
+        unique_together = ['certificate_id', 'template_version']
+
+
+class DailyActivity(models.Model):
+    """
+    Per-user, per-day activity rollup (see utils/activity.py), written
+    incrementally on concept completion and study-session creation. The
+    contribution graph, weekly chart and streak healing read these rows instead
+    of re-aggregating ConceptProgress/StudySession.
+    `manage.py backfill_daily_activity` rebuilds them from history.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_activity')
+    date = models.DateField()
+    concepts_completed = models.IntegerField(default=0)
+    minutes_learned = models.IntegerField(default=0)
+    focus_seconds = models.IntegerField(default=0)
+    distractions = models.IntegerField(default=0)
+    sessions = models.IntegerField(default=0)
+    study_seconds = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}"
+
+    class Meta:
+        unique_together = ['user', 'date']
+        ordering = ['date']
+
+
+class StudySessionSummary(models.Model):
+    """
+    Running all-time totals of a user's study sessions, bumped when a session
+    is saved so `study-sessions/stats/` does O(1) work (see utils/study_stats.py).
+    Rebuilt from StudySession with one aggregate query when missing.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='study_summary')
+    total_sessions = models.IntegerField(default=0)
+    total_focus_seconds = models.IntegerField(default=0)
+    total_study_seconds = models.IntegerField(default=0)
+    total_distractions = models.IntegerField(default=0)
+    focus_percentage_sum = models.FloatField(default=0.0)  # / total_sessions = average focus percentage
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username}'s study summary"
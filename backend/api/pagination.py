@@ -0,0 +1,74 @@
+"""
+Keyset (cursor) pagination and `?fields=` sparse projection for list endpoints.
+
+Cursor pages seek on the list's ordering column (`-created_at`, `-ended_at`)
+instead of OFFSET, so page N costs the same as page 1 however
+long a user's history grows. Responses are `{next, previous, results}`;
+`?page_size=` is capped at API_MAX_PAGE_SIZE. The ordering column must not
+change once set: a row whose key moves while a client is paging would be
+skipped or served twice (so labs page on `-created_at`, not `-updated_at`).
+
+`?fields=id,name` limits the serialized fields, and heavy columns (Lab.files,
+the course chapter/concept tree) are only loaded when one of the fields that
+needs them is requested. Without `?fields=` the full representation is
+returned.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class NewestFirstPagination(CursorPagination):
+    ordering = '-created_at'
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class RecentlyEndedPagination(NewestFirstPagination):
+    ordering = '-ended_at'
+
+
+def requested_fields(request):
+    """The `?fields=` names as a set, or None when the client wants everything."""
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+def prune_fields(serializer, fields):
+    """Drops every field not in `fields` from a (list) serializer."""
+    if fields is None:
+        return serializer
+    target = getattr(serializer, 'child', serializer)
+    for name in set(target.fields) - fields:
+        target.fields.pop(name)
+    return serializer
+
+
+def defer_heavy(queryset, heavy_fields, fields):
+    """Defers the model columns behind heavy API fields that weren't requested."""
+    if fields is None:
+        return queryset
+    deferred = [column for name, columns in heavy_fields.items() if name not in fields for column in columns]
+    return queryset.defer(*deferred) if deferred else queryset
+
+
+class SparseFieldsMixin:
+    """
+    For generic list views: applies `?fields=` to GET responses.
+    `heavy_fields` maps API field names to the model columns only they need.
+    """
+    heavy_fields = {}
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.request.method == 'GET':
+            prune_fields(serializer, requested_fields(self.request))
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method == 'GET':
+            queryset = defer_heavy(queryset, self.heavy_fields, requested_fields(self.request))
+        return queryset
@@ -1,9 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
-from django.utils import timezone
-from django.db.models import Sum, Count
-from datetime import timedelta
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -78,6 +75,7 @@ from .models import (
     LearnerProfile, Course, Chapter, Concept, Roadmap, ConceptProgress,
     Assessment, AssessmentResult, DailyTask, Notification, UserProgress
 )
+from .utils import activity
 
 class LearnerProfileSerializer(serializers.ModelSerializer):
     skillLevel = serializers.CharField(source='skill_level')
@@ -91,6 +89,14 @@ class LearnerProfileSerializer(serializers.ModelSerializer):
         fields = ('id', 'user', 'skillLevel', 'learningGoals', 'dailyStudyTime', 'onboardingCompleted')
         read_only_fields = ('user',)
 
+def completed_concept_ids(user):
+    """Set of concept IDs the user has completed, fetched in one query."""
+    if user and user.is_authenticated:
+        return set(
+            ConceptProgress.objects.filter(user=user, completed=True).values_list('concept_id', flat=True)
+        )
+    return set()
+
 class ConceptSerializer(serializers.ModelSerializer):
     videoUrl = serializers.URLField(source='video_url')
     contentType = serializers.CharField(source='content_type')
@@ -102,10 +108,13 @@ class ConceptSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'description', 'duration', 'videoUrl', 'notes', 'contentType', 'order', 'completed')
 
     def get_completed(self, obj):
-        user = self.context.get('request').user if self.context.get('request') else None
-        if user and user.is_authenticated:
-            return ConceptProgress.objects.filter(user=user, concept=obj, completed=True).exists()
-        return False
+        # Resolved once per request: the set lives in the (shared) root serializer context
+        completed_ids = self.context.get('completed_concept_ids')
+        if completed_ids is None:
+            user = self.context.get('request').user if self.context.get('request') else None
+            completed_ids = completed_concept_ids(user)
+            self.context['completed_concept_ids'] = completed_ids
+        return obj.id in completed_ids
 
 class ChapterSerializer(serializers.ModelSerializer):
     concepts = ConceptSerializer(many=True, read_only=True)
@@ -123,6 +132,29 @@ class CourseSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'description', 'thumbnail', 'difficulty', 'estimatedHours', 'tags', 'chapters')
         read_only_fields = ('created_at', 'updated_at')
 
+class CourseCatalogSerializer(serializers.ModelSerializer):
+    """Course header for the catalog: counts/duration are annotated by CourseCatalogView."""
+    estimatedHours = serializers.IntegerField(source='estimated_hours')
+    chapterCount = serializers.IntegerField(source='chapter_count', read_only=True)
+    conceptCount = serializers.IntegerField(source='concept_count', read_only=True)
+    totalMinutes = serializers.IntegerField(source='total_minutes', read_only=True)
+
+    class Meta:
+        model = Course
+        fields = ('id', 'title', 'description', 'thumbnail', 'difficulty', 'estimatedHours', 'tags', 'chapterCount', 'conceptCount', 'totalMinutes')
+
+class ConceptOutlineSerializer(ConceptSerializer):
+    """A concept without its markdown notes (fetched per concept from concepts/<id>/notes/)."""
+
+    class Meta(ConceptSerializer.Meta):
+        fields = tuple(name for name in ConceptSerializer.Meta.fields if name != 'notes')
+
+class ChapterOutlineSerializer(ChapterSerializer):
+    concepts = ConceptOutlineSerializer(many=True, read_only=True)
+
+class CourseOutlineSerializer(CourseSerializer):
+    chapters = ChapterOutlineSerializer(many=True, read_only=True)
+
 class ConceptProgressSerializer(serializers.ModelSerializer):
     completedAt = serializers.DateTimeField(source='completed_at')
 
@@ -140,12 +172,33 @@ class RoadmapSerializer(serializers.ModelSerializer):
     currentConcept = serializers.IntegerField(source='current_concept')
     startedAt = serializers.DateTimeField(source='started_at')
     lastAccessedAt = serializers.DateTimeField(source='last_accessed_at')
+    completedConcepts = serializers.IntegerField(source='completed_concepts', read_only=True)
+    totalConcepts = serializers.IntegerField(source='total_concepts', read_only=True)
     
     class Meta:
         model = Roadmap
-        fields = ('id', 'user', 'course', 'course_id', 'progress', 'currentChapter', 'currentConcept', 'startedAt', 'lastAccessedAt')
+        fields = ('id', 'user', 'course', 'course_id', 'progress', 'completedConcepts', 'totalConcepts', 'currentChapter', 'currentConcept', 'startedAt', 'lastAccessedAt')
         read_only_fields = ('user', 'startedAt', 'lastAccessedAt')
 
+from .models import RoadmapGenerationJob
+
+class RoadmapGenerationJobSerializer(serializers.ModelSerializer):
+    skillLevel = serializers.CharField(source='skill_level')
+    stageLabel = serializers.CharField(source='get_stage_display')
+    createdAt = serializers.DateTimeField(source='created_at')
+    updatedAt = serializers.DateTimeField(source='updated_at')
+    roadmap = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RoadmapGenerationJob
+        fields = ('id', 'topic', 'skillLevel', 'status', 'stage', 'stageLabel', 'attempts', 'error', 'roadmap', 'createdAt', 'updatedAt')
+        read_only_fields = fields
+
+    def get_roadmap(self, obj):
+        if obj.status != 'SUCCEEDED' or obj.roadmap is None:
+            return None
+        return RoadmapSerializer(obj.roadmap, context=self.context).data
+
 class AssessmentSerializer(serializers.ModelSerializer):
     timeLimit = serializers.IntegerField(source='time_limit')
 
@@ -196,31 +249,13 @@ class UserProgressSerializer(serializers.ModelSerializer):
         read_only_fields = ('user',)
 
     def get_totalCoursesEnrolled(self, obj):
-        return obj.user.roadmaps.count()
+        # Annotated by UserStatsView; falls back to a COUNT for other callers
+        courses = getattr(obj, 'courses_enrolled', None)
+        return courses if courses is not None else obj.user.roadmaps.count()
 
     def get_dailyProgress(self, obj):
-        today = timezone.now().date()
-        daily_data = []
-        
-        for i in range(6, -1, -1):
-            date = today - timedelta(days=i)
-            # Find completed concepts for this user on this date
-            completed = ConceptProgress.objects.filter(
-                user=obj.user,
-                completed=True,
-                completed_at__date=date
-            ).aggregate(
-                minutes=Sum('concept__duration'),
-                count=Count('id')
-            )
-            
-            daily_data.append({
-                'date': date.isoformat(),
-                'minutesLearned': completed['minutes'] or 0,
-                'conceptsCompleted': completed['count'] or 0
-            })
-            
-        return daily_data
+        # Last 7 days from one GROUP BY query, empty days filled in
+        return activity.daily_activity(obj.user, days=7)
 
 from .models import Lab
 
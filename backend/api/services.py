@@ -4,6 +4,8 @@ from django.conf import settings
 import requests
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from .utils import video_cache
 
 # Configure Gemini
 # Configure Gemini
@@ -11,15 +13,32 @@ genai.configure(api_key=settings.GEMINI_API_KEY)
 
 class YouTubeService:
     API_KEY = settings.YOUTUBE_API_KEY
+    SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
     
     @staticmethod
-    def search_video(query):
+    def search_video(query, session=None):
         """
-        Searches YouTube for a video matching the query.
+        Searches YouTube for a video matching the query, through the query cache.
+        Pass a shared requests.Session to reuse connections across lookups.
         Returns {video_url, thumbnail} or None.
         """
+        cached = video_cache.lookup(query)
+        if cached is not None:
+            return cached
+
+        result, outcome = YouTubeService.fetch_video(query, session)
+        if result:
+            video_cache.store(query, result, outcome)
+        return result
+
+    @staticmethod
+    def fetch_video(query, session=None):
+        """
+        Uncached YouTube search. Returns ({video_url, thumbnail}, outcome), outcome
+        being video_cache.FOUND, NOT_FOUND or ERROR (which sets the cache TTL).
+        Does not touch the database, so it is safe to run on worker threads.
+        """
         try:
-            url = "https://www.googleapis.com/youtube/v3/search"
             params = {
                 'part': 'snippet',
                 'q': query,
@@ -27,7 +46,7 @@ class YouTubeService:
                 'maxResults': 1,
                 'key': YouTubeService.API_KEY
             }
-            response = requests.get(url, params=params, timeout=10)
+            response = (session or requests).get(YouTubeService.SEARCH_URL, params=params, timeout=10)
             data = response.json()
             
             # Debug logging
@@ -35,7 +54,7 @@ class YouTubeService:
             if 'error' in data:
                 print(f"DEBUG YouTube API ERROR: {data['error'].get('message', data['error'])}")
                 # Fallback: Return a YouTube search URL so user can find the video manually
-                return YouTubeService._create_fallback_url(query)
+                return YouTubeService._create_fallback_url(query), video_cache.ERROR
             
             if 'items' in data and len(data['items']) > 0:
                 item = data['items'][0]
@@ -50,15 +69,13 @@ class YouTubeService:
                 return {
                     'video_url': embed_url,
                     'thumbnail': thumbnail
-                }
+                }, video_cache.FOUND
             else:
                 print(f"DEBUG YouTube: No results found for '{query}'")
-                return YouTubeService._create_fallback_url(query)
+                return YouTubeService._create_fallback_url(query), video_cache.NOT_FOUND
         except Exception as e:
             print(f"YouTube Search Error for '{query}': {e}")
-            return YouTubeService._create_fallback_url(query)
-            
-        return None
+            return YouTubeService._create_fallback_url(query), video_cache.ERROR
     
     @staticmethod
     def _create_fallback_url(query):
@@ -71,10 +88,33 @@ class YouTubeService:
         }
 
 class ContentDiscoveryService:
+    # Bump when the outline prompt changes so cached generated courses aren't reused
+    PROMPT_VERSION = 1
+
     @staticmethod
     def search_videos(topic, skill_level):
         """
-        Generates a full course structure using Gemini 3 Pro with JSON output.
+        Generates a full course structure using Gemini 3 Pro with JSON output,
+        enriched with YouTube videos. Returns {"error": ...} on failure.
+        """
+        try:
+            data = ContentDiscoveryService.generate_outline(topic, skill_level)
+            
+            # Enrich with Real YouTube Data
+            ContentDiscoveryService.enrich_with_videos(data, topic)
+            
+            return data
+            
+        except Exception as e:
+            error_msg = str(e)
+            print(f"Gemini API Error: {error_msg}")
+            return {"error": error_msg}
+
+    @staticmethod
+    def generate_outline(topic, skill_level):
+        """
+        Asks Gemini for the course outline (course + chapters + concepts).
+        Raises on API or JSON errors so callers can decide whether to retry.
         """
         # Using verified gemini-3-flash-preview as requested
         model = genai.GenerativeModel('gemini-3-flash-preview') 
@@ -111,58 +151,93 @@ class ContentDiscoveryService:
         }}
         """
         
-        try:
-            print(f"DEBUG: Calling Gemini {model.model_name} for topic: {topic}")
-            response = model.generate_content(
-                prompt, 
-                generation_config={"response_mime_type": "application/json"},
-                request_options={"timeout": 60}  # 60 second timeout
-            )
-            print("DEBUG: Gemini response received. Length:", len(response.text))
-            raw_response = response.text.replace('```json', '').replace('```', '').strip()
-            # print(f"DEBUG: Raw response: {raw_response[:500]}...") # Optional debug
-            
-            data = json.loads(raw_response)
-            print("DEBUG: JSON parsed successfully")
-            
-            # Enrich with Real YouTube Data
-            course_thumbnail = None
-            
-            if 'chapters' in data:
-                for chapter in data['chapters']:
-                    if 'concepts' in chapter:
-                        for concept in chapter['concepts']:
-                            query = concept.get('video_search_query', concept['title'])
-                            # Append topic to query for better context
-                            full_query = f"{query} {topic} tutorial"
-                            
-                            print(f"DEBUG: Searching YouTube for: {full_query}")
-                            yt_data = YouTubeService.search_video(full_query)
-                            
-                            if yt_data:
-                                concept['video_url'] = yt_data['video_url']
-                                concept['thumbnail'] = yt_data['thumbnail']
-                                
-                                # Use first found thumbnail for the course if not set
-                                if not course_thumbnail:
-                                    course_thumbnail = yt_data['thumbnail']
-                            else:
-                                # Fallback if API fail/limit
-                                concept['video_url'] = "" 
-            
-            if course_thumbnail and 'course' in data:
-                 data['course']['thumbnail'] = course_thumbnail
-            
+        print(f"DEBUG: Calling Gemini {model.model_name} for topic: {topic}")
+        response = model.generate_content(
+            prompt, 
+            generation_config={"response_mime_type": "application/json"},
+            request_options={"timeout": 60}  # 60 second timeout
+        )
+        print("DEBUG: Gemini response received. Length:", len(response.text))
+        raw_response = response.text.replace('```json', '').replace('```', '').strip()
+        # print(f"DEBUG: Raw response: {raw_response[:500]}...") # Optional debug
+        
+        data = json.loads(raw_response)
+        print("DEBUG: JSON parsed successfully")
+        return data
+
+    @staticmethod
+    def enrich_with_videos(data, topic, deadline=None):
+        """
+        Looks up a YouTube video for every concept concurrently through a bounded
+        thread pool sharing one HTTP session. Lookups still running when the
+        per-roadmap deadline expires fall back to a YouTube search URL.
+        Results are written back into data['chapters'] in their original order.
+        """
+        if deadline is None:
+            deadline = settings.YOUTUBE_ENRICH_DEADLINE
+
+        concepts = [
+            concept
+            for chapter in data.get('chapters', [])
+            for concept in chapter.get('concepts', [])
+        ]
+        if not concepts:
             return data
-            
-        except Exception as e:
-            error_msg = str(e)
-            print(f"Gemini API Error: {error_msg}")
-            return {"error": error_msg}
+
+        queries = []
+        for concept in concepts:
+            query = concept.get('video_search_query', concept['title'])
+            # Append topic to query for better context
+            queries.append(f"{query} {topic} tutorial")
+
+        # Cache lookups happen here, on the request thread; only misses hit the network
+        results = video_cache.lookup_many(queries)
+        to_fetch = list(dict.fromkeys(q for q in queries if q not in results))
+
+        if to_fetch:
+            workers = max(1, min(settings.YOUTUBE_ENRICH_WORKERS, len(to_fetch)))
+            session = requests.Session()
+            session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=workers))
+            session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=workers))
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='yt-enrich')
+
+            try:
+                futures = {query: executor.submit(YouTubeService.fetch_video, query, session) for query in to_fetch}
+                _, pending = wait(futures.values(), timeout=deadline)
+            finally:
+                # Don't block the request on stragglers; queued lookups are dropped
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            if pending:
+                print(f"DEBUG: YouTube enrichment deadline hit, {len(pending)}/{len(futures)} lookups fell back")
+
+            fetched = {query: future.result() for query, future in futures.items() if future not in pending}
+            video_cache.store_many(fetched)
+            results.update({query: result for query, (result, _) in fetched.items()})
+
+            # Stragglers may still be using the session; it's collected with them
+            if not pending:
+                session.close()
+
+        course_thumbnail = None
+        for concept, query in zip(concepts, queries):
+            yt_data = results.get(query) or YouTubeService._create_fallback_url(query)
+            concept['video_url'] = yt_data['video_url']
+            concept['thumbnail'] = yt_data['thumbnail']
+
+            # Use first found thumbnail for the course if not set
+            if not course_thumbnail:
+                course_thumbnail = yt_data['thumbnail']
+
+        if course_thumbnail and 'course' in data:
+            data['course']['thumbnail'] = course_thumbnail
+
+        return data
 
 class NotesGeneratorService:
     @staticmethod
     def generate_notes(video_title, extra_context=""):
+        """Markdown notes, or None if Gemini failed (callers must not store anything then)."""
         model = genai.GenerativeModel('gemini-3-flash-preview')  # Use working model
         
         prompt = f"""
@@ -182,7 +257,7 @@ class NotesGeneratorService:
             return response.text
         except Exception as e:
             print(f"Notes generation error: {e}")
-            return f"# {video_title}\n\nNotes will be generated when you watch this video."
+            return None
 
 class QuizGeneratorService:
     @staticmethod
@@ -0,0 +1,89 @@
+"""
+Cache invalidation hooks.
+
+Course.content_version is kept current: any save/delete of a course, chapter
+or concept bumps it, which invalidates the cached course tree and the ETags
+of CourseDetailView/RoadmapDetailView (see utils/course_cache.py).
+Saving or deleting (including cascade deletes of) a roadmap, or renaming its
+owner, drops the cached verification of its certificate (see
+utils/certificate_verification.py).
+Deleted roadmaps and completed ConceptProgress rows (e.g. cascading from a
+course) and username changes are applied to LeaderboardScore.
+Added and deleted concepts and deleted completions shift the progress
+counters of the course's roadmaps (see utils/roadmap_progress.py).
+Bulk writes (bulk_create, queryset.update) send no signals; callers that
+change existing content that way call course_tree.bump_content_version or
+certificate_verification.invalidate themselves.
+"""
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import Chapter, Concept, ConceptProgress, Course, Roadmap
+from .utils import leaderboard, roadmap_progress
+from .utils.course_tree import bump_content_version
+
+
+@receiver(pre_save, sender=Course)
+def course_saving(sender, instance, **kwargs):
+    # Increment in SQL so a stale in-memory instance can't roll the version back
+    if instance.pk is not None and not instance._state.adding:
+        instance.content_version = F('content_version') + 1
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    # save(update_fields=[...]) only writes the listed columns, so the pre_save increment was dropped
+    if update_fields is not None and 'content_version' not in update_fields:
+        bump_content_version(instance.pk)
+    instance.refresh_from_db(fields=['content_version'])
+
+
+@receiver([post_save, post_delete], sender=Chapter)
+def chapter_changed(sender, instance, **kwargs):
+    bump_content_version(instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=Concept)
+def concept_changed(sender, instance, signal, created=False, **kwargs):
+    # Filter through the chapter id: during a cascade delete the chapter row may already be gone
+    Course.objects.filter(chapters__id=instance.chapter_id).update(content_version=F('content_version') + 1)
+    if created:
+        roadmap_progress.record_concept_added(instance.chapter_id)
+    elif signal is post_delete:
+        roadmap_progress.record_concept_deleted(instance.chapter_id)
+
+
+@receiver([post_save, post_delete], sender=Roadmap)
+def roadmap_changed(sender, instance, **kwargs):
+    # A deleted roadmap (or one edited below 100%) must stop verifying as valid
+    if instance.certificate_id:
+        from .utils import certificate_verification
+        certificate_verification.invalidate(instance.certificate_id)
+
+
+@receiver(post_delete, sender=Roadmap)
+def roadmap_deleted(sender, instance, **kwargs):
+    leaderboard.record_roadmap_deleted(instance.user_id)
+
+
+@receiver(post_delete, sender=ConceptProgress)
+def concept_progress_deleted(sender, instance, **kwargs):
+    if instance.completed:
+        leaderboard.record_concept_progress_deleted(instance.user_id)
+        roadmap_progress.record_completion_deleted(instance.user_id, instance.concept_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Skip saves that can't rename (e.g. the last_login update on every login)
+    if created:
+        return
+    if update_fields is None or 'username' in update_fields:
+        leaderboard.record_username_changed(instance)
+    if update_fields is None or {'username', 'first_name', 'last_name'} & set(update_fields):
+        # Certificates show the holder's name
+        from .utils import certificate_verification
+        certificate_verification.invalidate_user(instance.id)
@@ -1,3 +1,1828 @@
-from django.test import TestCase
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import urlparse, parse_qs
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import IntegrityError, connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Course, Chapter, Concept, Roadmap, ConceptProgress
+from .models import VideoSearchCache, WarmupTask, Assessment
+from .models import LearnerProfile, NotificationLog, NotificationOutbox, UserProgress, ReminderCampaign
+from .models import LeaderboardScore
+from .models import CertificateArtifact, DailyActivity, StudySession, StudySessionSummary, Lab, Notification
+from .pagination import NewestFirstPagination
+from .services import ContentDiscoveryService, YouTubeService, NotesGeneratorService, QuizGeneratorService
+from .utils import video_cache, roadmap_generation, single_flight, warmup, notifications, notification_transport, rate_limit, reminders, certificate_cache, certificate, certificate_batch, roadmap_progress, user_stats, activity, study_stats, course_cache, concept_content, leaderboard, course_tree, certificate_verification
+
+
+def make_course(title, chapters=2, concepts_per_chapter=5):
+    course = Course.objects.create(title=title, description=f"{title} description")
+    for i in range(chapters):
+        chapter = Chapter.objects.create(course=course, title=f"Chapter {i + 1}", order=i + 1)
+        for j in range(concepts_per_chapter):
+            Concept.objects.create(chapter=chapter, title=f"Concept {i + 1}.{j + 1}", order=j + 1)
+    return course
+
+
+class RoadmapQueryCountTests(TestCase):
+    """Serializing roadmap/course trees must not issue a query per concept."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='learner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_roadmap_list_query_count_is_constant(self):
+        Roadmap.objects.create(user=self.user, course=make_course('Small', chapters=1, concepts_per_chapter=2))
+        small_count, _ = self.count_queries('/api/roadmaps/')
+
+        for n in range(3):
+            Roadmap.objects.create(user=self.user, course=make_course(f"Big {n}", chapters=5, concepts_per_chapter=20))
+        big_count, data = self.count_queries('/api/roadmaps/')
+
+        self.assertEqual(len(data), 4)
+        self.assertEqual(small_count, big_count)
+
+    def test_course_list_query_count_is_constant(self):
+        make_course('Small', chapters=1, concepts_per_chapter=1)
+        small_count, _ = self.count_queries('/api/courses/')
+
+        make_course('Big', chapters=10, concepts_per_chapter=10)
+        big_count, _ = self.count_queries('/api/courses/')
+
+        self.assertEqual(small_count, big_count)
+
+    def test_completed_flags_resolved_from_context(self):
+        course = make_course('React', chapters=2, concepts_per_chapter=3)
+        Roadmap.objects.create(user=self.user, course=course)
+        done = Concept.objects.filter(chapter__course=course).order_by('id')[:2]
+        for concept in done:
+            ConceptProgress.objects.create(user=self.user, concept=concept, completed=True)
+
+        _, data = self.count_queries('/api/roadmaps/')
+        flags = {
+            concept['id']: concept['completed']
+            for chapter in data[0]['course']['chapters']
+            for concept in chapter['concepts']
+        }
+        self.assertEqual({cid for cid, flag in flags.items() if flag}, {c.id for c in done})
+
+
+class StubYouTubeHandler(BaseHTTPRequestHandler):
+    """
+    Fake YouTube search API. The video ID echoes the query so tests can check
+    ordering; queries containing "slow" sleep past the enrichment deadline.
+    """
+    latency = 0.2
+    slow_latency = 3.0
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)['q'][0]
+        time.sleep(self.slow_latency if 'slow' in query else self.latency)
+        body = json.dumps({'items': [{
+            'id': {'videoId': query.split(' ')[0]},
+            'snippet': {'thumbnails': {'high': {'url': f"https://img.test/{query.split(' ')[0]}.jpg"}}},
+        }]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(YOUTUBE_ENRICH_WORKERS=8, YOUTUBE_ENRICH_DEADLINE=1.5)
+class ParallelEnrichmentTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubYouTubeHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url_patch = mock.patch.object(
+            YouTubeService, 'SEARCH_URL', f"http://127.0.0.1:{cls.server.server_port}/youtube/v3/search"
+        )
+        cls.url_patch.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.url_patch.stop()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        video_cache.clear_memory()
+
+    def make_outline(self, chapters, concepts, slow=()):
+        return {
+            'course': {'title': 'Stub'},
+            'chapters': [
+                {'title': f"Ch {i}", 'concepts': [
+                    {
+                        'title': f"c{i}x{j}",
+                        'video_search_query': f"{'slow' if (i, j) in slow else 'vid'}{i}x{j}",
+                    }
+                    for j in range(concepts)
+                ]}
+                for i in range(chapters)
+            ],
+        }
+
+    def test_lookups_run_concurrently_and_keep_order(self):
+        data = self.make_outline(chapters=6, concepts=5)
+
+        started = time.perf_counter()
+        ContentDiscoveryService.enrich_with_videos(data, 'React')
+        elapsed = time.perf_counter() - started
+
+        # 30 lookups x 0.2s serially would take 6s; 8 workers need ~0.8s
+        self.assertLess(elapsed, 1.5)
+        for i, chapter in enumerate(data['chapters']):
+            for j, concept in enumerate(chapter['concepts']):
+                self.assertEqual(concept['video_url'], f"https://www.youtube.com/embed/vid{i}x{j}")
+        self.assertEqual(data['course']['thumbnail'], 'https://img.test/vid0x0.jpg')
+
+    def test_deadline_returns_partial_results(self):
+        data = self.make_outline(chapters=2, concepts=3, slow={(0, 1), (1, 2)})
+
+        started = time.perf_counter()
+        ContentDiscoveryService.enrich_with_videos(data, 'React')
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 2.5)
+        urls = [c['video_url'] for ch in data['chapters'] for c in ch['concepts']]
+        self.assertEqual(urls[0], 'https://www.youtube.com/embed/vid0x0')
+        self.assertTrue(urls[1].startswith('https://www.youtube.com/results?search_query=slow0x1'))
+        self.assertEqual(urls[2], 'https://www.youtube.com/embed/vid0x2')
+        self.assertTrue(urls[5].startswith('https://www.youtube.com/results?search_query=slow1x2'))
+
+    def test_repeat_roadmap_is_served_from_cache(self):
+        ContentDiscoveryService.enrich_with_videos(self.make_outline(chapters=2, concepts=3), 'React')
+
+        data = self.make_outline(chapters=2, concepts=3)
+        started = time.perf_counter()
+        ContentDiscoveryService.enrich_with_videos(data, 'React')
+        self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertEqual(data['chapters'][1]['concepts'][2]['video_url'], 'https://www.youtube.com/embed/vid1x2')
+
+
+class VideoCacheTests(TestCase):
+
+    def setUp(self):
+        video_cache.clear_memory()
+
+    def test_queries_are_normalized(self):
+        video_cache.store('useState React tutorial', {'video_url': 'https://www.youtube.com/embed/abc', 'thumbnail': ''})
+        self.assertEqual(video_cache.lookup('  usestate   REACT tutorial ')['video_url'], 'https://www.youtube.com/embed/abc')
+
+    def test_database_tier_survives_memory_eviction(self):
+        video_cache.store('hooks', {'video_url': 'https://www.youtube.com/embed/h', 'thumbnail': ''})
+        video_cache.clear_memory()
+        before = video_cache.stats()['db_hits']
+        self.assertIsNotNone(video_cache.lookup('hooks'))
+        self.assertEqual(video_cache.stats()['db_hits'], before + 1)
+
+    @override_settings(YOUTUBE_CACHE_MAX_ENTRIES=2)
+    def test_lru_evicts_least_recently_used(self):
+        for name in ('a', 'b'):
+            video_cache.store(name, {'video_url': f"https://www.youtube.com/embed/{name}", 'thumbnail': ''})
+        video_cache.lookup('a')
+        video_cache.store('c', {'video_url': 'https://www.youtube.com/embed/c', 'thumbnail': ''})
+        self.assertEqual(video_cache.stats()['memory_entries'], 2)
+        self.assertNotIn(video_cache.cache_key('b'), video_cache._memory)
+        self.assertIn(video_cache.cache_key('a'), video_cache._memory)
+
+    @override_settings(YOUTUBE_CACHE_NEGATIVE_TTL=0)
+    def test_fallback_results_use_negative_ttl(self):
+        with mock.patch.object(YouTubeService, 'fetch_video', return_value=(YouTubeService._create_fallback_url('x'), video_cache.NOT_FOUND)) as fetch:
+            YouTubeService.search_video('x')
+            YouTubeService.search_video('x')
+        self.assertEqual(fetch.call_count, 2)
+        self.assertTrue(VideoSearchCache.objects.get(query='x').is_fallback)
+
+    def test_successful_results_are_not_refetched(self):
+        found = ({'video_url': 'https://www.youtube.com/embed/y', 'thumbnail': ''}, video_cache.FOUND)
+        with mock.patch.object(YouTubeService, 'fetch_video', return_value=found) as fetch:
+            YouTubeService.search_video('y')
+            YouTubeService.search_video('y')
+        self.assertEqual(fetch.call_count, 1)
+
+    @override_settings(YOUTUBE_CACHE_NEGATIVE_TTL=3600, YOUTUBE_CACHE_ERROR_TTL=60)
+    def test_errors_are_cached_much_shorter_than_empty_results(self):
+        with mock.patch('api.services.requests.get', side_effect=ConnectionError('reset')):
+            YouTubeService.search_video('flaky')
+        with mock.patch('api.services.requests.get') as get:
+            get.return_value.json.return_value = {'items': []}
+            YouTubeService.search_video('obscure')
+
+        ttl = {
+            row.query: (row.expires_at - row.created_at).total_seconds()
+            for row in VideoSearchCache.objects.filter(query__in=['flaky', 'obscure'])
+        }
+        self.assertAlmostEqual(ttl['flaky'], 60, delta=1)
+        self.assertAlmostEqual(ttl['obscure'], 3600, delta=1)
+
+    def test_store_many_upserts_in_one_query(self):
+        # A row another generation wrote after our lookup missed
+        video_cache.store('Race query', {'video_url': 'https://www.youtube.com/embed/old', 'thumbnail': ''}, video_cache.ERROR)
+        video_cache.clear_memory()
+        results = {
+            'race   QUERY': ({'video_url': 'https://www.youtube.com/embed/new', 'thumbnail': ''}, video_cache.FOUND),
+            'race query': ({'video_url': 'https://www.youtube.com/embed/new', 'thumbnail': ''}, video_cache.FOUND),
+            'other': ({'video_url': 'https://www.youtube.com/embed/o', 'thumbnail': ''}, video_cache.FOUND),
+        }
+        with self.assertNumQueries(1):
+            video_cache.store_many(results)
+
+        row = VideoSearchCache.objects.get(query='race query')
+        self.assertEqual((row.video_url, row.is_fallback), ('https://www.youtube.com/embed/new', False))
+        self.assertEqual(VideoSearchCache.objects.count(), 2)
+
+
+OUTLINE = {
+    'course': {'title': 'Learn Django', 'description': 'Web apps'},
+    'chapters': [
+        {'title': 'Basics', 'concepts': [
+            {'title': 'Models', 'video_url': 'https://www.youtube.com/embed/m'},
+            {'title': 'Views', 'video_search_query': 'django views'},
+        ]},
+    ],
+}
+
+
+class LeaderboardTests(TestCase):
+
+    def setUp(self):
+        self.courses = [make_course('Python', chapters=1, concepts_per_chapter=4), make_course('Go', chapters=1, concepts_per_chapter=2)]
+
+    def learner(self, username, first_name=''):
+        user = User.objects.create_user(username=username, first_name=first_name)
+        client = APIClient()
+        client.force_authenticate(user)
+        return user, client
+
+    def enroll(self, client, course):
+        now = '2026-01-01T00:00:00Z'
+        response = client.post('/api/roadmaps/', {
+            'course_id': course.id, 'currentChapter': 0, 'currentConcept': 0, 'startedAt': now, 'lastAccessedAt': now,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def complete(self, client, course, count):
+        for concept in Concept.objects.filter(chapter__course=course).order_by('order')[:count]:
+            client.post(f'/api/concepts/{concept.id}/complete/')
+
+    def scores(self):
+        """{user_id: (concepts, roadmaps, points)}; all-zero rows are equivalent to no row."""
+        return {
+            row[0]: row[1:]
+            for row in LeaderboardScore.objects.values_list('user_id', 'concepts_completed', 'roadmaps_count', 'points')
+            if any(row[1:])
+        }
+
+    def test_incremental_scores_match_rebuild(self):
+        python, go = self.courses
+        _, ada = self.learner('ada', 'Ada')
+        _, bob = self.learner('bob')
+        _, cy = self.learner('cy')
+        self.enroll(ada, python)
+        self.enroll(ada, go)
+        self.complete(ada, python, 3)
+        self.complete(ada, go, 1)
+        self.enroll(bob, python)
+        self.complete(bob, python, 1)
+        self.complete(bob, python, 1)  # Already completed: no double count
+        roadmap_id = self.enroll(cy, go)
+        self.complete(cy, go, 2)
+        self.assertEqual(cy.delete(f'/api/roadmaps/{roadmap_id}/').status_code, 204)
+
+        incremental = self.scores()
+        self.assertEqual(leaderboard.rebuild_leaderboard(), 3)
+        self.assertEqual(self.scores(), incremental)
+
+    def test_cascade_deletes_are_subtracted(self):
+        python, go = self.courses
+        ada_user, ada = self.learner('ada')
+        bob_user, bob = self.learner('bob')
+        self.enroll(ada, python)
+        self.enroll(ada, go)
+        self.complete(ada, go, 2)
+        self.enroll(bob, go)
+        self.complete(bob, go, 1)
+
+        go.delete()
+        self.assertEqual(self.scores()[ada_user.id], (0, 1, 50))
+        bob_user.delete()
+        self.assertFalse(LeaderboardScore.objects.filter(user_id=bob_user.id).exists())
+
+        incremental = self.scores()
+        leaderboard.rebuild_leaderboard()
+        self.assertEqual(self.scores(), incremental)
+
+    def test_rename_updates_copied_username(self):
+        user, client = self.learner('old-name')
+        self.enroll(client, self.courses[0])
+        user.username = 'new-name'
+        user.save()
+        self.assertEqual(LeaderboardScore.objects.get(user=user).username, 'new-name')
+
+    def test_first_score_race_falls_back_to_update(self):
+        user, _ = self.learner('racer')
+        Roadmap.objects.create(user=user, course=self.courses[0])
+        # The concurrent request's row, with its own (stale) counts
+        LeaderboardScore.objects.create(user=user, username='racer')
+
+        with mock.patch.object(LeaderboardScore.objects, 'update_or_create', side_effect=IntegrityError('UNIQUE')):
+            score = leaderboard.refresh_user_score(user)
+
+        self.assertEqual((score.roadmaps_count, score.points), (1, 50))
+
+    def test_leaderboard_payload_matches_full_scan(self):
+        python, go = self.courses
+        for index, (username, first_name) in enumerate([('ann', 'Ann'), ('ben', ''), ('cat', 'Cat'), ('dan', ''), ('eve', ''), ('fay', '')]):
+            _, client = self.learner(username, first_name)
+            self.enroll(client, python)
+            self.complete(client, python, 1 + index % 3)
+        _, viewer = self.learner('viewer')
+
+        expected = []
+        for user in User.objects.filter(concept_progress__completed=True).distinct():
+            concepts = ConceptProgress.objects.filter(user=user, completed=True).count()
+            expected.append({
+                'rank': 0,
+                'name': f"{user.first_name} {user.last_name}".strip() or user.username,
+                'username': user.username,
+                'points': concepts * 10 + Roadmap.objects.filter(user=user).count() * 50,
+                'badge': '',
+            })
+        expected.sort(key=lambda entry: (-entry['points'], entry['username']))
+        expected = expected[:5]
+        for i, entry in enumerate(expected):
+            entry['rank'] = i + 1
+            entry['badge'] = ['🥇', '🥈', '🥉'][i] if i < 3 else str(i + 1)
+
+        self.assertEqual(viewer.get('/api/leaderboard/').json(), expected)
+
+
+    def seed_score(self, username, concepts, roadmaps=0):
+        user = User.objects.create_user(username=username)
+        LeaderboardScore.objects.create(
+            user=user, username=username, concepts_completed=concepts, roadmaps_count=roadmaps,
+            points=concepts * 10 + roadmaps * 50,
+        )
+        return user
+
+    def test_rank_ties_are_broken_by_username(self):
+        self.seed_score('zed', concepts=7)
+        bea = self.seed_score('bea', concepts=1, roadmaps=1)
+        amy = self.seed_score('amy', concepts=1, roadmaps=1)
+        cal = self.seed_score('cal', concepts=1, roadmaps=1)
+
+        self.assertEqual([leaderboard.get_rank(user) for user in (amy, bea, cal)], [2, 3, 4])
+        self.assertEqual([entry['username'] for entry in leaderboard.get_top()], ['zed', 'amy', 'bea', 'cal'])
+
+    def test_users_without_completions_are_not_ranked_ahead(self):
+        # 100 points from enrollments alone: off the board, so nobody ranks behind it
+        idle = self.seed_score('idle', concepts=0, roadmaps=2)
+        active = self.seed_score('active', concepts=1)
+
+        self.assertEqual(leaderboard.get_rank(active), 1)
+        self.assertNotIn('idle', [entry['username'] for entry in leaderboard.get_top()])
+        # ...but they still get the rank their points would have
+        self.assertEqual(leaderboard.get_rank(idle), 1)
+
+    def test_rank_for_user_without_score_row_is_built_from_history(self):
+        self.seed_score('leader', concepts=10)
+        newcomer = User.objects.create_user(username='newcomer')
+        Roadmap.objects.create(user=newcomer, course=self.courses[0])
+        concept = Concept.objects.filter(chapter__course=self.courses[0]).first()
+        ConceptProgress.objects.create(user=newcomer, concept=concept, completed=True)
+
+        self.assertEqual(leaderboard.get_rank(newcomer), 2)
+        self.assertEqual(LeaderboardScore.objects.get(user=newcomer).points, 60)
+        # No history at all: a zero row, ranked behind everyone on the board
+        self.assertEqual(leaderboard.get_rank(User.objects.create_user(username='lurker')), 3)
+
+
+@mock.patch.object(ContentDiscoveryService, 'enrich_with_videos', lambda data, topic: data)
+class RoadmapGenerationJobTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='learner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_post_returns_job_and_worker_builds_roadmap(self):
+        response = self.client.post('/api/roadmaps/generate/', {'topic': 'Django'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+        self.assertEqual(response.json()['stage'], 'queued')
+
+        with mock.patch.object(ContentDiscoveryService, 'generate_outline', return_value=json.loads(json.dumps(OUTLINE))):
+            self.assertEqual(roadmap_generation.run_pending(), 1)
+
+        data = self.client.get(f'/api/roadmaps/jobs/{job_id}/').json()
+        self.assertEqual(data['status'], 'SUCCEEDED')
+        self.assertEqual(data['stage'], 'done')
+        self.assertEqual(data['roadmap']['course']['title'], 'Learn Django')
+        concepts = data['roadmap']['course']['chapters'][0]['concepts']
+        self.assertEqual(concepts[1]['videoUrl'], 'https://www.youtube.com/results?search_query=django+views')
+
+    @override_settings(ROADMAP_JOB_RETRY_DELAY=0)
+    def test_transient_failures_are_retried(self):
+        job = roadmap_generation.enqueue(self.user, 'Django', 'beginner')
+        outline = mock.Mock(side_effect=[TimeoutError('slow'), json.loads(json.dumps(OUTLINE))])
+
+        with mock.patch.object(ContentDiscoveryService, 'generate_outline', outline):
+            roadmap_generation.run_pending(limit=1)
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('PENDING', 1))
+
+            roadmap_generation.run_pending(limit=1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('SUCCEEDED', 2))
+        self.assertIsNotNone(job.roadmap)
+
+    def test_permanent_failure_is_not_retried(self):
+        job = roadmap_generation.enqueue(self.user, 'Django', 'beginner')
+        with mock.patch.object(ContentDiscoveryService, 'generate_outline', return_value={'chapters': []}):
+            roadmap_generation.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(job.attempts, 1)
+
+    def test_polling_a_finished_job_does_not_grow_with_the_course(self):
+        def poll_queries(title, chapters):
+            job = roadmap_generation.enqueue(self.user, title, 'beginner')
+            course = make_course(title, chapters=chapters, concepts_per_chapter=4)
+            job.roadmap = Roadmap.objects.create(user=self.user, course=course)
+            job.status = 'SUCCEEDED'
+            job.save()
+            with CaptureQueriesContext(connection) as ctx:
+                data = self.client.get(f'/api/roadmaps/jobs/{job.id}/').json()
+            self.assertEqual(len(data['roadmap']['course']['chapters']), chapters)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(poll_queries('Small', 1), poll_queries('Large', 6))
+
+    def test_jobs_are_private(self):
+        job = roadmap_generation.enqueue(self.user, 'Django', 'beginner')
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username='other', password='pass12345'))
+        self.assertEqual(other.get(f'/api/roadmaps/jobs/{job.id}/').status_code, 404)
+
+
+@mock.patch.object(ContentDiscoveryService, 'enrich_with_videos', lambda data, topic: data)
+class GenerationCacheTests(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pass12345')
+        self.bob = User.objects.create_user(username='bob', password='pass12345')
+
+    def generate(self, user, topic, level='beginner'):
+        job = roadmap_generation.enqueue(user, topic, level)
+        roadmap_generation.run_pending()
+        job.refresh_from_db()
+        return job
+
+    def test_repeat_topic_reuses_generated_course(self):
+        outline = mock.Mock(side_effect=lambda *a: json.loads(json.dumps(OUTLINE)))
+        with mock.patch.object(ContentDiscoveryService, 'generate_outline', outline):
+            first = self.generate(self.alice, 'Django')
+            client = APIClient()
+            client.force_authenticate(self.bob)
+            response = client.post('/api/roadmaps/generate/', {'topic': '  django '}, format='json')
+
+        self.assertEqual(outline.call_count, 1)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], 'SUCCEEDED')
+        self.assertEqual(response.json()['roadmap']['course']['id'], first.roadmap.course_id)
+        self.assertEqual(Course.objects.count(), 1)
+
+    def test_skill_level_and_freshness_are_part_of_the_key(self):
+        outline = mock.Mock(side_effect=lambda *a: json.loads(json.dumps(OUTLINE)))
+        with mock.patch.object(ContentDiscoveryService, 'generate_outline', outline):
+            self.generate(self.alice, 'Django', 'beginner')
+            self.generate(self.bob, 'Django', 'advanced')
+            with override_settings(ROADMAP_CACHE_MAX_AGE=0):
+                self.generate(self.bob, 'Django', 'beginner')
+        self.assertEqual(outline.call_count, 3)
+
+    def test_identical_job_waits_for_running_leader(self):
+        leader = roadmap_generation.enqueue(self.alice, 'Django', 'beginner')
+        follower = roadmap_generation.enqueue(self.bob, 'Django', 'beginner')
+        self.assertTrue(roadmap_generation.claim(leader))
+        self.assertTrue(roadmap_generation.claim(follower))
+
+        roadmap_generation.process_job(follower)
+        follower.refresh_from_db()
+        self.assertEqual((follower.status, follower.attempts), ('PENDING', 0))
+
+        with mock.patch.object(ContentDiscoveryService, 'generate_outline', return_value=json.loads(json.dumps(OUTLINE))) as outline:
+            roadmap_generation.process_job(leader)
+            self.assertTrue(roadmap_generation.claim(follower))
+            roadmap_generation.process_job(follower)
+
+        self.assertEqual(outline.call_count, 1)
+        self.assertEqual(follower.status, 'SUCCEEDED')
+        self.assertEqual(follower.roadmap.course_id, leader.roadmap.course_id)
+
+
+class CourseTreeTests(TestCase):
+
+    CHAPTERS = [
+        {'title': 'Basics', 'concepts': [
+            {'title': 'Variables', 'assessment': {'questions': [{'question': 'Var?'}]}},
+            {'title': 'Types'},
+        ]},
+        {'title': 'Functions', 'order': 5, 'concepts': [
+            {'title': 'Arguments', 'order': 9},
+            {'title': 'Closures', 'assessment': {'questions': [{'question': 'Closure?'}], 'time_limit': 5}},
+        ]},
+    ]
+
+    def without_returning(self):
+        """Simulates a backend without INSERT ... RETURNING: bulk_create leaves pk unset."""
+        return mock.patch.object(
+            type(connection.features), 'can_return_rows_from_bulk_insert',
+            new_callable=mock.PropertyMock, return_value=False,
+        )
+
+    def assert_tree(self, course):
+        chapters = list(course.chapters.order_by('id').values_list('title', 'order'))
+        self.assertEqual(chapters, [('Basics', 1), ('Functions', 5)])
+        concepts = list(Concept.objects.filter(chapter__course=course).order_by('id').values_list('chapter__title', 'title', 'order'))
+        self.assertEqual(concepts, [
+            ('Basics', 'Variables', 1), ('Basics', 'Types', 2), ('Functions', 'Arguments', 9), ('Functions', 'Closures', 2),
+        ])
+        assessments = dict(Assessment.objects.filter(concept__chapter__course=course).values_list('concept__title', 'questions'))
+        self.assertEqual(assessments, {'Variables': [{'question': 'Var?'}], 'Closures': [{'question': 'Closure?'}]})
+
+    def test_builds_tree_with_default_orders_and_paired_assessments(self):
+        make_course('Other course', chapters=1, concepts_per_chapter=2)  # Rows that must not be picked up
+        with CaptureQueriesContext(connection) as ctx:
+            course = course_tree.create_course_tree({'title': 'Python', 'description': 'd'}, self.CHAPTERS)
+        inserts = [q['sql'].split('"')[1] for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(inserts, ['api_course', 'api_chapter', 'api_concept', 'api_assessment'])
+        self.assert_tree(course)
+        self.assertEqual(Assessment.objects.get(concept__title='Closures').time_limit, 5)
+
+    def test_rereads_pks_in_insertion_order_without_returning(self):
+        make_course('Other course', chapters=1, concepts_per_chapter=2)
+        with self.without_returning(), CaptureQueriesContext(connection) as ctx:
+            course = course_tree.create_course_tree({'title': 'Python', 'description': 'd'}, self.CHAPTERS)
+        self.assert_tree(course)
+        rereads = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(rereads), 2)  # chapter and concept PKs
+
+    def test_with_pks_keeps_objects_that_already_have_pks(self):
+        chapter = Chapter.objects.create(course=make_course('Keyed', chapters=0), title='Kept', order=1)
+        with self.without_returning():
+            self.assertEqual(course_tree._with_pks([chapter], Chapter.objects.none()), [chapter])
+            self.assertEqual(course_tree._with_pks([], Chapter.objects.none()), [])
+
+    def test_failure_rolls_back_the_whole_tree(self):
+        chapters = [{'title': 'Broken', 'concepts': [{'title': 'Bad quiz', 'assessment': {'no_such_field': 1}}]}]
+        with self.assertRaises(TypeError):
+            course_tree.create_course_tree({'title': 'Half written', 'description': 'd'}, chapters)
+        self.assertFalse(Course.objects.filter(title='Half written').exists())
+        self.assertFalse(Chapter.objects.filter(title='Broken').exists())
+        self.assertFalse(Concept.objects.filter(title='Bad quiz').exists())
+
+
+@override_settings(GENERATION_POLL_INTERVAL=0.05)
+class SingleFlightGenerationTests(TransactionTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='learner', password='pass12345')
+        course = make_course('Cohort', chapters=1, concepts_per_chapter=1)
+        self.concept = Concept.objects.get(chapter__course=course)
+        self.concept.notes = f"# Intro\n\n{roadmap_generation.NOTES_PLACEHOLDER}"
+        self.concept.save()
+
+    def post_in_parallel(self, url, count):
+        results = []
+
+        def worker():
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                response = client.post(url)
+                results.append((response.status_code, response.json()))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_notes_requests_generate_once(self):
+        def slow_notes(title, context):
+            time.sleep(0.5)
+            return '# Real notes'
+
+        with mock.patch.object(NotesGeneratorService, 'generate_notes', side_effect=slow_notes) as generate:
+            results = self.post_in_parallel(f'/api/concepts/{self.concept.id}/generate-notes/', 6)
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual([code for code, _ in results], [200] * 6)
+        self.assertTrue(all(body['notes'] == '# Real notes' for _, body in results))
+        self.assertEqual(sum(not body['cached'] for _, body in results), 1)
+
+    @override_settings(GENERATION_WAIT_TIMEOUT=0.2)
+    def test_waiters_get_pending_when_generation_is_slow(self):
+        def slow_quiz(topic, notes):
+            time.sleep(1.0)
+            return [{'question': 'Q?', 'options': ['A'], 'correctAnswer': 'A'}]
+
+        with mock.patch.object(QuizGeneratorService, 'generate_quiz', side_effect=slow_quiz) as generate:
+            results = self.post_in_parallel(f'/api/concepts/{self.concept.id}/generate-quiz/', 4)
+
+        self.assertEqual(generate.call_count, 1)
+        codes = sorted(code for code, _ in results)
+        self.assertEqual(codes, [200, 202, 202, 202])
+        # The lock is released once the leader finishes
+        self.assertTrue(single_flight.acquire(f"quiz:{self.concept.id}"))
+
+
+@override_settings(WARMUP_LOOKAHEAD=2, WARMUP_RETRY_DELAY=0)
+class WarmupTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='learner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.course = make_course('Warm', chapters=2, concepts_per_chapter=3)
+        self.concepts = list(Concept.objects.filter(chapter__course=self.course).order_by('chapter__order', 'order'))
+
+    def queued(self):
+        return list(WarmupTask.objects.filter(status='PENDING').order_by('-priority').values_list('concept_id', 'kind'))
+
+    def test_roadmap_creation_queues_current_and_lookahead(self):
+        now = '2026-01-01T00:00:00Z'
+        response = self.client.post('/api/roadmaps/', {
+            'course_id': self.course.id, 'currentChapter': 0, 'currentConcept': 0,
+            'startedAt': now, 'lastAccessedAt': now,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        first, second, third = (c.id for c in self.concepts[:3])
+        self.assertEqual(self.queued(), [
+            (first, 'notes'), (first, 'quiz'),
+            (second, 'notes'), (second, 'quiz'),
+            (third, 'notes'), (third, 'quiz'),
+        ])
+
+    def test_completing_a_concept_moves_the_next_one_to_the_front(self):
+        roadmap = Roadmap.objects.create(user=self.user, course=self.course)
+        warmup.schedule_for_roadmap(roadmap)
+
+        self.client.post(f'/api/concepts/{self.concepts[0].id}/complete/')
+
+        current = WarmupTask.objects.get(concept=self.concepts[1], kind='notes')
+        self.assertEqual(current.priority, warmup.PRIORITY_CURRENT)
+        self.assertLess(self.queued().index((self.concepts[1].id, 'notes')), self.queued().index((self.concepts[2].id, 'notes')))
+        # The window slides forward by one concept
+        self.assertTrue(WarmupTask.objects.filter(concept=self.concepts[3]).exists())
+
+    def test_completion_reads_only_the_lookahead_window(self):
+        Roadmap.objects.create(user=self.user, course=self.course)
+        self.client.post(f'/api/concepts/{self.concepts[2].id}/complete/')  # Done ahead of time
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(f'/api/concepts/{self.concepts[1].id}/complete/')
+
+        concept_reads = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT "api_concept"."id" AS "id" FROM "api_concept"')]
+        self.assertEqual(len(concept_reads), 1)
+        self.assertIn('LIMIT 3', concept_reads[0])
+        current = WarmupTask.objects.filter(priority=warmup.PRIORITY_CURRENT, kind='notes').latest('updated_at')
+        self.assertEqual(current.concept_id, self.concepts[3].id)  # Skips the completed one
+
+    def test_worker_runs_by_priority_and_skips_existing_content(self):
+        roadmap = Roadmap.objects.create(user=self.user, course=self.course)
+        Assessment.objects.create(concept=self.concepts[0], questions=[{'question': 'Q?'}])
+        warmup.schedule_for_roadmap(roadmap, lookahead=1)
+
+        order = []
+
+        def notes(title, context):
+            order.append(('notes', title))
+            return f'# {title}'
+
+        def quiz(topic, notes):
+            order.append(('quiz', topic))
+            return [{'question': 'Q?', 'options': ['A'], 'correctAnswer': 'A'}]
+
+        with mock.patch.object(NotesGeneratorService, 'generate_notes', side_effect=notes), \
+                mock.patch.object(QuizGeneratorService, 'generate_quiz', side_effect=quiz):
+            processed = warmup.run_pending()
+
+        self.assertEqual(processed, 4)
+        self.assertEqual(order, [('notes', 'Concept 1.1'), ('notes', 'Concept 1.2'), ('quiz', 'Concept 1.2')])
+        self.assertFalse(WarmupTask.objects.exclude(status='DONE').exists())
+        self.assertEqual(Concept.objects.get(id=self.concepts[1].id).notes, '# Concept 1.2')
+
+    def test_failures_are_retried_then_marked_failed(self):
+        warmup.schedule({(self.concepts[0].id, 'notes'): 1})
+
+        with override_settings(WARMUP_MAX_ATTEMPTS=2), \
+                mock.patch.object(NotesGeneratorService, 'generate_notes', side_effect=TimeoutError('quota')) as generate:
+            warmup.run_pending()
+
+        task = WarmupTask.objects.get()
+        self.assertEqual(generate.call_count, 2)
+        self.assertEqual((task.status, task.attempts), ('FAILED', 2))
+
+    def test_gemini_error_leaves_notes_unchanged_and_task_pending(self):
+        Concept.objects.filter(id=self.concepts[0].id).update(notes='')
+        warmup.schedule({(self.concepts[0].id, 'notes'): 1})
+
+        model = mock.Mock()
+        model.generate_content.side_effect = RuntimeError('429 quota exceeded')
+        with mock.patch('api.services.genai.GenerativeModel', return_value=model):
+            warmup.run_pending(limit=1)
+            response = self.client.post(f'/api/concepts/{self.concepts[0].id}/generate-notes/')
+
+        task = WarmupTask.objects.get()
+        self.assertEqual((task.status, task.attempts), ('PENDING', 1))
+        self.assertEqual(task.error, 'Gemini returned no notes')
+        self.assertEqual(Concept.objects.get(id=self.concepts[0].id).notes, '')
+        # The user still sees the placeholder, but it is not stored
+        self.assertIn('Notes will be generated', response.json()['notes'])
+        self.assertIsNone(concept_content.stored_notes(self.concepts[0].id))
+
+    def test_token_bucket_limits_call_rate(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = rate_limit.TokenBucket(rate_per_minute=6, capacity=1, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            bucket.acquire()
+
+        # 1 burst token, then one call every 10 seconds
+        self.assertAlmostEqual(now[0], 20.0)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_token_bucket_rejects_non_positive_rate(self):
+        for rate in (0, -5):
+            with self.assertRaises(ValueError):
+                rate_limit.TokenBucket(rate_per_minute=rate)
+
+
+class StubTwilioClient:
+    """Records messages instead of calling Twilio; `fail_with` makes every send raise."""
+    sent = []
+    fail_with = None
+    instances = 0
+
+    def __init__(self, *args, **kwargs):
+        StubTwilioClient.instances += 1
+        self.messages = self
+
+    def create(self, **kwargs):
+        if StubTwilioClient.fail_with:
+            raise StubTwilioClient.fail_with
+        StubTwilioClient.sent.append(kwargs)
+
+
+class TwilioError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', NOTIFICATION_RETRY_DELAY=0)
+@mock.patch.object(notification_transport, 'Client', StubTwilioClient)
+class NotificationOutboxTests(TestCase):
+
+    def setUp(self):
+        StubTwilioClient.sent = []
+        StubTwilioClient.fail_with = None
+        StubTwilioClient.instances = 0
+        notification_transport.reset_twilio_client()
+        self.addCleanup(notification_transport.reset_twilio_client)
+        self.user = User.objects.create_user(username='learner', email='learner@example.com', password='pass12345')
+        LearnerProfile.objects.create(user=self.user, phone_number='+15550001111')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_course_completion_queues_instead_of_sending(self):
+        course = make_course('Tiny', chapters=1, concepts_per_chapter=1)
+        Roadmap.objects.create(user=self.user, course=course)
+        concept = Concept.objects.get(chapter__course=course)
+
+        response = self.client.post(f'/api/concepts/{concept.id}/complete/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(StubTwilioClient.sent, [])
+        self.assertEqual(
+            sorted(NotificationOutbox.objects.values_list('channel', 'status')),
+            [('EMAIL', 'PENDING'), ('WHATSAPP', 'PENDING')]
+        )
+        self.assertEqual(set(NotificationLog.objects.values_list('status', flat=True)), {'QUEUED'})
+
+    def test_dispatcher_delivers_and_updates_logs(self):
+        notifications.queue_email_notification(
+            self.user, 'Certificate', 'Attached.', attachment=('cert.pdf', b'%PDF-1.4', 'application/pdf')
+        )
+        notifications.queue_whatsapp_notification(self.user, 'Well done!')
+
+        counts = notifications.dispatch_pending()
+
+        self.assertEqual(counts, {'sent': 2, 'retrying': 0, 'dead': 0})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['learner@example.com'])
+        self.assertEqual(mail.outbox[0].attachments[0][1], b'%PDF-1.4')
+        self.assertEqual(StubTwilioClient.sent[0]['to'], 'whatsapp:+15550001111')
+        self.assertEqual(set(NotificationOutbox.objects.values_list('status', flat=True)), {'SENT'})
+        self.assertEqual(set(NotificationLog.objects.values_list('status', flat=True)), {'SENT'})
+
+    @override_settings(NOTIFICATION_MAX_ATTEMPTS=3)
+    def test_transient_failures_back_off_then_dead_letter(self):
+        StubTwilioClient.fail_with = ConnectionError('twilio down')
+        item = notifications.queue_whatsapp_notification(self.user, 'Hello')
+
+        counts = notifications.dispatch_pending()
+
+        item.refresh_from_db()
+        self.assertEqual(counts, {'sent': 0, 'retrying': 2, 'dead': 1})
+        self.assertEqual((item.status, item.attempts), ('DEAD', 3))
+        self.assertEqual(item.log.status, 'FAILED')
+        self.assertEqual(item.log.error_message, 'twilio down')
+
+    @override_settings(NOTIFICATION_RETRY_DELAY=30)
+    def test_retry_waits_for_backoff(self):
+        StubTwilioClient.fail_with = ConnectionError('twilio down')
+        item = notifications.queue_whatsapp_notification(self.user, 'Hello')
+
+        self.assertEqual(notifications.dispatch_batch(), {'sent': 0, 'retrying': 1, 'dead': 0})
+        # Not due again yet
+        self.assertEqual(notifications.dispatch_batch(), {'sent': 0, 'retrying': 0, 'dead': 0})
+
+        item.refresh_from_db()
+        self.assertEqual(item.status, 'PENDING')
+        self.assertEqual(item.log.status, 'QUEUED')
+
+    def test_permanent_error_is_dead_lettered_immediately(self):
+        StubTwilioClient.fail_with = TwilioError(400)
+        item = notifications.queue_whatsapp_notification(self.user, 'Hello')
+
+        notifications.dispatch_pending()
+
+        item.refresh_from_db()
+        self.assertEqual((item.status, item.attempts), ('DEAD', 1))
+
+    def test_batches_reuse_one_smtp_connection_and_twilio_client(self):
+        others = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com')
+            for i in range(5)
+        ]
+        for user in [self.user] + others:
+            notifications.queue_email_notification(user, 'Reminder', 'Time to study!')
+            LearnerProfile.objects.get_or_create(user=user, defaults={'phone_number': f'+1555000{user.id:04d}'})
+            notifications.queue_whatsapp_notification(user, 'Time to study!')
+
+        with mock.patch.object(notification_transport, 'get_connection', wraps=notification_transport.get_connection) as get_connection:
+            counts = notifications.dispatch_pending()
+
+        self.assertEqual(counts['sent'], 12)
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(StubTwilioClient.sent), 6)
+        self.assertEqual(StubTwilioClient.instances, 1)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', REMINDER_SMTP_BATCH=2)
+@mock.patch.object(notification_transport, 'Client', StubTwilioClient)
+class ReminderCampaignTests(TestCase):
+
+    def setUp(self):
+        StubTwilioClient.sent = []
+        StubTwilioClient.fail_with = None
+        notification_transport.reset_twilio_client()
+        self.addCleanup(notification_transport.reset_twilio_client)
+        self.today = timezone.now().date()
+
+        self.due = []
+        for i in range(5):
+            user = self.make_user(f'due{i}')
+            if i % 2:
+                UserProgress.objects.create(user=user, last_activity_date=self.today - timedelta(days=1))
+            self.due.append(user)
+
+        UserProgress.objects.create(user=self.make_user('studied'), last_activity_date=self.today)
+        self.make_user('nogoal', daily_study_time=0)
+        User.objects.create_user(username='noprofile', email='noprofile@example.com')
+
+    def make_user(self, username, daily_study_time=30):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com')
+        LearnerProfile.objects.create(user=user, daily_study_time=daily_study_time, phone_number=f'+1555{user.id:07d}')
+        return user
+
+    def test_selects_only_due_users(self):
+        self.assertEqual(
+            sorted(reminders.due_users(self.today).values_list('username', flat=True)),
+            [user.username for user in self.due]
+        )
+
+    def test_campaign_sends_and_bulk_logs(self):
+        with CaptureQueriesContext(connection) as ctx:
+            campaign = reminders.run_campaign(self.today, batch_size=100)
+
+        self.assertEqual((campaign.status, campaign.users_processed), ('COMPLETED', 5))
+        self.assertEqual((campaign.sent, campaign.failed), (10, 0))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(u.email for u in self.due))
+        self.assertEqual(len(StubTwilioClient.sent), 5)
+        self.assertIn('30-minute', mail.outbox[0].subject)
+        self.assertEqual(NotificationLog.objects.filter(event_name=reminders.EVENT_NAME, status='SENT').count(), 10)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "api_notificationlog"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_interrupted_campaign_resumes_after_last_batch(self):
+        def crash(campaign):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            reminders.run_campaign(self.today, channels=('EMAIL',), batch_size=2, on_batch=crash)
+
+        campaign = ReminderCampaign.objects.get(date=self.today)
+        self.assertEqual((campaign.status, campaign.cursor), ('RUNNING', self.due[1].id))
+        self.assertEqual(len(mail.outbox), 2)
+
+        campaign = reminders.run_campaign(self.today, channels=('EMAIL',), batch_size=2)
+
+        self.assertEqual((campaign.status, campaign.users_processed), ('COMPLETED', 5))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(len({m.to[0] for m in mail.outbox}), 5)
+
+        # Completed campaigns are not re-sent
+        reminders.run_campaign(self.today, channels=('EMAIL',))
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_failed_sends_are_logged(self):
+        StubTwilioClient.fail_with = ConnectionError('twilio down')
+
+        campaign = reminders.run_campaign(self.today, channels=('WHATSAPP',))
+
+        self.assertEqual((campaign.sent, campaign.failed), (0, 5))
+        log = NotificationLog.objects.filter(notification_type='WHATSAPP').first()
+        self.assertEqual((log.status, log.error_message), ('FAILED', 'twilio down'))
+
+    def test_second_run_backs_off_while_first_holds_the_campaign(self):
+        def overlap(campaign):
+            # A second send_daily_reminders starts while the first is mid-campaign
+            self.assertIsNone(reminders.run_campaign(self.today, channels=('EMAIL',), batch_size=2))
+
+        campaign = reminders.run_campaign(self.today, channels=('EMAIL',), batch_size=2, on_batch=overlap)
+
+        self.assertEqual((campaign.status, campaign.users_processed, campaign.locked_at), ('COMPLETED', 5, None))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(len({m.to[0] for m in mail.outbox}), 5)
+
+    def test_stale_lease_is_taken_over(self):
+        stale = timezone.now() - timedelta(seconds=settings.REMINDER_CAMPAIGN_STALE_AFTER + 1)
+        ReminderCampaign.objects.create(date=self.today, cursor=self.due[1].id, users_processed=2, locked_at=stale)
+
+        campaign = reminders.run_campaign(self.today, channels=('EMAIL',))
+
+        self.assertEqual((campaign.status, campaign.users_processed), ('COMPLETED', 5))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(u.email for u in self.due[2:]))
+
+    @override_settings(REMINDER_EMAIL_RATE_PER_MINUTE=0)
+    def test_zero_rate_sends_unthrottled(self):
+        campaign = reminders.run_campaign(self.today, channels=('EMAIL',))
+        self.assertEqual((campaign.status, campaign.sent), ('COMPLETED', 5))
+
+    def test_run_that_lost_its_lease_stops_sending(self):
+        def taken_over(campaign):
+            ReminderCampaign.objects.filter(pk=campaign.pk).update(locked_at=timezone.now() + timedelta(seconds=1))
+
+        self.assertIsNone(reminders.run_campaign(self.today, channels=('EMAIL',), batch_size=2, on_batch=taken_over))
+        self.assertEqual(len(mail.outbox), 4)  # The in-flight batch, not the rest
+        self.assertEqual(ReminderCampaign.objects.get(date=self.today).status, 'RUNNING')
+
+
+class CertificateCacheTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='grad', email='grad@example.com', first_name='Ada', last_name='Lovelace')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        course = make_course('Analytical Engines', chapters=1, concepts_per_chapter=1)
+        self.roadmap = Roadmap.objects.create(user=self.user, course=course, progress=100, completed_at=timezone.now())
+        self.url = f'/api/roadmaps/{self.roadmap.id}/certificate/'
+
+    def download(self, **headers):
+        with mock.patch.object(certificate_cache, 'generate_certificate_pdf', wraps=certificate_cache.generate_certificate_pdf) as render:
+            response = self.client.get(self.url, **headers)
+        return response, render.call_count
+
+    def test_repeat_downloads_serve_stored_pdf(self):
+        first, first_renders = self.download()
+        second, second_renders = self.download()
+
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual((first_renders, second_renders), (1, 0))
+        self.assertEqual(first.content, second.content)
+        self.assertTrue(first.content.startswith(b'%PDF'))
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(CertificateArtifact.objects.count(), 1)
+
+    def test_if_none_match_returns_304(self):
+        etag = self.download()[0]['ETag']
+
+        response, renders = self.download(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(renders, 0)
+        self.assertEqual(self.download(HTTP_IF_NONE_MATCH='"stale"')[0].status_code, 200)
+
+    def test_template_version_bump_rerenders(self):
+        self.download()
+
+        bumped = certificate_cache.TEMPLATE_VERSION + 1
+        with mock.patch.object(certificate_cache, 'TEMPLATE_VERSION', bumped):
+            response, renders = self.download()
+
+        self.assertEqual((response.status_code, renders), (200, 1))
+        self.assertEqual(list(CertificateArtifact.objects.values_list('template_version', flat=True)), [bumped])
+
+    def test_notifications_only_on_first_issue(self):
+        self.download()
+        self.download()
+
+        self.assertEqual(NotificationOutbox.objects.filter(channel='EMAIL').count(), 1)
+
+
+class CertificateRendererTests(SimpleTestCase):
+
+    def test_assets_load_once(self):
+        with mock.patch.object(certificate, '_assets', None), \
+                mock.patch.object(certificate, '_load_asset', wraps=certificate._load_asset) as load:
+            first = certificate.generate_certificate_pdf('Ada Lovelace', 'Engines', 'January 01, 2026', 'CERT1')
+            second = certificate.generate_certificate_pdf('Grace Hopper', 'Compilers', 'January 02, 2026', 'CERT2')
+
+        self.assertEqual(load.call_count, len(certificate.ASSETS))
+        for pdf in (first, second):
+            self.assertTrue(pdf.startswith(b'%PDF'))
+            self.assertNotIn(b'ASCII85Decode', pdf)
+
+    def test_ascii85_switch_is_restored_after_rendering(self):
+        from io import BytesIO
+        from reportlab import rl_config
+        from reportlab.pdfgen import canvas as pdf_canvas
+
+        before = rl_config.useA85
+        certificate.generate_certificate_pdf('Ada Lovelace', 'Engines', 'January 01, 2026', 'CERT1')
+        self.assertEqual(rl_config.useA85, before)
+
+        buffer = BytesIO()
+        other = pdf_canvas.Canvas(buffer)
+        other.drawString(100, 100, 'Unrelated report')
+        other.save()
+        self.assertIn(b'ASCII85Decode', buffer.getvalue())
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class CertificateBatchTests(TestCase):
+
+    def setUp(self):
+        self.course = make_course('Cohort Course', chapters=1, concepts_per_chapter=1)
+        self.completed = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'grad{i}', email=f'grad{i}@example.com')
+            self.completed.append(Roadmap.objects.create(user=user, course=self.course, progress=100, completed_at=timezone.now()))
+        dropout = User.objects.create_user(username='dropout', email='dropout@example.com')
+        self.unfinished = Roadmap.objects.create(user=dropout, course=self.course, progress=40)
+
+    def test_cohort_is_issued_rendered_and_emailed(self):
+        progress = []
+        stats = certificate_batch.generate_certificates(
+            Roadmap.objects.filter(course=self.course), workers=2, email=True,
+            on_progress=lambda done, total: progress.append((done, total))
+        )
+
+        self.assertEqual((stats['roadmaps'], stats['issued'], stats['rendered'], stats['emailed']), (3, 3, 3, 3))
+        self.assertEqual(progress[-1], (3, 3))
+        ids = set(Roadmap.objects.exclude(certificate_id=None).values_list('certificate_id', flat=True))
+        self.assertEqual(len(ids), 3)
+        self.unfinished.refresh_from_db()
+        self.assertIsNone(self.unfinished.certificate_id)
+        self.assertEqual(set(CertificateArtifact.objects.values_list('certificate_id', flat=True)), ids)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertTrue(mail.outbox[0].attachments[0][1].startswith(b'%PDF'))
+        self.assertEqual(NotificationLog.objects.filter(event_name=certificate_batch.EVENT_NAME, status='SENT').count(), 3)
+
+    def test_rerun_skips_stored_certificates_and_keeps_ids(self):
+        certificate_batch.generate_certificates(Roadmap.objects.all(), workers=1)
+        ids = dict(Roadmap.objects.values_list('id', 'certificate_id'))
+
+        stats = certificate_batch.generate_certificates(Roadmap.objects.all(), workers=1)
+
+        self.assertEqual((stats['issued'], stats['rendered'], stats['skipped']), (0, 0, 3))
+        self.assertEqual(dict(Roadmap.objects.values_list('id', 'certificate_id')), ids)
+
+    def test_email_only_goes_to_certificates_issued_in_this_run(self):
+        certificate_batch.generate_certificates(Roadmap.objects.filter(id=self.completed[0].id), workers=1, email=True)
+        self.assertEqual(len(mail.outbox), 1)
+
+        stats = certificate_batch.generate_certificates(Roadmap.objects.all(), workers=1, email=True)
+
+        self.assertEqual((stats['issued'], stats['emailed']), (2, 2))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['grad0@example.com', 'grad1@example.com', 'grad2@example.com'])
+
+    def test_failed_render_is_reported_and_does_not_abort_the_batch(self):
+        real = certificate_batch.generate_certificate_pdf
+
+        def flaky(user_name, *args):
+            if user_name == 'grad1':
+                raise ValueError('bad glyph')
+            return real(user_name, *args)
+
+        with mock.patch.object(certificate_batch, 'generate_certificate_pdf', side_effect=flaky):
+            stats = certificate_batch.generate_certificates(Roadmap.objects.all(), workers=1, email=True)
+
+        failed_id = Roadmap.objects.get(user__username='grad1').certificate_id
+        self.assertEqual((stats['rendered'], stats['failed'], stats['skipped'], stats['emailed']), (2, 1, 0, 2))
+        self.assertEqual(stats['errors'], {failed_id: 'ValueError: bad glyph'})
+        self.assertFalse(CertificateArtifact.objects.filter(certificate_id=failed_id).exists())
+
+    def test_admin_action_only_assigns_ids(self):
+        admin_user = User.objects.create_superuser(username='admin', password='pass12345', email='a@example.com')
+        self.client.force_login(admin_user)
+        with mock.patch.object(certificate_batch, 'generate_certificates') as generate:
+            response = self.client.post('/admin/api/roadmap/', {
+                'action': 'generate_roadmap_certificates',
+                '_selected_action': [roadmap.id for roadmap in self.completed] + [self.unfinished.id],
+            }, follow=True)
+
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Roadmap.objects.exclude(certificate_id=None).count(), 3)
+        self.assertFalse(CertificateArtifact.objects.exists())
+        self.assertContains(response, 'manage.py generate_certificates --roadmaps')
+
+    def test_batch_ids_match_download_endpoint(self):
+        certificate_batch.generate_certificates(Roadmap.objects.filter(id=self.completed[0].id), workers=1)
+        roadmap = Roadmap.objects.get(id=self.completed[0].id)
+        client = APIClient()
+        client.force_authenticate(roadmap.user)
+
+        response = client.get(f'/api/roadmaps/{roadmap.id}/certificate/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, bytes(CertificateArtifact.objects.get(certificate_id=roadmap.certificate_id).pdf))
+
+
+class VerifyCertificateTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='grad', first_name='Ada', last_name='Lovelace')
+        course = make_course('Analytical Engines', chapters=1, concepts_per_chapter=1)
+        self.roadmap = Roadmap.objects.create(
+            user=self.user, course=course, progress=100, completed_at=timezone.now(), certificate_id='ABCDEF123456'
+        )
+        self.client = APIClient()
+
+    def test_one_joined_query_then_served_from_cache(self):
+        with self.assertNumQueries(1):
+            first = self.client.get('/api/certificates/verify/ABCDEF123456/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/certificates/verify/ABCDEF123456/')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(first.json()['student_name'], 'Ada Lovelace')
+        self.assertEqual(first.json()['course_title'], 'Analytical Engines')
+        self.assertEqual(first['Cache-Control'], 'public, no-cache')
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get('/api/certificates/verify/ABCDEF123456/')['ETag']
+
+        response = self.client.get('/api/certificates/verify/ABCDEF123456/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_unknown_id_is_negatively_cached_until_issued(self):
+        roadmap = Roadmap.objects.create(user=self.user, course=make_course('Second'), progress=100)
+        cert_id = certificate.make_certificate_id(self.user.id, roadmap.id, 'Second')
+
+        self.assertEqual(self.client.get(f'/api/certificates/verify/{cert_id}/').status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(f'/api/certificates/verify/{cert_id}/').status_code, 404)
+
+        owner = APIClient()
+        owner.force_authenticate(self.user)
+        owner.get(f'/api/roadmaps/{roadmap.id}/certificate/')
+
+        self.assertEqual(self.client.get(f'/api/certificates/verify/{cert_id}/').status_code, 200)
+
+    def test_deleted_roadmap_stops_verifying(self):
+        self.assertEqual(self.client.get('/api/certificates/verify/ABCDEF123456/').status_code, 200)
+
+        owner = APIClient()
+        owner.force_authenticate(self.user)
+        self.assertEqual(owner.delete(f'/api/roadmaps/{self.roadmap.id}/').status_code, 204)
+
+        self.assertEqual(self.client.get('/api/certificates/verify/ABCDEF123456/').status_code, 404)
+
+    def test_course_deletion_and_new_concepts_revoke_certificates(self):
+        self.assertEqual(self.client.get('/api/certificates/verify/ABCDEF123456/').status_code, 200)
+        Concept.objects.create(chapter=self.roadmap.course.chapters.first(), title='Late addition', order=2)
+        roadmap_progress.reconcile_roadmaps()
+        self.assertEqual(self.client.get('/api/certificates/verify/ABCDEF123456/').status_code, 400)
+
+        self.roadmap.course.delete()
+        self.assertEqual(self.client.get('/api/certificates/verify/ABCDEF123456/').status_code, 404)
+
+    def test_renamed_holder_is_not_served_stale(self):
+        self.assertEqual(self.client.get('/api/certificates/verify/ABCDEF123456/').json()['student_name'], 'Ada Lovelace')
+
+        self.user.last_name = 'King'
+        self.user.save(update_fields=['last_name'])
+
+        self.assertEqual(self.client.get('/api/certificates/verify/ABCDEF123456/').json()['student_name'], 'Ada King')
+
+    def test_per_process_cache_keeps_entries_briefly(self):
+        with mock.patch.object(certificate_verification.cache, 'set', wraps=certificate_verification.cache.set) as cache_set:
+            self.client.get('/api/certificates/verify/ABCDEF123456/')
+        self.assertEqual(cache_set.call_args.args[2], settings.CERTIFICATE_VERIFY_LOCAL_TTL)
+
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379'}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(certificate_verification._ttl(200), settings.CERTIFICATE_VERIFY_CACHE_TTL)
+            self.assertEqual(certificate_verification._ttl(404), settings.CERTIFICATE_VERIFY_NEGATIVE_TTL)
+
+
+class RoadmapProgressCounterTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='counter')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def enroll(self, course):
+        return roadmap_generation.enroll(self.user, course)
+
+    def complete(self, concept):
+        return self.client.post(f'/api/concepts/{concept.id}/complete/')
+
+    def queries_for_completion(self, course):
+        self.enroll(course)
+        # Warm the user's stats/leaderboard rows so only the steady-state path is measured
+        concepts = list(Concept.objects.filter(chapter__course=course).order_by('id'))
+        self.complete(concepts[0])
+        with CaptureQueriesContext(connection) as ctx:
+            self.complete(concepts[1])
+        return [q['sql'] for q in ctx.captured_queries if 'api_roadmap' in q['sql'] or 'api_conceptprogress' in q['sql']]
+
+    def test_enroll_sets_counters_and_completion_bumps_them(self):
+        course = make_course('Counted', chapters=1, concepts_per_chapter=3)
+        roadmap = self.enroll(course)
+        self.assertEqual((roadmap.completed_concepts, roadmap.total_concepts, roadmap.progress), (0, 3, 0))
+
+        first, second, third = Concept.objects.filter(chapter__course=course).order_by('id')
+        self.complete(first)
+        self.complete(first)  # Repeat clicks don't double count
+        self.complete(second)
+
+        roadmap.refresh_from_db()
+        self.assertEqual((roadmap.completed_concepts, roadmap.progress, roadmap.completed_at), (2, 66, None))
+
+        self.complete(third)
+        roadmap.refresh_from_db()
+        self.assertEqual((roadmap.completed_concepts, roadmap.progress), (3, 100))
+        self.assertIsNotNone(roadmap.completed_at)
+        self.assertEqual(NotificationOutbox.objects.count(), 0)  # No email/phone on file
+
+    def test_roadmap_query_count_does_not_grow_with_course_size(self):
+        small = self.queries_for_completion(make_course('Small', chapters=1, concepts_per_chapter=3))
+        large = self.queries_for_completion(make_course('Large', chapters=10, concepts_per_chapter=20))
+        self.assertEqual(len(small), len(large))
+        self.assertFalse(any('COUNT(' in sql for sql in large))
+
+    def test_roadmap_without_counters_is_initialized_on_first_completion(self):
+        course = make_course('Legacy', chapters=1, concepts_per_chapter=2)
+        roadmap = Roadmap.objects.create(user=self.user, course=course)
+        concept = Concept.objects.filter(chapter__course=course).first()
+
+        self.complete(concept)
+
+        roadmap.refresh_from_db()
+        self.assertEqual((roadmap.completed_concepts, roadmap.total_concepts, roadmap.progress), (1, 2, 50))
+
+    def test_concept_added_after_enrollment_keeps_roadmap_open(self):
+        course = make_course('Growing', chapters=1, concepts_per_chapter=2)
+        roadmap = self.enroll(course)
+        first, second = Concept.objects.filter(chapter__course=course).order_by('id')
+        self.complete(first)
+
+        Concept.objects.create(chapter=course.chapters.first(), title='Late addition', order=3)
+        self.complete(second)
+
+        roadmap.refresh_from_db()
+        self.assertEqual((roadmap.completed_concepts, roadmap.total_concepts, roadmap.progress), (2, 3, 66))
+        self.assertIsNone(roadmap.completed_at)
+
+    def test_deleted_concepts_shift_counters(self):
+        course = make_course('Shrinking', chapters=1, concepts_per_chapter=4)
+        roadmap = self.enroll(course)
+        first, second, third, fourth = Concept.objects.filter(chapter__course=course).order_by('id')
+        self.complete(first)
+        self.complete(second)
+
+        first.delete()  # Completed: both counters drop
+        roadmap.refresh_from_db()
+        self.assertEqual((roadmap.completed_concepts, roadmap.total_concepts, roadmap.progress), (1, 3, 33))
+
+        third.delete()
+        fourth.delete()  # The only concept left is done
+        roadmap.refresh_from_db()
+        self.assertEqual((roadmap.completed_concepts, roadmap.total_concepts, roadmap.progress), (1, 1, 100))
+        self.assertIsNotNone(roadmap.completed_at)
+        self.assertEqual(roadmap_progress.reconcile_roadmaps(), 0)
+
+    def test_reconcile_heals_drift(self):
+        course = make_course('Drift', chapters=1, concepts_per_chapter=2)
+        roadmap = self.enroll(course)
+        self.complete(Concept.objects.filter(chapter__course=course).first())
+        # A concept bulk-added after enrollment (no signals), and an admin edit to the percentage
+        Concept.objects.bulk_create([Concept(chapter=course.chapters.first(), title='Late addition', order=3)])
+        Roadmap.objects.filter(pk=roadmap.pk).update(progress=90)
+
+        self.assertEqual(roadmap_progress.reconcile_roadmaps(), 1)
+        roadmap.refresh_from_db()
+        self.assertEqual((roadmap.completed_concepts, roadmap.total_concepts, roadmap.progress), (1, 3, 33))
+        self.assertEqual(roadmap_progress.reconcile_roadmaps(), 0)
+
+
+class UserStatsUpdateTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='streaker')
+        self.today = timezone.now().date()
+
+    def stats(self):
+        return UserProgress.objects.values_list(
+            'total_concepts_completed', 'total_minutes_learned', 'current_streak', 'longest_streak', 'last_activity_date'
+        ).get(user=self.user)
+
+    def test_first_completion_creates_the_row(self):
+        user_stats.record_concept_completed(self.user, 15, today=self.today)
+        self.assertEqual(self.stats(), (1, 15, 1, 1, self.today))
+
+    def test_streak_rollover(self):
+        UserProgress.objects.create(
+            user=self.user, current_streak=4, longest_streak=4, last_activity_date=self.today - timedelta(days=1)
+        )
+        user_stats.record_concept_completed(self.user, 10, today=self.today)
+        user_stats.record_concept_completed(self.user, 10, today=self.today)  # Same day: streak unchanged
+        self.assertEqual(self.stats(), (2, 20, 5, 5, self.today))
+
+        user_stats.record_concept_completed(self.user, 10, today=self.today + timedelta(days=3))
+        self.assertEqual(self.stats(), (3, 30, 1, 5, self.today + timedelta(days=3)))
+
+    def test_single_update_statement(self):
+        UserProgress.objects.create(user=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            user_stats.record_concept_completed(self.user, 10, today=self.today)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertTrue(ctx.captured_queries[0]['sql'].startswith('UPDATE'))
+
+
+class ConcurrentCompletionTests(TransactionTestCase):
+
+    def test_parallel_completions_keep_exact_totals(self):
+        user = User.objects.create_user(username='twotabs')
+        course = make_course('Parallel', chapters=2, concepts_per_chapter=6)
+        roadmap_generation.enroll(user, course)
+        concepts = list(Concept.objects.filter(chapter__course=course))
+        # Every concept is posted twice, as if from two tabs
+        targets = concepts * 2
+        codes = []
+
+        def worker(concept):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                codes.append(client.post(f'/api/concepts/{concept.id}/complete/').status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(concept,)) for concept in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(codes, [200] * len(targets))
+        stats = UserProgress.objects.get(user=user)
+        self.assertEqual(stats.total_concepts_completed, len(concepts))
+        self.assertEqual(stats.total_minutes_learned, sum(concept.duration for concept in concepts))
+        self.assertEqual((stats.current_streak, stats.longest_streak), (1, 1))
+        roadmap = Roadmap.objects.get(user=user, course=course)
+        self.assertEqual((roadmap.completed_concepts, roadmap.progress), (len(concepts), 100))
+        self.assertEqual(ConceptProgress.objects.filter(user=user, completed=True).count(), len(concepts))
+
+
+class DailyActivityTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='active')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        course = make_course('Daily', chapters=1, concepts_per_chapter=5)
+        self.concepts = list(Concept.objects.filter(chapter__course=course).order_by('id'))
+        Concept.objects.filter(chapter__course=course).update(duration=10)
+        Roadmap.objects.create(user=self.user, course=course)
+        now = timezone.now()
+        # Two completions today, one three days ago, one outside the 7-day window
+        for concept, days_ago in zip(self.concepts, [0, 0, 3, 30]):
+            ConceptProgress.objects.create(user=self.user, concept=concept, completed=True, completed_at=now - timedelta(days=days_ago))
+        ConceptProgress.objects.create(user=self.user, concept=self.concepts[4], completed=False)
+        activity.rebuild_rollups()
+
+    def test_daily_activity_fills_gaps_in_one_query(self):
+        with self.assertNumQueries(1):
+            days = activity.daily_activity(self.user, days=7)
+
+        today = timezone.localdate()
+        self.assertEqual([day['date'] for day in days], [(today - timedelta(days=i)).isoformat() for i in range(6, -1, -1)])
+        self.assertEqual([day['conceptsCompleted'] for day in days], [0, 0, 0, 1, 0, 0, 2])
+        self.assertEqual(days[-1]['minutesLearned'], 20)
+
+    def test_stats_endpoint_query_count(self):
+        self.client.get('/api/progress/')  # Creates the UserProgress/leaderboard rows
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/progress/')
+
+        self.assertEqual(response.json()['totalCoursesEnrolled'], 1)
+        self.assertEqual(sum(day['conceptsCompleted'] for day in response.json()['dailyProgress']), 3)
+        self.assertEqual(sum('api_dailyactivity' in q['sql'] for q in ctx.captured_queries), 1)
+        self.assertFalse(any('api_conceptprogress' in q['sql'] for q in ctx.captured_queries))
+        self.assertFalse(any('api_roadmap' in q['sql'] and 'api_userprogress' not in q['sql'] for q in ctx.captured_queries))
+
+    def test_activity_log_reuses_the_aggregation(self):
+        response = self.client.get('/api/activity/')
+
+        today = timezone.localdate()
+        self.assertEqual(response.json(), {
+            today.isoformat(): 2,
+            (today - timedelta(days=3)).isoformat(): 1,
+            (today - timedelta(days=30)).isoformat(): 1,
+        })
+
+    def test_completion_and_study_session_update_todays_rollup(self):
+        today = timezone.localdate()
+        self.client.post(f'/api/concepts/{self.concepts[4].id}/complete/')
+        response = self.client.post('/api/study-sessions/', {
+            'startedAt': timezone.now().isoformat(), 'totalDuration': 1800,
+            'focusDuration': 1500, 'distractionCount': 3, 'focusPercentage': 83.3,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        rollup = DailyActivity.objects.get(user=self.user, date=today)
+        self.assertEqual(
+            (rollup.concepts_completed, rollup.minutes_learned, rollup.focus_seconds, rollup.distractions),
+            (3, 30, 1500, 3)
+        )
+
+    def test_backfill_heals_streaks(self):
+        UserProgress.objects.create(user=self.user, current_streak=9, longest_streak=9)
+        today = timezone.localdate()
+        ConceptProgress.objects.filter(concept=self.concepts[4]).update(
+            completed=True, completed_at=timezone.now() - timedelta(days=1)
+        )
+
+        activity.rebuild_rollups(batch_size=1)
+
+        stats = UserProgress.objects.get(user=self.user)
+        # Active on today-30, today-3, today-1 and today
+        self.assertEqual((stats.current_streak, stats.longest_streak, stats.last_activity_date), (2, 2, today))
+        self.assertEqual(DailyActivity.objects.filter(user=self.user).count(), 4)
+
+
+class DailyActivityMigrationTests(TransactionTestCase):
+    """The rollup tables are backfilled by their migrations, not only by the management command."""
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_0024_backfills_rollups_from_history(self):
+        old = self.migrate([('api', '0023_concept_progress_activity_index')])
+        user = old.get_model('auth', 'User').objects.create(username='historic')
+        course = old.get_model('api', 'Course').objects.create(title='Old', description='d')
+        chapter = old.get_model('api', 'Chapter').objects.create(course=course, title='C', order=1)
+        Concept = old.get_model('api', 'Concept')
+        concepts = [Concept.objects.create(chapter=chapter, title=f'K{i}', order=i, duration=20) for i in range(3)]
+        yesterday = timezone.now() - timedelta(days=1)
+        for concept in concepts[:2]:
+            old.get_model('api', 'ConceptProgress').objects.create(user=user, concept=concept, completed=True, completed_at=yesterday)
+        old.get_model('api', 'StudySession').objects.create(
+            user=user, started_at=yesterday, total_duration=600, focus_duration=500, distraction_count=2,
+        )
+
+        new = self.migrate([('api', '0024_dailyactivity')])
+
+        row = new.get_model('api', 'DailyActivity').objects.get(user_id=user.id)
+        self.assertEqual(row.date, timezone.localdate(yesterday))
+        self.assertEqual(
+            (row.concepts_completed, row.minutes_learned, row.focus_seconds, row.distractions), (2, 40, 500, 2)
+        )
+
+        new = self.migrate([('api', '0025_study_session_summary')])
+
+        row = new.get_model('api', 'DailyActivity').objects.get(user_id=user.id)
+        self.assertEqual((row.sessions, row.study_seconds, row.focus_seconds), (1, 600, 500))
+        summary = new.get_model('api', 'StudySessionSummary').objects.get(user_id=user.id)
+        self.assertEqual(
+            (summary.total_sessions, summary.total_study_seconds, summary.total_focus_seconds, summary.total_distractions),
+            (1, 600, 500, 2)
+        )
+
+
+class StudySessionStatsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='focus')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        # (days ago, total seconds, focus seconds, distractions, focus %)
+        for days_ago, total, focus, distractions, percentage in [
+            (0, 1800, 1500, 2, 80.0), (5, 1200, 1200, 0, 100.0), (20, 600, 300, 4, 50.0), (90, 900, 900, 1, 90.0)
+        ]:
+            StudySession.objects.create(
+                user=self.user, started_at=now - timedelta(days=days_ago), total_duration=total,
+                focus_duration=focus, distraction_count=distractions, focus_percentage=percentage,
+            )
+        activity.rebuild_rollups()
+
+    def test_single_aggregate_query(self):
+        with self.assertNumQueries(1):
+            stats, _ = study_stats.aggregate_stats(self.user)
+
+        self.assertEqual(stats['totalSessions'], 4)
+        self.assertEqual(stats['totalStudyTime'], 4500)
+        self.assertEqual(stats['averageFocusPercentage'], 80.0)
+        self.assertEqual(stats['last7Days'], {'sessions': 2, 'focusTime': 2700, 'studyTime': 3000, 'distractions': 2})
+        self.assertEqual(stats['last30Days']['sessions'], 3)
+
+    def test_summary_matches_aggregate_and_is_updated_on_post(self):
+        self.client.get('/api/study-sessions/stats/')  # Builds the summary row
+        with self.assertNumQueries(2):
+            summary = study_stats.summary_stats(self.user)
+        self.assertEqual(summary, study_stats.aggregate_stats(self.user)[0])
+
+        response = self.client.post('/api/study-sessions/', {
+            'startedAt': timezone.now().isoformat(), 'totalDuration': 600,
+            'focusDuration': 600, 'distractionCount': 0, 'focusPercentage': 100.0,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        stats = self.client.get('/api/study-sessions/stats/').json()
+        self.assertEqual(StudySessionSummary.objects.get(user=self.user).total_sessions, 5)
+        self.assertEqual(stats, study_stats.aggregate_stats(self.user)[0])
+        self.assertEqual(stats['last7Days']['sessions'], 3)
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_study_sessions_walk_pages_newest_first(self):
+        StudySession.objects.bulk_create([
+            StudySession(user=self.user, started_at=timezone.now(), total_duration=i) for i in range(7)
+        ])
+        seen = []
+        url = '/api/study-sessions/?page_size=3'
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data['results']), 3)
+            seen.extend(session['id'] for session in data['results'])
+            url = data['next']
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(set(seen), set(StudySession.objects.filter(user=self.user).values_list('id', flat=True)))
+        ended_at = dict(StudySession.objects.values_list('id', 'ended_at'))
+        self.assertEqual([ended_at[i] for i in seen], sorted(ended_at.values(), reverse=True))
+
+    def test_page_size_is_capped(self):
+        Notification.objects.bulk_create([
+            Notification(user=self.user, notification_type='reminder', title=f'N{i}', message='m') for i in range(5)
+        ])
+        with mock.patch.object(NewestFirstPagination, 'max_page_size', 2):
+            data = self.client.get('/api/notifications/?page_size=50').json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNotNone(data['next'])
+
+    def test_lab_fields_projection_skips_file_contents(self):
+        Lab.objects.create(user=self.user, name='Big', files=[{'name': 'main.js', 'content': 'x' * 10000}])
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get('/api/labs/?fields=id,name,updated_at').json()
+
+        self.assertEqual(data['results'], [{'id': data['results'][0]['id'], 'name': 'Big', 'updated_at': data['results'][0]['updated_at']}])
+        lab_query = next(q['sql'] for q in ctx.captured_queries if 'FROM "api_lab"' in q['sql'])
+        self.assertNotIn('"files"', lab_query)
+        self.assertIn('files', self.client.get('/api/labs/').json()['results'][0])
+
+    def test_saving_a_lab_mid_walk_does_not_skip_or_repeat_it(self):
+        labs = [Lab.objects.create(user=self.user, name=f'Lab {i}') for i in range(5)]
+
+        first = self.client.get('/api/labs/?page_size=2&fields=id').json()
+        # The oldest lab (still on a later page) gets saved between requests
+        self.client.put(f'/api/labs/{labs[0].id}/', {'name': 'Edited', 'language': 'python', 'files': []}, format='json')
+        seen = [lab['id'] for lab in first['results']]
+        url = first['next']
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(lab['id'] for lab in data['results'])
+            url = data['next']
+
+        self.assertEqual(seen, [lab.id for lab in reversed(labs)])
+
+    def test_course_list_defers_notes_unless_requested(self):
+        course = make_course('Sparse', chapters=1, concepts_per_chapter=2)
+        Concept.objects.filter(chapter__course=course).update(notes='# Long notes')
+
+        headers = self.client.get('/api/courses/?fields=id,title').json()['results']
+        self.assertEqual(headers, [{'id': course.id, 'title': 'Sparse'}])
+
+        with CaptureQueriesContext(connection) as ctx:
+            tree = self.client.get('/api/courses/?fields=id,chapters').json()['results'][0]
+        self.assertNotIn('notes', tree['chapters'][0]['concepts'][0])
+        concept_query = next(q['sql'] for q in ctx.captured_queries if 'FROM "api_concept"' in q['sql'])
+        self.assertNotIn('"notes"', concept_query)
+
+        full = self.client.get('/api/courses/').json()['results'][0]
+        self.assertEqual(full['chapters'][0]['concepts'][0]['notes'], '# Long notes')
+
+
+class CourseCatalogTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.course = make_course('Catalog', chapters=3, concepts_per_chapter=4)
+        Chapter.objects.create(course=self.course, title='Empty chapter', order=4)
+        Concept.objects.filter(chapter__course=self.course).update(duration=10, notes='# ' + 'x' * 5000)
+
+    def test_catalog_returns_headers_with_counts_in_one_query(self):
+        make_course('Other', chapters=1, concepts_per_chapter=1)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/courses/catalog/')
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn('"notes"', ctx.captured_queries[0]['sql'])
+        header = next(course for course in response.json()['results'] if course['id'] == self.course.id)
+        self.assertEqual((header['chapterCount'], header['conceptCount'], header['totalMinutes']), (4, 12, 120))
+        self.assertNotIn('chapters', header)
+        full = self.client.get('/api/courses/').content
+        self.assertLess(len(response.content) * 10, len(full))
+
+    def test_outline_omits_notes_and_notes_load_per_concept(self):
+        with CaptureQueriesContext(connection) as ctx:
+            outline = self.client.get(f'/api/courses/{self.course.id}/outline/').json()
+        concept = outline['chapters'][0]['concepts'][0]
+        self.assertNotIn('notes', concept)
+        self.assertFalse(any('"notes"' in q['sql'] for q in ctx.captured_queries))
+
+        notes = self.client.get(f'/api/concepts/{concept["id"]}/notes/').json()
+        self.assertEqual(notes, {'id': concept['id'], 'notes': '# ' + 'x' * 5000})
+        self.assertEqual(self.client.get('/api/concepts/999999/notes/').status_code, 404)
+
+
+class CourseTreeCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tree', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.course = make_course('Versioned', chapters=2, concepts_per_chapter=3)
+        self.roadmap = Roadmap.objects.create(user=self.user, course=self.course)
+        self.concept = Concept.objects.filter(chapter__course=self.course).order_by('id').first()
+
+    def version(self):
+        return Course.objects.values_list('content_version', flat=True).get(pk=self.course.pk)
+
+    def test_content_changes_bump_version(self):
+        start = self.version()
+        self.concept.title = 'Renamed'
+        self.concept.save()
+        self.assertEqual(self.version(), start + 1)
+
+        Chapter.objects.create(course=self.course, title='Extra', order=3)
+        self.assertEqual(self.version(), start + 2)
+
+        self.course.title = 'Retitled'
+        self.course.save()
+        self.assertEqual(self.course.content_version, start + 3)
+
+        self.course.description = 'Partial save'
+        self.course.save(update_fields=['description'])
+        self.assertEqual((self.version(), self.course.content_version), (start + 4, start + 4))
+        start += 1
+
+        with mock.patch.object(NotesGeneratorService, 'generate_notes', return_value='# Fresh'):
+            concept_content.get_or_generate_notes(self.concept)
+        self.assertEqual(self.version(), start + 4)
+
+        self.concept.delete()
+        self.assertEqual(self.version(), start + 5)
+
+    def test_matching_etag_returns_304_without_reading_the_tree(self):
+        url = f'/api/courses/{self.course.id}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertFalse(any('FROM "api_chapter"' in q['sql'] and 'api_conceptprogress' not in q['sql']
+                             for q in ctx.captured_queries))
+
+        self.concept.title = 'Edited'
+        self.concept.save()
+        edited = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(edited.status_code, 200)
+        self.assertNotEqual(edited['ETag'], etag)
+        self.assertEqual(edited.json()['chapters'][0]['concepts'][0]['title'], 'Edited')
+
+    def test_tree_is_cached_and_completion_merged_per_user(self):
+        url = f'/api/roadmaps/{self.roadmap.id}/'
+        first = self.client.get(url)
+        self.assertFalse(any(c['completed'] for ch in first.json()['course']['chapters'] for c in ch['concepts']))
+
+        ConceptProgress.objects.create(user=self.user, concept=self.concept, completed=True)
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertFalse(any('FROM "api_concept"' in q['sql'] and 'api_conceptprogress' not in q['sql']
+                             for q in ctx.captured_queries))
+        completed = {c['id'] for ch in second.json()['course']['chapters'] for c in ch['concepts'] if c['completed']}
+        self.assertEqual(completed, {self.concept.id})
+        self.assertEqual(list(second.json())[:3], ['id', 'user', 'course'])
+
+        # Other learners (and anonymous callers) share the cached tree but not the flags
+        anonymous = APIClient().get(f'/api/courses/{self.course.id}/').json()
+        self.assertFalse(any(c['completed'] for ch in anonymous['chapters'] for c in ch['concepts']))
+        self.assertEqual(self.client.get(f'/api/roadmaps/{self.roadmap.id + 1000}/').status_code, 404)
+
+    def test_recreated_course_id_does_not_hit_old_cache(self):
+        course = make_course('Short lived', chapters=1, concepts_per_chapter=1)
+        self.client.get(f'/api/courses/{course.id}/')
+        course.refresh_from_db()
+        stale_key = course_cache.cache_key(course)
+        course.delete()
+        self.assertIsNotNone(cache.get(stale_key))
+
+        replacement = Course.objects.create(id=course.id, title='New', description='New')
+        self.assertEqual(self.client.get(f'/api/courses/{replacement.id}/').json()['title'], 'New')
@@ -3,15 +3,15 @@ from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
     RegisterView, login_view, logout_view, user_profile_view, hello_world,
-    LearnerProfileView, CourseListView, CourseDetailView,
+    LearnerProfileView, CourseListView, CourseDetailView, CourseCatalogView, CourseOutlineView, concept_notes,
     RoadmapListCreateView, RoadmapDetailView, mark_concept_complete,
     AssessmentDetailView, submit_assessment, complete_task,
     mark_notification_read, generate_concept_notes, generate_concept_quiz,
     LabListCreateView, LabDetailView, generate_certificate,
     study_sessions_view, study_session_stats, verify_certificate,
-    generate_roadmap_ai, DailyTaskListView, NotificationListView, 
+    generate_roadmap_ai, roadmap_generation_job, DailyTaskListView, NotificationListView, 
     UserStatsView, ActivityLogView,
-    get_leaderboard, get_trending_topics,
+    get_leaderboard, get_trending_topics, video_cache_stats,
     MentorListCreateView, MentorDetailView, BookingCreateView, 
     BookingListView, MentorDashboardBookingListView, update_booking_status,
     mentor_stats_view, mentor_availability_view, mentor_payments_view
@@ -31,17 +31,22 @@ urlpatterns = [
     path('profile/', LearnerProfileView.as_view(), name='learner_profile'),
     
     path('courses/', CourseListView.as_view(), name='course_list'),
+    path('courses/catalog/', CourseCatalogView.as_view(), name='course_catalog'),
     path('courses/<int:pk>/', CourseDetailView.as_view(), name='course_detail'),
+    path('courses/<int:pk>/outline/', CourseOutlineView.as_view(), name='course_outline'),
     
     path('roadmaps/', RoadmapListCreateView.as_view(), name='roadmap_list'),
     path('roadmaps/generate/', generate_roadmap_ai, name='roadmap_generate_ai'),
+    path('roadmaps/jobs/<int:job_id>/', roadmap_generation_job, name='roadmap_generation_job'),
     path('roadmaps/<int:pk>/', RoadmapDetailView.as_view(), name='roadmap_detail'),
     path('roadmaps/<int:roadmap_id>/certificate/', generate_certificate, name='roadmap_certificate'),
     path('certificates/verify/<str:cert_id>/', verify_certificate, name='certificate_verify'),
     path('leaderboard/', get_leaderboard, name='leaderboard'),
     path('trending/', get_trending_topics, name='trending_topics'),
+    path('cache/videos/stats/', video_cache_stats, name='video_cache_stats'),
     
     path('concepts/<int:concept_id>/complete/', mark_concept_complete, name='concept_complete'),
+    path('concepts/<int:concept_id>/notes/', concept_notes, name='concept_notes'),
     path('concepts/<int:concept_id>/generate-notes/', generate_concept_notes, name='concept_generate_notes'),
     path('concepts/<int:concept_id>/generate-quiz/', generate_concept_quiz, name='concept_generate_quiz'),
     
@@ -0,0 +1,167 @@
+"""
+Per-day learning activity.
+
+DailyActivity keeps one row per (user, day) with the concepts completed,
+minutes learned, study sessions, study/focus seconds and distractions of that
+day. Rows are bumped with a single F-expression UPDATE when a concept is
+completed or a study session is saved, so the 7-day chart and the 365-day
+contribution graph read at most a year of small rows over the (user, date)
+unique index instead of re-aggregating ConceptProgress/StudySession.
+
+`manage.py backfill_daily_activity` rebuilds the rollups from history in
+user-id chunks and heals UserProgress streaks from them (migrations 0024/0025
+carry their own copy of the aggregation for the initial backfill).
+"""
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from ..models import ConceptProgress, DailyActivity, StudySession, UserProgress
+
+
+def record(user, day=None, concepts=0, minutes=0, focus_seconds=0, distractions=0, sessions=0, study_seconds=0):
+    """Adds to the user's rollup row for `day` (created on first activity of the day)."""
+    day = day or timezone.localdate()
+    changes = {
+        'concepts_completed': F('concepts_completed') + concepts,
+        'minutes_learned': F('minutes_learned') + minutes,
+        'focus_seconds': F('focus_seconds') + focus_seconds,
+        'distractions': F('distractions') + distractions,
+        'sessions': F('sessions') + sessions,
+        'study_seconds': F('study_seconds') + study_seconds,
+    }
+    if not DailyActivity.objects.filter(user=user, date=day).update(**changes):
+        DailyActivity.objects.get_or_create(user=user, date=day)
+        DailyActivity.objects.filter(user=user, date=day).update(**changes)
+
+
+def record_concept_completed(user, minutes):
+    record(user, concepts=1, minutes=minutes)
+
+
+def record_study_session(session):
+    record(
+        session.user,
+        day=timezone.localdate(session.started_at),
+        focus_seconds=session.focus_duration,
+        distractions=session.distraction_count,
+        sessions=1,
+        study_seconds=session.total_duration,
+    )
+
+
+def activity_by_date(user, start_date, end_date=None):
+    """{date: {'minutes': int, 'count': int}} for days in [start_date, end_date] with completed concepts."""
+    rows = DailyActivity.objects.filter(user=user, date__gte=start_date, concepts_completed__gt=0)
+    if end_date is not None:
+        rows = rows.filter(date__lte=end_date)
+    return {
+        date: {'minutes': minutes, 'count': count}
+        for date, minutes, count in rows.values_list('date', 'minutes_learned', 'concepts_completed')
+    }
+
+
+def daily_activity(user, days=7, today=None):
+    """The last `days` days ending today, oldest first, with empty days filled in."""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    activity = activity_by_date(user, start, today)
+    empty = {'minutes': 0, 'count': 0}
+    return [
+        {
+            'date': date.isoformat(),
+            'minutesLearned': activity.get(date, empty)['minutes'],
+            'conceptsCompleted': activity.get(date, empty)['count'],
+        }
+        for date in (start + timedelta(days=i) for i in range(days))
+    ]
+
+
+def streaks(dates):
+    """
+    (current, longest, last_date) for sorted active dates, matching the
+    incremental rules in user_stats: the current streak is the run of
+    consecutive days ending at the last active day.
+    """
+    current = longest = 0
+    previous = None
+    for date in dates:
+        current = current + 1 if previous == date - timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = date
+    return current, longest, previous
+
+
+def _history(user_ids):
+    """{(user_id, date): DailyActivity} aggregated from ConceptProgress and StudySession."""
+    tz = timezone.get_current_timezone()
+    rollups = {}
+
+    def row(user_id, day):
+        if (user_id, day) not in rollups:
+            rollups[(user_id, day)] = DailyActivity(user_id=user_id, date=day)
+        return rollups[(user_id, day)]
+
+    completions = ConceptProgress.objects.filter(
+        user_id__in=user_ids, completed=True, completed_at__isnull=False
+    ).annotate(day=TruncDate('completed_at', tzinfo=tz)).values('user_id', 'day').annotate(
+        minutes=Sum('concept__duration'), count=Count('id')
+    ).order_by()
+    for item in completions:
+        rollup = row(item['user_id'], item['day'])
+        rollup.concepts_completed = item['count']
+        rollup.minutes_learned = item['minutes'] or 0
+
+    sessions = StudySession.objects.filter(user_id__in=user_ids).annotate(
+        day=TruncDate('started_at', tzinfo=tz)
+    ).values('user_id', 'day').annotate(
+        focus=Sum('focus_duration'), distractions=Sum('distraction_count'),
+        count=Count('id'), study=Sum('total_duration'),
+    ).order_by()
+    for item in sessions:
+        rollup = row(item['user_id'], item['day'])
+        rollup.focus_seconds = item['focus'] or 0
+        rollup.distractions = item['distractions'] or 0
+        rollup.sessions = item['count']
+        rollup.study_seconds = item['study'] or 0
+
+    return rollups
+
+
+def rebuild_rollups(batch_size=500, heal_streaks=True):
+    """
+    Rebuilds every user's DailyActivity rows from history, `batch_size` users
+    per transaction (two GROUP BY queries per chunk). With `heal_streaks`,
+    UserProgress streaks and last_activity_date are recomputed from the
+    rebuilt rows. Returns the number of rollup rows written.
+    """
+    written = 0
+    last_id = 0
+    while True:
+        user_ids = list(User.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+
+        rollups = _history(user_ids)
+        with transaction.atomic():
+            DailyActivity.objects.filter(user_id__in=user_ids).delete()
+            DailyActivity.objects.bulk_create(rollups.values(), batch_size=1000)
+
+            if heal_streaks:
+                active_days = {}
+                for (user_id, day), rollup in sorted(rollups.items()):
+                    if rollup.concepts_completed:
+                        active_days.setdefault(user_id, []).append(day)
+                progress_rows = list(UserProgress.objects.filter(user_id__in=active_days))
+                for progress in progress_rows:
+                    progress.current_streak, progress.longest_streak, progress.last_activity_date = streaks(
+                        active_days[progress.user_id]
+                    )
+                UserProgress.objects.bulk_update(
+                    progress_rows, ['current_streak', 'longest_streak', 'last_activity_date'], batch_size=1000
+                )
+        written += len(rollups)
+    return written
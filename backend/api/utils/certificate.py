@@ -1,8 +1,12 @@
+import hashlib
 import io
 import os
+import threading
+from contextlib import contextmanager
 import qrcode
 from PIL import Image
 from datetime import datetime
+from reportlab import rl_config
 from reportlab.lib.pagesizes import letter, landscape
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
@@ -14,152 +18,253 @@ from reportlab.lib.utils import ImageReader
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 STATIC_IMAGES_DIR = os.path.join(BASE_DIR, 'static', 'images')
 
-def generate_certificate_pdf(user_name, course_title, completion_date, cert_id):
+# Bump whenever the layout/assets below change: cached PDFs of older versions
+# are re-rendered on next download (see certificate_cache.py)
+TEMPLATE_VERSION = 2
+
+PAGE_WIDTH, PAGE_HEIGHT = landscape(letter)
+
+# Static images: (file, x, y, box width, box height) in points
+ASSETS = {
+    'logo': ('logo.png', 60, PAGE_HEIGHT - 85, 50, 50),
+    'rocketboy': ('Rocketboy.png', PAGE_WIDTH - 160, 50, 100, 100),
+}
+ASSET_SCALE = 4  # Embedded pixels per point of drawn size (~288 dpi)
+
+_assets_lock = threading.Lock()
+_assets = None
+_a85_lock = threading.Lock()  # Held while rl_config.useA85 is switched off, see _zlib_streams
+
+
+def _load_asset(filename, box_width, box_height):
+    """Decodes a PNG once, downsampled to its drawn size, as an ImageReader (None if missing)."""
+    path = os.path.join(STATIC_IMAGES_DIR, filename)
+    if not os.path.exists(path):
+        return None
+    with Image.open(path) as img:
+        img = img.convert('RGBA')
+        img.thumbnail((box_width * ASSET_SCALE, box_height * ASSET_SCALE), Image.LANCZOS)
+    return ImageReader(img)
+
+
+def get_assets():
+    """Per-process cache of the decoded template images: {name: ImageReader or None}."""
+    global _assets
+    with _assets_lock:
+        if _assets is None:
+            _assets = {
+                name: _load_asset(filename, box_width, box_height)
+                for name, (filename, _, _, box_width, box_height) in ASSETS.items()
+            }
+        return _assets
+
+
+def draw_static_layer(p, images):
     """
-    Generates a PDF certificate and returns the bytes content.
+    Everything that is the same on every certificate: background, borders,
+    branding, headings, signature lines. `images` maps ASSETS names to anything
+    drawImage accepts (ImageReader or path).
     """
-    # Create PDF in memory
-    buffer = io.BytesIO()
-    
-    # Create PDF with landscape orientation
-    p = canvas.Canvas(buffer, pagesize=landscape(letter))
-    width, height = landscape(letter)
-    
+    width, height = PAGE_WIDTH, PAGE_HEIGHT
+
     # Certificate background - elegant gradient effect with border
     p.setFillColor(colors.Color(0.98, 0.98, 0.98))
     p.rect(0, 0, width, height, fill=1, stroke=0)
-    
+
     # Decorative border
     p.setStrokeColor(colors.Color(0.2, 0.2, 0.2))
     p.setLineWidth(3)
     p.rect(30, 30, width-60, height-60, fill=0, stroke=1)
-    
+
     # Inner border
     p.setLineWidth(1)
     p.rect(40, 40, width-80, height-80, fill=0, stroke=1)
-    
-    # Add SkillMeter Logo (top left corner)
-    logo_path = os.path.join(STATIC_IMAGES_DIR, 'logo.png')
-    if os.path.exists(logo_path):
-        p.drawImage(logo_path, 60, height - 85, width=50, height=50, preserveAspectRatio=True, mask='auto')
-    
-    # Add Rocketboy illustration (bottom right corner)
-    rocketboy_path = os.path.join(STATIC_IMAGES_DIR, 'Rocketboy.png')
-    if os.path.exists(rocketboy_path):
-        p.drawImage(rocketboy_path, width - 160, 50, width=100, height=100, preserveAspectRatio=True, mask='auto')
-    
+
+    # SkillMeter Logo (top left corner) and Rocketboy illustration (bottom right corner)
+    for name, (_, x, y, box_width, box_height) in ASSETS.items():
+        if images.get(name) is not None:
+            p.drawImage(images[name], x, y, width=box_width, height=box_height, preserveAspectRatio=True, mask='auto')
+
     # Header - "CERTIFICATE OF COMPLETION"
     p.setFillColor(colors.Color(0.1, 0.1, 0.1))
     p.setFont("Helvetica-Bold", 36)
     p.drawCentredString(width/2, height - 100, "CERTIFICATE OF COMPLETION")
-    
+
     # Decorative line
     p.setStrokeColor(colors.Color(0.3, 0.3, 0.3))
     p.setLineWidth(2)
     p.line(width/2 - 200, height - 115, width/2 + 200, height - 115)
-    
+
     # "This is to certify that"
     p.setFont("Helvetica", 18)
     p.setFillColor(colors.Color(0.3, 0.3, 0.3))
     p.drawCentredString(width/2, height - 160, "This is to certify that")
-    
+
+    # "has successfully completed"
+    p.drawCentredString(width/2, height - 260, "has successfully completed the course")
+
+    # SkillMeter branding
+    p.setFont("Helvetica-Bold", 14)
+    p.setFillColor(colors.Color(0.2, 0.2, 0.2))
+    p.drawCentredString(width/2, 55, "SkillMeter AI Learning Platform")
+
+    # Signature line (left)
+    p.setStrokeColor(colors.Color(0.3, 0.3, 0.3))
+    p.setLineWidth(1)
+    p.line(width/2 - 250, 130, width/2 - 50, 130)
+    p.setFont("Helvetica", 10)
+    p.drawCentredString(width/2 - 150, 115, "Platform Director")
+
+    # Signature line (right)
+    p.line(width/2 + 50, 130, width/2 + 250, 130)
+    p.drawCentredString(width/2 + 150, 115, "Date of Issue")
+
+    # "Scan to Verify" Text (under the QR code)
+    p.setFont("Helvetica", 8)
+    p.setFillColor(colors.Color(0.5, 0.5, 0.5))
+    p.drawString(50, 40, "Scan to Verify")
+
+
+def make_certificate_id(user_id, roadmap_id, course_title):
+    """Deterministic 12-char ID, stored on Roadmap.certificate_id when first issued."""
+    cert_data = f"{user_id}-{roadmap_id}-{course_title}"
+    return hashlib.sha256(cert_data.encode()).hexdigest()[:12].upper()
+
+
+def display_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
+def certificate_filename(course_title):
+    safe_title = course_title.replace(' ', '_')[:30]
+    return f"SkillMeter_Certificate_{safe_title}.pdf"
+
+
+def verification_url(cert_id):
+    # Verification URL (Dev Env)
+    return f"http://localhost:8080/verify?id={cert_id}"
+
+
+def draw_qr(p, data, x, y, size):
+    """Draws a QR code as vector rectangles (one per run of dark modules), no PNG round-trip."""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        border=1,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    module = size / len(matrix)
+
+    p.setFillColor(colors.white)
+    p.rect(x, y, size, size, fill=1, stroke=0)
+    p.setFillColor(colors.black)
+    for row, cells in enumerate(matrix):
+        row_y = y + size - (row + 1) * module
+        col = 0
+        while col < len(cells):
+            if not cells[col]:
+                col += 1
+                continue
+            start = col
+            while col < len(cells) and cells[col]:
+                col += 1
+            p.rect(x + start * module, row_y, (col - start) * module, module, fill=1, stroke=0)
+
+
+def format_completion_date(completion_date):
+    # Format date if it's a datetime object, otherwise assume string or use now
+    if isinstance(completion_date, datetime):
+        return completion_date.strftime("%B %d, %Y")
+    elif completion_date:
+        return str(completion_date)
+    return datetime.now().strftime("%B %d, %Y")
+
+
+def draw_certificate_fields(p, user_name, course_title, completion_date, cert_id):
+    """The per-certificate stamps: name, course title, date, ID and QR."""
+    width, height = PAGE_WIDTH, PAGE_HEIGHT
+
     # User's name - prominent
     p.setFont("Helvetica-Bold", 32)
     p.setFillColor(colors.Color(0.1, 0.1, 0.1))
     p.drawCentredString(width/2, height - 210, user_name)
-    
+
     # Decorative underline for name
+    p.setStrokeColor(colors.Color(0.3, 0.3, 0.3))
     p.setLineWidth(1)
     name_width = p.stringWidth(user_name, "Helvetica-Bold", 32)
     p.line(width/2 - name_width/2 - 20, height - 220, width/2 + name_width/2 + 20, height - 220)
-    
-    # "has successfully completed"
-    p.setFont("Helvetica", 18)
-    p.setFillColor(colors.Color(0.3, 0.3, 0.3))
-    p.drawCentredString(width/2, height - 260, "has successfully completed the course")
-    
+
     # Course title
     p.setFont("Helvetica-Bold", 24)
     p.setFillColor(colors.Color(0.15, 0.15, 0.15))
-    
+
     # Truncate if too long
     display_title = course_title
     if len(display_title) > 50:
         display_title = display_title[:47] + "..."
     p.drawCentredString(width/2, height - 305, f'"{display_title}"')
-    
+
     # Completion date
     p.setFont("Helvetica", 14)
     p.setFillColor(colors.Color(0.4, 0.4, 0.4))
-    
-    # Format date if it's a datetime object, otherwise assume string or use now
-    if isinstance(completion_date, datetime):
-        date_str = completion_date.strftime("%B %d, %Y")
-    elif completion_date:
-        date_str = str(completion_date)
-    else:
-        date_str = datetime.now().strftime("%B %d, %Y")
-        
-    p.drawCentredString(width/2, height - 350, f"Completed on {date_str}")
-    
+    p.drawCentredString(width/2, height - 350, f"Completed on {format_completion_date(completion_date)}")
+
     # Certificate ID
     p.setFont("Helvetica", 10)
     p.setFillColor(colors.Color(0.5, 0.5, 0.5))
     p.drawCentredString(width/2, 80, f"Certificate ID: {cert_id}")
-    
-    # SkillMeter branding
-    p.setFont("Helvetica-Bold", 14)
-    p.setFillColor(colors.Color(0.2, 0.2, 0.2))
-    p.drawCentredString(width/2, 55, "SkillMeter AI Learning Platform")
-    
-    # Signature line (left)
-    p.setLineWidth(1)
-    p.line(width/2 - 250, 130, width/2 - 50, 130)
-    p.setFont("Helvetica", 10)
-    p.drawCentredString(width/2 - 150, 115, "Platform Director")
-    
-    # Signature line (right)
-    p.line(width/2 + 50, 130, width/2 + 250, 130)
-    p.drawCentredString(width/2 + 150, 115, "Date of Issue")
-    
-    # --- QR Code Verification ---
-    # Verification URL (Dev Env)
-    verify_url = f"http://localhost:8080/verify?id={cert_id}"
-    
-    # Generate QR Code
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_H,
-        box_size=10,
-        border=1,
-    )
-    qr.add_data(verify_url)
-    qr.make(fit=True)
-    
-    qr_img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Save QR to a temporary stream to read it into ReportLab
-    qr_buffer = io.BytesIO()
-    qr_img.save(qr_buffer, format="PNG")
-    qr_buffer.seek(0)
-    
-    # Draw QR Code (Bottom Left)
-    # Using ImageReader to handle the stream
-    qr_image = ImageReader(qr_buffer)
-    p.drawImage(qr_image, 50, 50, width=80, height=80, preserveAspectRatio=True, mask='auto')
-    
-    # "Scan to Verify" Text
-    p.setFont("Helvetica", 8)
-    p.setFillColor(colors.Color(0.5, 0.5, 0.5))
-    p.drawString(50, 40, "Scan to Verify")
 
-    
-    p.showPage()
-    p.save()
-    
+    # --- QR Code Verification (Bottom Left) ---
+    draw_qr(p, verification_url(cert_id), 50, 50, 80)
+
+
+@contextmanager
+def _zlib_streams():
+    """
+    Writes PDF streams as plain zlib while drawing/saving one certificate.
+    ASCII85 only matters for 7-bit transports and its pure-Python encoder cost
+    more than the rest of the certificate combined.
+
+    ReportLab has no per-canvas option, only the process-wide rl_config.useA85,
+    so it is switched off for the length of the render and restored afterwards.
+    The lock only serializes certificate renders against each other: a
+    different ReportLab PDF built on another thread meanwhile also gets plain
+    zlib streams (still a valid PDF, just not ASCII85-wrapped). This module is
+    the only ReportLab user in the app; new code that needs ASCII85 output
+    should render under _a85_lock too.
+    """
+    with _a85_lock:
+        previous = rl_config.useA85
+        rl_config.useA85 = 0
+        try:
+            yield
+        finally:
+            rl_config.useA85 = previous
+
+
+def generate_certificate_pdf(user_name, course_title, completion_date, cert_id):
+    """
+    Generates a PDF certificate and returns the bytes content.
+    Template images are decoded once per process (get_assets).
+    """
+    # Create PDF in memory
+    buffer = io.BytesIO()
+
+    with _zlib_streams():
+        # Create PDF with landscape orientation
+        p = canvas.Canvas(buffer, pagesize=landscape(letter))
+
+        draw_static_layer(p, get_assets())
+        draw_certificate_fields(p, user_name, course_title, completion_date, cert_id)
+
+        p.showPage()
+        p.save()
+
     # Get PDF from buffer safely
-    buffer.seek(0)
     pdf_content = buffer.getvalue()
     buffer.close()
-    
+
     return pdf_content
@@ -0,0 +1,158 @@
+"""
+Bulk certificate issuing for cohort completions (`manage.py generate_certificates`).
+The Roadmap admin action only assigns IDs (assign_certificate_ids); rendering
+runs in the command, never in a web worker.
+
+IDs are assigned with one bulk_update, PDFs are rendered across a process pool
+(each worker decodes the template assets once) and stored in CertificateArtifact
+in bulk; certificates already stored for the current template are skipped. A
+failed render is reported per roadmap and does not stop the batch.
+Optionally each newly issued certificate is emailed to its learner, one SMTP
+connection per batch.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.mail import EmailMessage
+from ..models import CertificateArtifact, NotificationLog, Roadmap
+from . import certificate_cache, certificate_verification, notification_transport
+from .certificate import (
+    TEMPLATE_VERSION, certificate_filename, display_name, generate_certificate_pdf, make_certificate_id,
+)
+
+EVENT_NAME = 'Certificate Issued'
+
+
+def _render(job):
+    """
+    Process-pool entry point: (cert_id, user_name, course_title, completion_date)
+    -> (cert_id, pdf, None), or (cert_id, None, error) if rendering failed.
+    """
+    cert_id, user_name, course_title, completion_date = job
+    try:
+        return cert_id, generate_certificate_pdf(user_name, course_title, completion_date, cert_id), None
+    except Exception as e:
+        return cert_id, None, f"{type(e).__name__}: {e}"
+
+
+def assign_certificate_ids(roadmaps):
+    """Gives every roadmap without one its certificate_id (single bulk UPDATE). Returns the newly issued roadmaps."""
+    missing = [roadmap for roadmap in roadmaps if not roadmap.certificate_id]
+    for roadmap in missing:
+        roadmap.certificate_id = make_certificate_id(roadmap.user_id, roadmap.id, roadmap.course.title)
+    Roadmap.objects.bulk_update(missing, ['certificate_id'], batch_size=500)
+    certificate_verification.invalidate(*(roadmap.certificate_id for roadmap in missing))
+    return missing
+
+
+def _email_certificates(roadmaps):
+    """Emails each learner their stored PDF (roadmaps without one are skipped); returns the number sent."""
+    sent = 0
+    batch_size = settings.NOTIFICATION_BATCH_SIZE
+    for start in range(0, len(roadmaps), batch_size):
+        batch = [roadmap for roadmap in roadmaps[start:start + batch_size] if roadmap.user.email]
+        pdfs = dict(
+            CertificateArtifact.objects.filter(
+                certificate_id__in=[roadmap.certificate_id for roadmap in batch],
+                template_version=TEMPLATE_VERSION
+            ).values_list('certificate_id', 'pdf')
+        )
+        batch = [roadmap for roadmap in batch if roadmap.certificate_id in pdfs]
+        messages = []
+        for roadmap in batch:
+            message = EmailMessage(
+                subject=f"Your Certificate for {roadmap.course.title}",
+                body="Please find attached your official certificate of completion.",
+                from_email=settings.EMAIL_HOST_USER,
+                to=[roadmap.user.email]
+            )
+            message.attach(certificate_filename(roadmap.course.title), bytes(pdfs[roadmap.certificate_id]), 'application/pdf')
+            messages.append(message)
+
+        errors = notification_transport.send_email_batch(messages)
+        NotificationLog.objects.bulk_create([
+            NotificationLog(
+                user=roadmap.user,
+                notification_type='EMAIL',
+                event_name=EVENT_NAME,
+                recipient=roadmap.user.email,
+                status='SENT' if error is None else 'FAILED',
+                error_message=None if error is None else str(error),
+            )
+            for roadmap, error in zip(batch, errors)
+        ])
+        sent += errors.count(None)
+    return sent
+
+
+def generate_certificates(roadmaps, workers=None, email=False, flush_every=50, on_progress=None):
+    """
+    Issues certificates for the completed roadmaps in `roadmaps` (a queryset).
+    `workers` <= 1 renders in-process. `on_progress(done, total)` is called as PDFs finish.
+    With `email`, only certificates issued by this run are emailed (re-runs don't resend).
+    Returns a stats dict; `errors` maps certificate IDs to render errors.
+    """
+    started = time.perf_counter()
+    workers = workers if workers is not None else settings.CERTIFICATE_BATCH_WORKERS or os.cpu_count()
+    roadmaps = list(roadmaps.filter(progress__gte=100).select_related('user', 'course'))
+
+    issued = assign_certificate_ids(roadmaps)
+    stored = set(
+        CertificateArtifact.objects.filter(
+            certificate_id__in=[roadmap.certificate_id for roadmap in roadmaps],
+            template_version=TEMPLATE_VERSION
+        ).values_list('certificate_id', flat=True)
+    )
+    jobs = [
+        (
+            roadmap.certificate_id,
+            display_name(roadmap.user),
+            roadmap.course.title,
+            roadmap.completed_at or roadmap.last_accessed_at,
+        )
+        for roadmap in roadmaps
+        if roadmap.certificate_id not in stored
+    ]
+
+    rendered = 0
+    pending = {}
+    errors = {}
+
+    def collect(results):
+        nonlocal rendered
+        for cert_id, pdf_content, error in results:
+            if error is not None:
+                print(f"Certificate {cert_id} failed to render: {error}")
+                errors[cert_id] = error
+            else:
+                pending[cert_id] = pdf_content
+                rendered += 1
+            if len(pending) >= flush_every:
+                certificate_cache.store_many(pending)
+                pending.clear()
+            if on_progress:
+                on_progress(rendered + len(errors), len(jobs))
+
+    if workers <= 1 or len(jobs) <= 1:
+        collect(map(_render, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            collect(pool.map(_render, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    if pending:
+        certificate_cache.store_many(pending)
+
+    emailed = _email_certificates(issued) if email else 0
+
+    elapsed = time.perf_counter() - started
+    return {
+        'roadmaps': len(roadmaps),
+        'issued': len(issued),
+        'rendered': rendered,
+        'failed': len(errors),
+        'errors': errors,
+        'skipped': len(roadmaps) - rendered - len(errors),
+        'emailed': emailed,
+        'seconds': round(elapsed, 2),
+        'per_second': round(rendered / elapsed, 1) if elapsed else 0.0,
+    }
@@ -0,0 +1,85 @@
+"""
+Content-addressed store for rendered certificate PDFs.
+
+A certificate never changes once its certificate_id is assigned, so the PDF is
+rendered once per (certificate_id, TEMPLATE_VERSION) and kept as a DB blob.
+The ETag is the sha256 of the bytes; bumping TEMPLATE_VERSION invalidates
+every stored PDF (old versions are dropped when the new one is stored).
+"""
+import hashlib
+from django.db import IntegrityError, transaction
+from ..models import CertificateArtifact
+from .certificate import TEMPLATE_VERSION, generate_certificate_pdf
+
+
+def get_etag(cert_id):
+    """ETag of the stored PDF for the current template, or None (no blob loaded)."""
+    return CertificateArtifact.objects.filter(
+        certificate_id=cert_id, template_version=TEMPLATE_VERSION
+    ).values_list('etag', flat=True).first()
+
+
+def get(cert_id):
+    """Returns (pdf_bytes, etag) for the current template, or None."""
+    row = CertificateArtifact.objects.filter(
+        certificate_id=cert_id, template_version=TEMPLATE_VERSION
+    ).values_list('pdf', 'etag').first()
+    if row is None:
+        return None
+    return bytes(row[0]), row[1]
+
+
+def store(cert_id, pdf_content):
+    """
+    Saves the PDF for the current template and drops older versions.
+    Returns (pdf_bytes, etag) of the stored copy.
+    """
+    etag = hashlib.sha256(pdf_content).hexdigest()
+    try:
+        with transaction.atomic():
+            CertificateArtifact.objects.create(
+                certificate_id=cert_id,
+                template_version=TEMPLATE_VERSION,
+                pdf=pdf_content,
+                etag=etag,
+                size=len(pdf_content),
+            )
+    except IntegrityError:
+        # A concurrent download stored it first: serve theirs so ETags agree
+        return get(cert_id)
+    CertificateArtifact.objects.filter(certificate_id=cert_id).exclude(template_version=TEMPLATE_VERSION).delete()
+    return pdf_content, etag
+
+
+def store_many(pdfs):
+    """Bulk version of store(): {cert_id: pdf_bytes}. Existing rows for the current template win."""
+    CertificateArtifact.objects.bulk_create([
+        CertificateArtifact(
+            certificate_id=cert_id,
+            template_version=TEMPLATE_VERSION,
+            pdf=pdf_content,
+            etag=hashlib.sha256(pdf_content).hexdigest(),
+            size=len(pdf_content),
+        )
+        for cert_id, pdf_content in pdfs.items()
+    ], ignore_conflicts=True)
+    CertificateArtifact.objects.filter(certificate_id__in=list(pdfs)).exclude(template_version=TEMPLATE_VERSION).delete()
+
+
+def get_or_render(cert_id, user_name, course_title, completion_date):
+    """
+    Returns (pdf_bytes, etag, rendered). Renders and stores the PDF only when
+    no copy exists for the current template version.
+    """
+    cached = get(cert_id)
+    if cached:
+        return cached[0], cached[1], False
+
+    pdf_content = generate_certificate_pdf(
+        user_name=user_name,
+        course_title=course_title,
+        completion_date=completion_date,
+        cert_id=cert_id
+    )
+    pdf_content, etag = store(cert_id, pdf_content)
+    return pdf_content, etag, True
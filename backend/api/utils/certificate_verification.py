@@ -0,0 +1,95 @@
+"""
+Read-through cache for the public certificate verification endpoint.
+
+Every QR scan hits verify_certificate, and an issued certificate rarely
+changes, so the response body is cached per cert ID for
+CERTIFICATE_VERIFY_CACHE_TTL (unknown/invalid IDs for
+CERTIFICATE_VERIFY_NEGATIVE_TTL). Entries are dropped when the roadmap is
+saved or deleted, when its owner is renamed (api/signals.py), or when it is
+reconciled below 100%. A miss costs one joined query on the unique
+certificate_id index.
+
+Those drops only reach other workers through a shared cache (Redis). With the
+per-process LocMemCache fallback every entry expires after at most
+CERTIFICATE_VERIFY_LOCAL_TTL instead, so a revoked certificate can't keep
+verifying in another worker for days.
+"""
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import serializers
+from ..models import Roadmap
+from .certificate import display_name
+
+CACHE_VERSION = 1
+PER_PROCESS_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_key(cert_id):
+    return f"cert-verify:v{CACHE_VERSION}:{cert_id}"
+
+
+def _load(cert_id):
+    """(status_code, body) straight from the database."""
+    roadmap = (
+        Roadmap.objects.select_related('user', 'course')
+        .only(
+            'certificate_id', 'progress', 'completed_at', 'last_accessed_at',
+            'user__username', 'user__first_name', 'user__last_name', 'course__title',
+        )
+        .filter(certificate_id=cert_id)
+        .first()
+    )
+    if roadmap is None:
+        return 404, {'valid': False, 'error': 'Certificate ID not found'}
+
+    # Ensure it's completed (security check)
+    if roadmap.progress < 100:
+        return 400, {'error': 'Certificate invalid'}
+
+    issued = serializers.DateTimeField().to_representation(roadmap.completed_at or roadmap.last_accessed_at)
+    return 200, {
+        'valid': True,
+        'certificate_id': cert_id,
+        'student_name': display_name(roadmap.user),
+        'course_title': roadmap.course.title,
+        'completion_date': issued,
+        'issue_date': issued,
+    }
+
+
+def _ttl(status_code):
+    ttl = settings.CERTIFICATE_VERIFY_CACHE_TTL if status_code == 200 else settings.CERTIFICATE_VERIFY_NEGATIVE_TTL
+    if settings.CACHES['default']['BACKEND'] in PER_PROCESS_BACKENDS:
+        ttl = min(ttl, settings.CERTIFICATE_VERIFY_LOCAL_TTL)
+    return ttl
+
+
+def lookup(cert_id):
+    """Returns (status_code, body, etag), from the cache when possible."""
+    key = cache_key(cert_id)
+    entry = cache.get(key)
+    if entry is None:
+        status_code, body = _load(cert_id)
+        etag = hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:32]
+        entry = (status_code, body, etag)
+        cache.set(key, entry, _ttl(status_code))
+    return entry
+
+
+def invalidate(*cert_ids):
+    """Drops cached entries: a cached 404 for a newly issued ID, or a 200 for a revoked one."""
+    cache.delete_many([cache_key(cert_id) for cert_id in cert_ids])
+
+
+def invalidate_user(user_id):
+    """Drops the cached entries of every certificate the user holds (their name is in the body)."""
+    cert_ids = list(
+        Roadmap.objects.filter(user_id=user_id, certificate_id__isnull=False).values_list('certificate_id', flat=True)
+    )
+    if cert_ids:
+        invalidate(*cert_ids)
@@ -0,0 +1,70 @@
+"""
+On-demand AI notes/quiz for a concept, shared by the Learn page endpoints and
+the warmup worker. Generation is single-flight per concept (utils/single_flight.py).
+"""
+from ..models import Concept, Assessment
+from ..services import NotesGeneratorService, QuizGeneratorService
+from . import single_flight
+from .course_tree import bump_content_version
+
+NOTES_PLACEHOLDER = '*Notes will be generated when you start this lesson.*'
+
+
+def stored_notes(concept_id):
+    """Generated notes for the concept, or None while only the placeholder exists."""
+    notes = Concept.objects.filter(id=concept_id).values_list('notes', flat=True).first()
+    if notes and not notes.endswith(NOTES_PLACEHOLDER):
+        return notes
+    return None
+
+
+def stored_quiz(concept_id):
+    assessment = Assessment.objects.filter(concept_id=concept_id).first()
+    return assessment if assessment and assessment.questions else None
+
+
+def fallback_notes(concept):
+    """Shown (never stored) when notes generation failed."""
+    return f"# {concept.title}\n\nNotes will be generated when you watch this video."
+
+
+def get_or_generate_notes(concept, wait_timeout=None):
+    """Returns (notes, outcome); notes is None if Gemini failed. See single_flight.run_once."""
+    def generate():
+        # Generate notes using AI and save to database
+        notes = NotesGeneratorService.generate_notes(concept.title, concept.description)
+        if notes is None:
+            # Gemini failed: keep the stored notes so the next request/warmup retries
+            return None
+        Concept.objects.filter(id=concept.id).update(notes=notes)
+        # update() skips the post_save signal: bump the course version here
+        bump_content_version(concept.chapter.course_id)
+        return notes
+
+    return single_flight.run_once(
+        f"notes:{concept.id}", lambda: stored_notes(concept.id), generate, wait_timeout=wait_timeout
+    )
+
+
+def get_or_generate_quiz(concept, wait_timeout=None):
+    """Returns (assessment, outcome); assessment is None if Gemini returned nothing."""
+    def generate():
+        # Prefer the generated notes (may have been written since `concept` was loaded)
+        source = stored_notes(concept.id) or concept.notes or concept.description
+        quiz_data = QuizGeneratorService.generate_quiz(concept.title, source)
+        if not quiz_data:
+            return None
+
+        # Create or update assessment
+        assessment, created = Assessment.objects.get_or_create(
+            concept=concept,
+            defaults={'questions': quiz_data, 'time_limit': 10}
+        )
+        if not created:
+            assessment.questions = quiz_data
+            assessment.save()
+        return assessment
+
+    return single_flight.run_once(
+        f"quiz:{concept.id}", lambda: stored_quiz(concept.id), generate, wait_timeout=wait_timeout
+    )
@@ -0,0 +1,76 @@
+"""
+Versioned caching for course trees (CourseDetailView, RoadmapDetailView).
+
+The serialized chapter/concept tree is the same for every learner except the
+`completed` flags, so it is cached once per (course, content_version) with all
+flags False, and each request merges in the user's completed concept IDs
+(one indexed query). Course.content_version is bumped on any course, chapter
+or concept change (api/signals.py), which retires old cache entries and ETags.
+
+ETags are strong and derived from the version plus the per-user parts of the
+response, so a 304 costs the version lookup and the completion query and
+never touches the tree.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from ..models import ConceptProgress, Course
+from ..serializers import CourseSerializer
+
+CACHE_CONTROL = 'private, no-cache'  # Per-user flags: revalidate every time, never share
+
+
+def _identity(course):
+    # created_at guards against a recreated course reusing a deleted one's id (SQLite does that)
+    return f"{course.id}:{course.created_at.timestamp():.6f}:v{course.content_version}"
+
+
+def cache_key(course):
+    return f"course-tree:{_identity(course)}"
+
+
+def get_tree(course):
+    """The course's serialized tree with every `completed` False. `course` needs id, created_at and content_version."""
+    key = cache_key(course)
+    tree = cache.get(key)
+    if tree is None:
+        fresh = Course.objects.prefetch_related('chapters__concepts').get(pk=course.pk)
+        tree = dict(CourseSerializer(fresh, context={'completed_concept_ids': frozenset()}).data)
+        # Keyed by the version read with the request; a concurrent bump just
+        # leaves this entry unreachable
+        cache.set(key, tree, settings.COURSE_TREE_CACHE_TTL)
+    return tree
+
+
+def completed_ids(user, course_id):
+    if user is None or not user.is_authenticated:
+        return frozenset()
+    return frozenset(
+        ConceptProgress.objects.filter(
+            user=user, completed=True, concept__chapter__course_id=course_id
+        ).values_list('concept_id', flat=True)
+    )
+
+
+def with_completion(tree, completed):
+    """A copy of the cached tree with the user's `completed` flags set (the cached dict is not mutated)."""
+    return {
+        **tree,
+        'chapters': [
+            {
+                **chapter,
+                'concepts': [
+                    {**concept, 'completed': concept['id'] in completed}
+                    for concept in chapter['concepts']
+                ],
+            }
+            for chapter in tree['chapters']
+        ],
+    }
+
+
+def make_etag(course, completed, *extra):
+    """Strong ETag over the course version, the completed IDs and any per-response `extra` values."""
+    parts = [_identity(course), ','.join(map(str, sorted(completed)))]
+    parts.extend(str(value) for value in extra)
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
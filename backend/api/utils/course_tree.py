@@ -0,0 +1,63 @@
+from django.db import connection, transaction
+from django.db.models import F
+from ..models import Course, Chapter, Concept, Assessment
+
+
+def bump_content_version(course_id):
+    """Invalidates the course's cached tree and ETags (see utils/course_cache.py)."""
+    Course.objects.filter(pk=course_id).update(content_version=F('content_version') + 1)
+
+
+def _with_pks(objs, queryset):
+    """
+    bulk_create only fills in primary keys on backends that support
+    INSERT ... RETURNING; elsewhere re-read the rows in insertion order.
+    """
+    if not objs or objs[0].pk is not None or connection.features.can_return_rows_from_bulk_insert:
+        return objs
+    return list(queryset.order_by('id'))
+
+
+@transaction.atomic
+def create_course_tree(course_fields, chapters, batch_size=500):
+    """
+    Writes a whole course in one transaction with one bulk INSERT per level.
+
+    course_fields: kwargs for Course.
+    chapters: [{'title', 'description'?, 'order'?, 'concepts': [concept kwargs, ...]}, ...]
+        Concept kwargs may carry an 'assessment' dict (Assessment kwargs).
+    Chapter/concept order defaults to their 1-based position.
+    """
+    course = Course.objects.create(**course_fields)
+
+    chapter_objs = Chapter.objects.bulk_create([
+        Chapter(
+            course=course,
+            title=chap['title'],
+            description=chap.get('description', ''),
+            order=chap.get('order', i + 1),
+        )
+        for i, chap in enumerate(chapters)
+    ], batch_size=batch_size)
+    chapter_objs = _with_pks(chapter_objs, Chapter.objects.filter(course=course))
+
+    concept_objs = []
+    assessments = []
+    for chapter, chap in zip(chapter_objs, chapters):
+        for j, concept_data in enumerate(chap.get('concepts', [])):
+            concept_data = dict(concept_data)
+            assessments.append(concept_data.pop('assessment', None))
+            concept_data.setdefault('order', j + 1)
+            concept_objs.append(Concept(chapter=chapter, **concept_data))
+
+    concept_objs = Concept.objects.bulk_create(concept_objs, batch_size=batch_size)
+
+    if any(assessments):
+        concept_objs = _with_pks(concept_objs, Concept.objects.filter(chapter__course=course))
+        Assessment.objects.bulk_create([
+            Assessment(concept=concept, **assessment)
+            for concept, assessment in zip(concept_objs, assessments)
+            if assessment
+        ], batch_size=batch_size)
+
+    return course
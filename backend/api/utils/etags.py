@@ -0,0 +1,26 @@
+"""Conditional GET helpers (ETag / If-None-Match) for function-based API views."""
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+
+def if_none_match(request, etag):
+    """True if the client's If-None-Match already covers `etag` (weak comparison)."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header or not etag:
+        return False
+    etags = parse_etags(header)
+    if '*' in etags:
+        return True
+    quoted = quote_etag(etag)
+    return any(tag.removeprefix('W/') == quoted for tag in etags)
+
+
+def set_etag(response, etag, cache_control=None):
+    response['ETag'] = quote_etag(etag)
+    if cache_control:
+        response['Cache-Control'] = cache_control
+    return response
+
+
+def not_modified(etag, cache_control=None):
+    return set_etag(HttpResponseNotModified(), etag, cache_control)
@@ -0,0 +1,141 @@
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from ..models import LeaderboardScore, ConceptProgress, Roadmap
+
+BADGES = ['🥇', '🥈', '🥉']
+
+
+def _apply(user_id, concepts=0, roadmaps=0):
+    """Applies a delta to the user's score row with a single UPDATE. Returns False if there is no row."""
+    points = concepts * LeaderboardScore.CONCEPT_POINTS + roadmaps * LeaderboardScore.ROADMAP_POINTS
+    return bool(LeaderboardScore.objects.filter(user_id=user_id).update(
+        concepts_completed=F('concepts_completed') + concepts,
+        roadmaps_count=F('roadmaps_count') + roadmaps,
+        points=F('points') + points,
+    ))
+
+
+def _bump(user, concepts=0, roadmaps=0):
+    """
+    Applies a delta to the user's score row.
+    Creates the row from the user's full history if it doesn't exist yet.
+    """
+    if not _apply(user.id, concepts, roadmaps):
+        refresh_user_score(user)
+
+
+def record_concept_completed(user):
+    """Call once per newly completed concept."""
+    _bump(user, concepts=1)
+
+
+def record_roadmap_created(user):
+    """Call once per new enrollment (Roadmap row)."""
+    _bump(user, roadmaps=1)
+
+
+def record_roadmap_deleted(user_id):
+    """
+    Called from the Roadmap post_delete signal (api/signals.py), so cascade
+    deletes are counted too. Never creates a row: the user may be being
+    deleted, and a missing row is rebuilt from history on the next score.
+    """
+    _apply(user_id, roadmaps=-1)
+
+
+def record_concept_progress_deleted(user_id):
+    """ConceptProgress post_delete counterpart of record_roadmap_deleted (completed rows only)."""
+    _apply(user_id, concepts=-1)
+
+
+def record_username_changed(user):
+    LeaderboardScore.objects.filter(user=user).exclude(username=user.username).update(username=user.username)
+
+
+def refresh_user_score(user):
+    """
+    Recomputes a single user's score from ConceptProgress/Roadmap.
+    Used the first time a user scores and to heal drift.
+    """
+    concepts = ConceptProgress.objects.filter(user=user, completed=True).count()
+    roadmaps = Roadmap.objects.filter(user=user).count()
+    values = {
+        'username': user.username,
+        'concepts_completed': concepts,
+        'roadmaps_count': roadmaps,
+        'points': concepts * LeaderboardScore.CONCEPT_POINTS + roadmaps * LeaderboardScore.ROADMAP_POINTS,
+    }
+    try:
+        with transaction.atomic():
+            score, _ = LeaderboardScore.objects.update_or_create(user=user, defaults=values)
+    except IntegrityError:
+        # A concurrent first score created the row in between: the recount above is still current
+        LeaderboardScore.objects.filter(user=user).update(**values)
+        score = LeaderboardScore.objects.get(user=user)
+    return score
+
+
+def rebuild_leaderboard(batch_size=1000):
+    """
+    Rebuilds every score row from scratch using one aggregate query.
+    Returns the number of rows written.
+    """
+    users = User.objects.annotate(
+        concepts=Count('concept_progress', filter=Q(concept_progress__completed=True), distinct=True),
+        roadmaps_total=Count('roadmaps', distinct=True),
+    ).filter(Q(concepts__gt=0) | Q(roadmaps_total__gt=0)).values_list('id', 'username', 'concepts', 'roadmaps_total')
+
+    rows = [
+        LeaderboardScore(
+            user_id=user_id,
+            username=username,
+            concepts_completed=concepts,
+            roadmaps_count=roadmaps,
+            points=concepts * LeaderboardScore.CONCEPT_POINTS + roadmaps * LeaderboardScore.ROADMAP_POINTS,
+        )
+        for user_id, username, concepts, roadmaps in users.iterator(chunk_size=batch_size)
+    ]
+
+    with transaction.atomic():
+        LeaderboardScore.objects.all().delete()
+        LeaderboardScore.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def ranked_scores():
+    """
+    Users eligible for the leaderboard (at least one completed concept),
+    in rank order: points DESC, then username ASC.
+    """
+    return LeaderboardScore.objects.filter(concepts_completed__gt=0).order_by('-points', 'username')
+
+
+def get_top(limit=5):
+    """Returns the top `limit` leaderboard entries from a single indexed query."""
+    top = ranked_scores().select_related('user')[:limit]
+
+    entries = []
+    for i, score in enumerate(top):
+        user = score.user
+        entries.append({
+            'rank': i + 1,
+            'name': f"{user.first_name} {user.last_name}".strip() or user.username,
+            'username': score.username,
+            'points': score.points,
+            'badge': BADGES[i] if i < len(BADGES) else str(i + 1),
+        })
+    return entries
+
+
+def get_rank(user):
+    """
+    Returns the user's 1-based leaderboard rank with a single COUNT over the
+    (points DESC, username ASC) index. Users without completed concepts are
+    ranked as if they were on the board, like the old in-memory sort did.
+    """
+    score = LeaderboardScore.objects.filter(user=user).first() or refresh_user_score(user)
+    ahead = ranked_scores().exclude(user=user).filter(
+        Q(points__gt=score.points) | Q(points=score.points, username__lt=score.username)
+    ).count()
+    return ahead + 1
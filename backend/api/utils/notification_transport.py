@@ -0,0 +1,106 @@
+"""
+Long-lived delivery clients for notifications.
+
+Email goes out over one SMTP connection per batch (get_connection + send_messages)
+instead of a connect/login/quit per message. WhatsApp uses one process-wide
+Twilio Client whose requests.Session keeps HTTPS connections to the API alive;
+a batch is sent from a small thread pool over that shared pool.
+"""
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.mail import get_connection
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+_twilio_lock = threading.Lock()
+_twilio_client = None
+
+
+def twilio_client():
+    """The shared Twilio Client, created on first use."""
+    global _twilio_client
+    with _twilio_lock:
+        if _twilio_client is None:
+            http_client = TwilioHttpClient(pool_connections=True, timeout=settings.TWILIO_TIMEOUT)
+            if getattr(http_client, 'session', None) is not None:
+                adapter = HTTPAdapter(pool_maxsize=settings.NOTIFICATION_WHATSAPP_WORKERS)
+                http_client.session.mount('https://', adapter)
+            _twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, http_client=http_client)
+        return _twilio_client
+
+
+def reset_twilio_client():
+    """Drops the shared client (credentials changed, tests)."""
+    global _twilio_client
+    with _twilio_lock:
+        _twilio_client = None
+
+
+def send_whatsapp(to, body):
+    twilio_client().messages.create(
+        from_=f"whatsapp:{settings.TWILIO_WHATSAPP_NUMBER}",
+        body=body,
+        to=f"whatsapp:{to}"
+    )
+
+
+def send_whatsapp_batch(messages, limiter=None):
+    """
+    Sends [(to, body), ...] concurrently over the shared client.
+    Returns one entry per message: None on success, else the exception.
+    `limiter` (rate_limit.TokenBucket) is acquired before each message.
+    """
+    def send(message):
+        try:
+            if limiter:
+                limiter.acquire()
+            send_whatsapp(*message)
+            return None
+        except Exception as e:
+            return e
+
+    if len(messages) <= 1:
+        return [send(message) for message in messages]
+    workers = min(settings.NOTIFICATION_WHATSAPP_WORKERS, len(messages))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(send, messages))
+
+
+def send_email_batch(messages, limiter=None):
+    """
+    Sends EmailMessages over a single SMTP connection.
+    Returns one entry per message: None on success, else the exception.
+    `limiter` (rate_limit.TokenBucket) is acquired before each message.
+    """
+    if not messages:
+        return []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        return [e] * len(messages)
+
+    errors = []
+    try:
+        for message in messages:
+            if limiter:
+                limiter.acquire()
+            try:
+                connection.send_messages([message])
+                errors.append(None)
+            except smtplib.SMTPServerDisconnected as e:
+                errors.append(e)
+                # Reconnect for the rest of the batch
+                connection.close()
+                connection.open()
+            except Exception as e:
+                errors.append(e)
+    except Exception as e:
+        # Reconnect failed: the remaining messages get the same error
+        errors.extend([e] * (len(messages) - len(errors)))
+    finally:
+        connection.close()
+    return errors
@@ -1,7 +1,11 @@
+import smtplib
+from datetime import timedelta
 from django.core.mail import send_mail, EmailMessage
 from django.conf import settings
-from twilio.rest import Client
-from ..models import NotificationLog
+from django.db.models import F
+from django.utils import timezone
+from ..models import NotificationLog, NotificationOutbox
+from . import notification_transport
 
 def send_email_notification(user, subject, message, attachment=None):
     """
@@ -56,14 +60,8 @@ def send_whatsapp_notification(user, message_body):
             print("⚠️ User has no phone profile/number")
             return False
 
-        # Init Twilio Client
-        client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-        
-        message = client.messages.create(
-            from_=f"whatsapp:{settings.TWILIO_WHATSAPP_NUMBER}",
-            body=message_body,
-            to=f"whatsapp:{user.profile.phone_number}"
-        )
+        # Shared Twilio Client (pooled HTTPS session)
+        notification_transport.send_whatsapp(user.profile.phone_number, message_body)
         
         NotificationLog.objects.create(
             user=user,
@@ -85,3 +83,169 @@ def send_whatsapp_notification(user, message_body):
         )
         print(f"❌ WhatsApp failed: {e}")
         return False
+
+
+# --- Outbox: queue in the request, deliver in `manage.py dispatch_notifications` ---
+
+def _queue(user, channel, recipient, event_name, body, subject='', attachment=None):
+    log = NotificationLog.objects.create(
+        user=user,
+        notification_type=channel,
+        event_name=event_name[:100],
+        recipient=recipient,
+        status='QUEUED'
+    )
+    item = NotificationOutbox(
+        user=user,
+        channel=channel,
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        log=log,
+        max_attempts=settings.NOTIFICATION_MAX_ATTEMPTS,
+    )
+    if attachment:
+        item.attachment_name, item.attachment_content, item.attachment_mimetype = attachment
+    item.save()
+    return item
+
+
+def queue_email_notification(user, subject, message, attachment=None):
+    """
+    Queues an email for the dispatcher (same arguments as send_email_notification).
+    Returns the NotificationOutbox row, or None if the user has no email.
+    """
+    if not user.email:
+        print(f"⚠️ User {user.username} has no email")
+        return None
+    return _queue(user, 'EMAIL', user.email, subject, message, subject=subject, attachment=attachment)
+
+
+def queue_whatsapp_notification(user, message_body):
+    """Queues a WhatsApp message. Returns None if the user has no phone number."""
+    if not hasattr(user, 'profile') or not user.profile.phone_number:
+        print("⚠️ User has no phone profile/number")
+        return None
+    return _queue(user, 'WHATSAPP', str(user.profile.phone_number), "WhatsApp Message", message_body)
+
+
+def _is_permanent(exc):
+    """Errors that retrying cannot fix: rejected recipients, Twilio 4xx (except rate limits)."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    status = getattr(exc, 'status', None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+def _email_message(item):
+    email = EmailMessage(
+        subject=item.subject,
+        body=item.body,
+        from_email=settings.EMAIL_HOST_USER,
+        to=[item.recipient]
+    )
+    if item.attachment_name:
+        email.attach(item.attachment_name, bytes(item.attachment_content), item.attachment_mimetype)
+    return email
+
+
+def _deliver(items):
+    """Sends a batch per channel; returns {item.id: exception or None}."""
+    emails = [item for item in items if item.channel == 'EMAIL']
+    whatsapps = [item for item in items if item.channel == 'WHATSAPP']
+
+    errors = {}
+    if emails:
+        results = notification_transport.send_email_batch([_email_message(item) for item in emails])
+        errors.update(zip((item.id for item in emails), results))
+    if whatsapps:
+        results = notification_transport.send_whatsapp_batch([(item.recipient, item.body) for item in whatsapps])
+        errors.update(zip((item.id for item in whatsapps), results))
+    return errors
+
+
+def claim_batch(limit=None):
+    """Atomically moves up to `limit` due PENDING rows to SENDING and returns them."""
+    limit = limit or settings.NOTIFICATION_BATCH_SIZE
+    now = timezone.now()
+    ids = list(
+        NotificationOutbox.objects.filter(status='PENDING', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id').values_list('id', flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    NotificationOutbox.objects.filter(id__in=ids, status='PENDING').update(
+        status='SENDING', locked_at=now, attempts=F('attempts') + 1
+    )
+    # Rows another dispatcher claimed first keep their own locked_at
+    return list(NotificationOutbox.objects.filter(id__in=ids, status='SENDING', locked_at=now).select_related('log'))
+
+
+def requeue_stale():
+    """Puts SENDING rows whose dispatcher died back into the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.NOTIFICATION_STALE_AFTER)
+    return NotificationOutbox.objects.filter(status='SENDING', locked_at__lt=cutoff).update(
+        status='PENDING', locked_at=None
+    )
+
+
+def _record(item, error=None):
+    """Applies a delivery outcome to the outbox row and its NotificationLog (not saved)."""
+    now = timezone.now()
+    item.locked_at = None
+    log = item.log
+    if error is None:
+        item.status = 'SENT'
+        item.sent_at = now
+        item.last_error = ''
+        if log:
+            log.status = 'SENT'
+            log.error_message = None
+        print(f"✅ {item.channel} sent to {item.recipient}")
+        return 'sent'
+
+    item.last_error = str(error)
+    if log:
+        log.error_message = str(error)
+    if not _is_permanent(error) and item.attempts < item.max_attempts:
+        delay = min(
+            settings.NOTIFICATION_RETRY_DELAY * (2 ** (item.attempts - 1)),
+            settings.NOTIFICATION_RETRY_MAX_DELAY
+        )
+        item.status = 'PENDING'
+        item.next_attempt_at = now + timedelta(seconds=delay)
+        print(f"⚠️ {item.channel} to {item.recipient} failed (attempt {item.attempts}/{item.max_attempts}), retrying in {delay}s: {error}")
+        return 'retrying'
+
+    item.status = 'DEAD'
+    if log:
+        log.status = 'FAILED'
+    print(f"❌ {item.channel} to {item.recipient} dead-lettered: {error}")
+    return 'dead'
+
+
+def dispatch_batch(limit=None):
+    """Delivers one batch from the outbox. Returns counts of sent/retrying/dead rows."""
+    items = claim_batch(limit)
+    counts = {'sent': 0, 'retrying': 0, 'dead': 0}
+    errors = _deliver(items)
+    for item in items:
+        counts[_record(item, errors.get(item.id))] += 1
+
+    NotificationOutbox.objects.bulk_update(
+        items, ['status', 'locked_at', 'last_error', 'next_attempt_at', 'sent_at']
+    )
+    logs = [item.log for item in items if item.log]
+    NotificationLog.objects.bulk_update(logs, ['status', 'error_message'])
+    return counts
+
+
+def dispatch_pending(limit=None):
+    """Drains every due row, batch by batch. Returns the summed counts."""
+    totals = {'sent': 0, 'retrying': 0, 'dead': 0}
+    while True:
+        counts = dispatch_batch(limit)
+        if not any(counts.values()):
+            return totals
+        for key, value in counts.items():
+            totals[key] += value
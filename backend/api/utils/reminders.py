@@ -0,0 +1,184 @@
+"""
+Daily study reminders for learners who have not studied yet today.
+
+Due users (a daily_study_time goal and no activity today) are walked in id
+order, REMINDER_BATCH_SIZE at a time. Each batch is rendered in memory, sent
+over the pooled transports (parallel SMTP connections, shared Twilio session)
+under per-channel rate limits, then logged with one bulk_create. The campaign
+cursor is committed with the logs, so a rerun resumes after the last finished
+batch (a batch cut off mid-send may be delivered twice).
+
+A run claims the campaign with a conditional UPDATE on `locked_at` (like the
+outbox and warmup queues) and renews it with every batch commit, so a second
+`send_daily_reminders` started while one is running exits instead of sending
+the same users again. A lease older than REMINDER_CAMPAIGN_STALE_AFTER belongs
+to a dead run and can be taken over.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from ..models import NotificationLog, ReminderCampaign
+from . import notification_transport
+from .rate_limit import TokenBucket
+
+EVENT_NAME = 'Daily Reminder'
+CHANNELS = ('EMAIL', 'WHATSAPP')
+
+
+def due_users(day):
+    """Active users with a daily goal whose last activity is before `day` (or never)."""
+    return User.objects.filter(
+        is_active=True, profile__daily_study_time__gt=0
+    ).exclude(progress__last_activity_date__gte=day)
+
+
+def render_email(user):
+    minutes = user['profile__daily_study_time']
+    return EmailMessage(
+        subject=f"⏰ Time for your {minutes}-minute study session",
+        body=(
+            f"Hi {user['username']},\n\n"
+            f"You haven't studied yet today. Your goal is {minutes} minutes - "
+            f"pick up where you left off and keep your streak alive!\n\n"
+            f"- The SkillMeter Team"
+        ),
+        from_email=settings.EMAIL_HOST_USER,
+        to=[user['email']]
+    )
+
+
+def render_whatsapp(user):
+    minutes = user['profile__daily_study_time']
+    return f"⏰ Hi {user['username']}! Your {minutes}-minute SkillMeter session is waiting. Keep your streak going! 🔥"
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def send_batch(users, channels=CHANNELS, limiters=None):
+    """Sends reminders to a batch of user rows; returns unsaved NotificationLog objects."""
+    limiters = limiters or {}
+    deliveries = []  # (user, channel, recipient) in the order of `results`
+    jobs = []
+
+    if 'EMAIL' in channels:
+        recipients = [user for user in users if user['email']]
+        for chunk in _chunks(recipients, settings.REMINDER_SMTP_BATCH):
+            deliveries.extend((user, 'EMAIL', user['email']) for user in chunk)
+            jobs.append((notification_transport.send_email_batch, [render_email(user) for user in chunk], limiters.get('EMAIL')))
+
+    if 'WHATSAPP' in channels:
+        recipients = [user for user in users if user['profile__phone_number']]
+        if recipients:
+            deliveries.extend((user, 'WHATSAPP', user['profile__phone_number']) for user in recipients)
+            messages = [(user['profile__phone_number'], render_whatsapp(user)) for user in recipients]
+            jobs.append((notification_transport.send_whatsapp_batch, messages, limiters.get('WHATSAPP')))
+
+    results = []
+    if jobs:
+        with ThreadPoolExecutor(max_workers=settings.REMINDER_EMAIL_WORKERS + 1) as executor:
+            futures = [executor.submit(send, messages, limiter) for send, messages, limiter in jobs]
+            for future in futures:
+                results.extend(future.result())
+
+    return [
+        NotificationLog(
+            user_id=user['id'],
+            notification_type=channel,
+            event_name=EVENT_NAME,
+            recipient=recipient,
+            status='SENT' if error is None else 'FAILED',
+            error_message=None if error is None else str(error),
+        )
+        for (user, channel, recipient), error in zip(deliveries, results)
+    ]
+
+
+def _claim(campaign, restart=False):
+    """Takes the campaign's lease unless a live run holds it. Returns False if another run won."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.REMINDER_CAMPAIGN_STALE_AFTER)
+    claimable = ReminderCampaign.objects.filter(pk=campaign.pk).filter(Q(locked_at__isnull=True) | Q(locked_at__lt=stale))
+    if not restart:
+        claimable = claimable.filter(status='RUNNING')
+    claimed = claimable.update(locked_at=now, updated_at=now)
+    if claimed:
+        campaign.refresh_from_db()
+    return bool(claimed)
+
+
+def _held(campaign):
+    """The campaign row, only while this run's lease is still the current one."""
+    return ReminderCampaign.objects.filter(pk=campaign.pk, locked_at=campaign.locked_at)
+
+
+def run_campaign(day=None, channels=CHANNELS, batch_size=None, restart=False, on_batch=None):
+    """
+    Runs (or resumes) the reminder campaign for `day`. Returns the ReminderCampaign,
+    or None if another run is sending it (or took it over mid-run).
+    `on_batch(campaign)` is called after each committed batch.
+    """
+    day = day or timezone.now().date()
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    campaign, _ = ReminderCampaign.objects.get_or_create(date=day)
+    if campaign.status == 'COMPLETED' and not restart:
+        return campaign
+    if not _claim(campaign, restart):
+        return None
+
+    try:
+        if restart:
+            campaign.status = 'RUNNING'
+            campaign.cursor = campaign.users_processed = campaign.sent = campaign.failed = 0
+            campaign.finished_at = None
+            campaign.save()
+
+        rates = {
+            'EMAIL': settings.REMINDER_EMAIL_RATE_PER_MINUTE,
+            'WHATSAPP': settings.REMINDER_WHATSAPP_RATE_PER_MINUTE,
+        }
+        limiters = {channel: TokenBucket(rate) for channel, rate in rates.items() if rate > 0}  # 0 = unlimited
+        users = due_users(day).order_by('id').values(
+            'id', 'username', 'email', 'profile__phone_number', 'profile__daily_study_time'
+        )
+
+        while True:
+            batch = list(users.filter(id__gt=campaign.cursor)[:batch_size])
+            if not batch:
+                break
+
+            logs = send_batch(batch, channels, limiters)
+            sent = sum(log.status == 'SENT' for log in logs)
+
+            with transaction.atomic():
+                NotificationLog.objects.bulk_create(logs, batch_size=1000)
+                now = timezone.now()
+                kept = _held(campaign).update(
+                    cursor=batch[-1]['id'],
+                    users_processed=F('users_processed') + len(batch),
+                    sent=F('sent') + sent,
+                    failed=F('failed') + len(logs) - sent,
+                    locked_at=now,
+                    updated_at=now,
+                )
+            if not kept:
+                return None  # Our lease went stale and another run took over
+            campaign.refresh_from_db()
+
+            if on_batch:
+                on_batch(campaign)
+
+        now = timezone.now()
+        if not _held(campaign).update(status='COMPLETED', finished_at=now, locked_at=None, updated_at=now):
+            return None
+        campaign.refresh_from_db()
+        return campaign
+    except BaseException:
+        _held(campaign).update(locked_at=None)  # Let a rerun resume right away
+        raise
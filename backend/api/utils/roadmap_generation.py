@@ -0,0 +1,274 @@
+"""
+DB-backed job queue for AI roadmap generation.
+
+generate_roadmap_ai enqueues a RoadmapGenerationJob and returns immediately;
+`manage.py run_roadmap_worker` claims jobs and runs them stage by stage
+(outline -> enriching -> persisting). Transient LLM failures are retried
+with exponential backoff.
+
+Generated courses are shared: requests for the same normalized
+(topic, skill level, prompt version) reuse a fresh course instead of calling
+Gemini again, and concurrent identical jobs wait for the first one.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from ..models import Course, Roadmap, RoadmapGenerationJob
+from ..services import ContentDiscoveryService
+from . import leaderboard, roadmap_progress, warmup
+from .concept_content import NOTES_PLACEHOLDER
+from .course_tree import create_course_tree
+
+
+class GenerationError(Exception):
+    """Permanent failure: the job is marked FAILED without retrying."""
+
+
+def is_transient(exc):
+    """Errors worth retrying: timeouts, rate limits, 5xx and malformed LLM output."""
+    if isinstance(exc, (TimeoutError, ConnectionError, json.JSONDecodeError)):
+        return True
+    try:
+        import requests
+        if isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            return True
+    except ImportError:
+        pass
+    try:
+        from google.api_core import exceptions as google_exceptions
+        return isinstance(exc, (
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.InternalServerError,
+            google_exceptions.TooManyRequests,
+        ))
+    except ImportError:
+        return False
+
+
+def generation_key(topic, skill_level):
+    """Content address of a generated course: normalized topic + skill level + prompt version."""
+    normalized = ' '.join(topic.lower().split())
+    raw = f"{normalized}|{skill_level.lower()}|v{ContentDiscoveryService.PROMPT_VERSION}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def find_cached_course(key):
+    """Most recent generated course for this key that is still within ROADMAP_CACHE_MAX_AGE."""
+    max_age = settings.ROADMAP_CACHE_MAX_AGE
+    if max_age <= 0:
+        return None
+    return Course.objects.filter(
+        generation_key=key, created_at__gte=timezone.now() - timedelta(seconds=max_age)
+    ).order_by('-created_at').first()
+
+
+def enroll(user, course):
+    """Enrolls the user in an existing course (idempotent)."""
+    roadmap, created = Roadmap.objects.get_or_create(
+        user=user,
+        course=course,
+        defaults={'current_chapter': 0, 'current_concept': 0}
+    )
+    if created:
+        roadmap_progress.initialize(roadmap)
+        leaderboard.record_roadmap_created(user)
+        warmup.schedule_for_roadmap(roadmap)
+    return roadmap
+
+
+def _succeed(job, roadmap):
+    job.roadmap = roadmap
+    job.status = 'SUCCEEDED'
+    job.stage = 'done'
+    job.error = ''
+    job.locked_at = None
+    job.save()
+    return job
+
+
+@transaction.atomic
+def build_roadmap(user, topic, skill_level, ai_data, key=''):
+    """Creates the Course/Chapter/Concept tree from Gemini output and enrolls the user."""
+    if 'course' not in ai_data:
+        raise GenerationError('AI returned invalid format. Try again.')
+
+    course_data = ai_data['course']
+
+    chapters = []
+    for i, chap_data in enumerate(ai_data.get('chapters', [])):
+        concepts = []
+        for concept_data in chap_data.get('concepts', []):
+            # Notes/Quiz are generated on demand later
+            # Prioritize real video URL from YouTube API
+            if 'video_url' in concept_data and concept_data['video_url']:
+                 video_url = concept_data['video_url']
+            else:
+                 # Fallback to search query
+                 query = concept_data.get('video_search_query', concept_data.get('title', ''))
+                 video_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
+
+            concepts.append({
+                'title': concept_data['title'],
+                'description': concept_data.get('description', ''),
+                'video_url': video_url,
+                'duration': concept_data.get('duration_minutes', 15),
+                'notes': f"# {concept_data['title']}\n\n{concept_data.get('description', '')}\n\n{NOTES_PLACEHOLDER}",
+                'content_type': 'video',
+            })
+        chapters.append({'title': chap_data.get('title', f"Chapter {i+1}"), 'concepts': concepts})
+
+    # 1. Create Course, Chapters and Concepts (one atomic bulk write)
+    course = create_course_tree({
+        'title': course_data.get('title', f"Learn {topic}"),
+        'description': course_data.get('description', f"AI-generated course for {topic}"),
+        'thumbnail': course_data.get('thumbnail', ''), # Use dynamic thumbnail
+        'difficulty': skill_level,
+        'estimated_hours': course_data.get('estimated_hours', 10),
+        'tags': course_data.get('tags', [topic, 'AI Generated']),
+        'generation_key': key,
+    }, chapters)
+
+    # 2. Enroll User
+    roadmap = Roadmap.objects.create(
+        user=user,
+        course=course,
+        current_chapter=0,
+        current_concept=0
+    )
+    roadmap_progress.initialize(roadmap)
+    leaderboard.record_roadmap_created(user)
+    warmup.schedule_for_roadmap(roadmap)
+    return roadmap
+
+
+def enqueue(user, topic, skill_level):
+    key = generation_key(topic, skill_level)
+    job = RoadmapGenerationJob.objects.create(
+        user=user,
+        topic=topic,
+        skill_level=skill_level,
+        generation_key=key,
+        max_attempts=settings.ROADMAP_JOB_MAX_ATTEMPTS,
+    )
+
+    # Cache hit: enroll right away, no worker round-trip
+    cached = find_cached_course(key)
+    if cached:
+        return _succeed(job, enroll(user, cached))
+
+    if settings.ROADMAP_JOBS_EAGER:
+        # Dev/test mode: run inline instead of waiting for a worker
+        if claim(job):
+            process_job(job)
+        job.refresh_from_db()
+    return job
+
+
+def claim(job):
+    """Atomically moves a PENDING job to RUNNING. Returns False if another worker won."""
+    now = timezone.now()
+    claimed = RoadmapGenerationJob.objects.filter(pk=job.pk, status='PENDING').update(
+        status='RUNNING', locked_at=now, attempts=F('attempts') + 1, updated_at=now
+    )
+    if claimed:
+        job.refresh_from_db()
+    return bool(claimed)
+
+
+def claim_next_job():
+    """Claims the oldest job that is due, or returns None if the queue is empty."""
+    candidates = RoadmapGenerationJob.objects.filter(
+        status='PENDING', run_after__lte=timezone.now()
+    ).order_by('created_at')[:10]
+    for job in candidates:
+        if claim(job):
+            return job
+    return None
+
+
+def requeue_stale_jobs():
+    """Puts RUNNING jobs whose worker died back into the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.ROADMAP_JOB_STALE_AFTER)
+    return RoadmapGenerationJob.objects.filter(status='RUNNING', locked_at__lt=cutoff).update(
+        status='PENDING', locked_at=None, run_after=timezone.now()
+    )
+
+
+def _set_stage(job, stage):
+    job.stage = stage
+    job.save(update_fields=['stage', 'updated_at'])
+
+
+def _defer_to_leader(job):
+    """
+    Single flight: if an older job for the same key is already running, put this
+    one back in the queue (without spending an attempt) so it can reuse the result.
+    """
+    if not job.generation_key:
+        return False
+    leader_running = RoadmapGenerationJob.objects.filter(
+        generation_key=job.generation_key, status='RUNNING', id__lt=job.id
+    ).exists()
+    if leader_running:
+        RoadmapGenerationJob.objects.filter(pk=job.pk).update(
+            status='PENDING',
+            locked_at=None,
+            attempts=F('attempts') - 1,
+            run_after=timezone.now() + timedelta(seconds=settings.ROADMAP_JOB_COALESCE_DELAY),
+            updated_at=timezone.now(),
+        )
+        job.refresh_from_db()
+    return leader_running
+
+
+def process_job(job):
+    """Runs a claimed job through every stage and records the outcome."""
+    try:
+        # Another job may have generated this course while we were queued
+        cached = find_cached_course(job.generation_key) if job.generation_key else None
+        if cached:
+            return _succeed(job, enroll(job.user, cached))
+        if _defer_to_leader(job):
+            return job
+
+        _set_stage(job, 'outline')
+        ai_data = ContentDiscoveryService.generate_outline(job.topic, job.skill_level)
+        if not ai_data or 'course' not in ai_data:
+            raise GenerationError('AI returned invalid format. Try again.')
+
+        _set_stage(job, 'enriching')
+        ContentDiscoveryService.enrich_with_videos(ai_data, job.topic)
+
+        _set_stage(job, 'persisting')
+        _succeed(job, build_roadmap(job.user, job.topic, job.skill_level, ai_data, key=job.generation_key))
+    except Exception as e:
+        print(f"Roadmap job {job.id} failed (attempt {job.attempts}/{job.max_attempts}): {e}")
+        job.error = str(e)
+        job.locked_at = None
+        if is_transient(e) and job.attempts < job.max_attempts:
+            delay = settings.ROADMAP_JOB_RETRY_DELAY * (2 ** (job.attempts - 1))
+            job.status = 'PENDING'
+            job.stage = 'queued'
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+        else:
+            job.status = 'FAILED'
+        job.save()
+    return job
+
+
+def run_pending(limit=None):
+    """Processes due jobs until the queue is empty (or `limit` is reached)."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        process_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,169 @@
+"""
+Incremental roadmap progress.
+
+Each Roadmap keeps completed_concepts/total_concepts counters next to its
+progress percentage. A concept completion bumps them with one conditional
+UPDATE (F-expressions, no recount of the course), in the same transaction as
+the ConceptProgress write. Adding or deleting a concept shifts total_concepts
+of every roadmap on the course the same way, and deleting a completed
+ConceptProgress shifts completed_concepts (api/signals.py), so progress can't
+reach 100% early or get stuck below it. `manage.py reconcile_roadmap_progress`
+recounts everything from ConceptProgress/Concept to heal drift from writes that
+send no signals (bulk_create, queryset.update/delete).
+"""
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import LessThanOrEqual
+from django.utils import timezone
+from ..models import Concept, ConceptProgress, Roadmap
+
+
+def percent(completed, total):
+    return min(100, completed * 100 // total) if total > 0 else 0
+
+
+def _progress_expression(completed, total=F('total_concepts')):
+    """SQL for percent(): integer division, 0 for an empty course, capped at 100."""
+    return Case(
+        When(LessThanOrEqual(total, 0), then=Value(0)),
+        When(LessThanOrEqual(total, completed), then=Value(100)),
+        default=completed * 100 / total,
+        output_field=IntegerField(),
+    )
+
+
+def initialize(roadmap):
+    """Sets a new roadmap's counters from the course and the user's history (one-off counts)."""
+    roadmap.total_concepts = Concept.objects.filter(chapter__course_id=roadmap.course_id).count()
+    roadmap.completed_concepts = ConceptProgress.objects.filter(
+        user_id=roadmap.user_id, concept__chapter__course_id=roadmap.course_id, completed=True
+    ).count()
+    roadmap.progress = percent(roadmap.completed_concepts, roadmap.total_concepts)
+    Roadmap.objects.filter(pk=roadmap.pk).update(
+        total_concepts=roadmap.total_concepts,
+        completed_concepts=roadmap.completed_concepts,
+        progress=roadmap.progress,
+    )
+    return roadmap
+
+
+def record_concept_completed(user, course_id):
+    """
+    Call once per newly completed concept, inside the ConceptProgress transaction.
+    Roadmaps whose counters were never set (created outside the enroll paths)
+    are initialized from history instead. Returns True if this completion
+    finished the course (completed_at was just set).
+    """
+    completed = F('completed_concepts') + 1
+    updated = Roadmap.objects.filter(user=user, course_id=course_id, total_concepts__gt=0).update(
+        completed_concepts=completed,
+        progress=_progress_expression(completed),
+    )
+    if not updated:
+        roadmap = Roadmap.objects.filter(user=user, course_id=course_id).first()
+        if roadmap is None:
+            return False
+        initialize(roadmap)
+    # Only the completion that reaches 100% first sets the timestamp
+    return bool(
+        Roadmap.objects.filter(
+            user=user, course_id=course_id, progress__gte=100, completed_at__isnull=True
+        ).update(completed_at=timezone.now())
+    )
+
+
+def _settle(roadmaps):
+    """
+    After counters moved: stamps completed_at on roadmaps that just reached 100%
+    and drops the cached verification of certificates that fell below it.
+    """
+    roadmaps.filter(progress__gte=100, completed_at__isnull=True).update(completed_at=timezone.now())
+    revoked = list(roadmaps.filter(progress__lt=100, certificate_id__isnull=False).values_list('certificate_id', flat=True))
+    if revoked:
+        from .certificate_verification import invalidate  # Pulls in ReportLab; only needed here
+        invalidate(*revoked)
+
+
+def _shift_total(chapter_id, delta):
+    # Filter through the chapter id: the concept row may already be deleted.
+    # Uninitialized roadmaps (total 0) are counted from scratch on first completion.
+    roadmaps = Roadmap.objects.filter(course__chapters__id=chapter_id, total_concepts__gt=0)
+    total = F('total_concepts') + delta
+    roadmaps.update(total_concepts=total, progress=_progress_expression(F('completed_concepts'), total))
+    _settle(roadmaps)
+
+
+def record_concept_added(chapter_id):
+    """A new concept in the chapter's course: every enrolled roadmap has one more to go."""
+    _shift_total(chapter_id, 1)
+
+
+def record_concept_deleted(chapter_id):
+    """A concept left the chapter's course (its completed progress rows are handled separately)."""
+    _shift_total(chapter_id, -1)
+
+
+def record_completion_deleted(user_id, concept_id):
+    """A completed ConceptProgress row was deleted (e.g. cascading from its concept)."""
+    roadmaps = Roadmap.objects.filter(
+        user_id=user_id, course__chapters__concepts__id=concept_id, completed_concepts__gt=0
+    )
+    completed = F('completed_concepts') - 1
+    roadmaps.update(completed_concepts=completed, progress=_progress_expression(completed))
+    _settle(Roadmap.objects.filter(user_id=user_id, course__chapters__concepts__id=concept_id))
+
+
+def _count_subquery(queryset, outer_field):
+    return Coalesce(
+        Subquery(
+            queryset.values(outer_field).annotate(count=Count('id')).values('count')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def reconcile_roadmaps(batch_size=1000):
+    """
+    Recounts every roadmap's counters with one annotated query and rewrites the
+    rows that drifted. Certificates of roadmaps that dropped below 100% (new
+    concepts, deleted progress) stop verifying. Returns the number of roadmaps fixed.
+    """
+    roadmaps = Roadmap.objects.annotate(
+        actual_total=_count_subquery(
+            Concept.objects.filter(chapter__course_id=OuterRef('course_id')), 'chapter__course_id'
+        ),
+        actual_completed=_count_subquery(
+            ConceptProgress.objects.filter(
+                user_id=OuterRef('user_id'), concept__chapter__course_id=OuterRef('course_id'), completed=True
+            ),
+            'user_id',
+        ),
+    ).only('id', 'progress', 'completed_concepts', 'total_concepts', 'completed_at', 'certificate_id').order_by('id')
+
+    now = timezone.now()
+    fixed = []
+    for roadmap in roadmaps.iterator(chunk_size=batch_size):
+        progress = percent(roadmap.actual_completed, roadmap.actual_total)
+        if (roadmap.total_concepts, roadmap.completed_concepts, roadmap.progress) == (
+            roadmap.actual_total, roadmap.actual_completed, progress
+        ):
+            continue
+        roadmap.total_concepts = roadmap.actual_total
+        roadmap.completed_concepts = roadmap.actual_completed
+        roadmap.progress = progress
+        if progress >= 100 and roadmap.completed_at is None:
+            roadmap.completed_at = now
+        fixed.append(roadmap)
+
+    with transaction.atomic():
+        Roadmap.objects.bulk_update(
+            fixed, ['total_concepts', 'completed_concepts', 'progress', 'completed_at'], batch_size=batch_size
+        )
+    # bulk_update sends no post_save, so drop the cached verifications here
+    revoked = [roadmap.certificate_id for roadmap in fixed if roadmap.certificate_id and roadmap.progress < 100]
+    if revoked:
+        from .certificate_verification import invalidate  # Pulls in ReportLab; only needed here
+        invalidate(*revoked)
+    return len(fixed)
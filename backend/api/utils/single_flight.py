@@ -0,0 +1,65 @@
+"""
+Single-flight execution backed by GenerationLock rows: for a given key, only
+one request runs the (expensive) computation; concurrent requests wait for its
+result or give up with a "pending" status.
+"""
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from ..models import GenerationLock
+
+GENERATED = 'generated'
+CACHED = 'cached'
+PENDING = 'pending'
+
+
+def acquire(key, ttl=None):
+    """Tries to take the lock. Locks past their expiry (crashed holder) are taken over."""
+    now = timezone.now()
+    ttl = settings.GENERATION_LOCK_TTL if ttl is None else ttl
+    GenerationLock.objects.filter(key=key, expires_at__lt=now).delete()
+    try:
+        with transaction.atomic():
+            GenerationLock.objects.create(key=key, expires_at=now + timedelta(seconds=ttl))
+        return True
+    except IntegrityError:
+        return False
+
+
+def release(key):
+    GenerationLock.objects.filter(key=key).delete()
+
+
+def run_once(key, load, compute, wait_timeout=None, poll_interval=None):
+    """
+    load() returns the stored result or None; compute() generates and stores it.
+
+    Returns (result, outcome) where outcome is:
+      CACHED    - result already existed (or another request just produced it)
+      GENERATED - this request ran compute()
+      PENDING   - another request is still generating after wait_timeout; result is None
+    """
+    wait_timeout = settings.GENERATION_WAIT_TIMEOUT if wait_timeout is None else wait_timeout
+    poll_interval = settings.GENERATION_POLL_INTERVAL if poll_interval is None else poll_interval
+
+    deadline = time.monotonic() + wait_timeout
+    while True:
+        result = load()
+        if result is not None:
+            return result, CACHED
+
+        if acquire(key):
+            try:
+                # Re-check: the previous holder may have finished between load() and acquire()
+                result = load()
+                if result is not None:
+                    return result, CACHED
+                return compute(), GENERATED
+            finally:
+                release(key)
+
+        if time.monotonic() >= deadline:
+            return None, PENDING
+        time.sleep(poll_interval)
@@ -0,0 +1,135 @@
+"""
+Study Room statistics.
+
+All-time totals come from the user's StudySessionSummary row (bumped with one
+F-expression UPDATE per saved session, rebuilt from StudySession with a single
+aggregate query when missing). The last-7/30-day windows are summed from at
+most 30 DailyActivity rollup rows. With STUDY_STATS_SUMMARY off, everything
+(totals and windows) comes from one aggregate query over StudySession using
+filtered aggregates.
+"""
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Avg, Count, F, Q, Sum
+from django.utils import timezone
+from ..models import DailyActivity, StudySession, StudySessionSummary
+
+WINDOWS = {'last7Days': 7, 'last30Days': 30}
+
+
+def _window_start(days, today):
+    """Start of the calendar-day window ending today (so both paths agree with DailyActivity)."""
+    return today - timedelta(days=days - 1)
+
+
+def _totals(sessions, focus, study, distractions, average):
+    return {
+        'totalSessions': sessions,
+        'totalFocusTime': focus or 0,  # in seconds
+        'totalStudyTime': study or 0,  # in seconds
+        'totalDistractions': distractions or 0,
+        'averageFocusPercentage': round(average if average is not None else 100.0, 1),
+    }
+
+
+def _window(sessions, focus, study, distractions):
+    return {
+        'sessions': sessions or 0,
+        'focusTime': focus or 0,
+        'studyTime': study or 0,
+        'distractions': distractions or 0,
+    }
+
+
+def aggregate_stats(user, today=None):
+    """Totals and windows from a single aggregate query over the user's sessions."""
+    today = today or timezone.localdate()
+    tz = timezone.get_current_timezone()
+    aggregates = {
+        'sessions': Count('id'),
+        'focus': Sum('focus_duration'),
+        'study': Sum('total_duration'),
+        'distractions': Sum('distraction_count'),
+        'average': Avg('focus_percentage'),
+        'percentage_sum': Sum('focus_percentage'),
+    }
+    for name, days in WINDOWS.items():
+        in_window = Q(started_at__gte=datetime.combine(_window_start(days, today), time.min, tzinfo=tz))
+        aggregates[f'{name}_sessions'] = Count('id', filter=in_window)
+        aggregates[f'{name}_focus'] = Sum('focus_duration', filter=in_window)
+        aggregates[f'{name}_study'] = Sum('total_duration', filter=in_window)
+        aggregates[f'{name}_distractions'] = Sum('distraction_count', filter=in_window)
+    row = StudySession.objects.filter(user=user).aggregate(**aggregates)
+
+    stats = _totals(row['sessions'], row['focus'], row['study'], row['distractions'], row['average'])
+    for name in WINDOWS:
+        stats[name] = _window(
+            row[f'{name}_sessions'], row[f'{name}_focus'], row[f'{name}_study'], row[f'{name}_distractions']
+        )
+    return stats, row
+
+
+def refresh_summary(user):
+    """Rebuilds the user's summary row from StudySession (first use, or to heal drift)."""
+    _, row = aggregate_stats(user)
+    summary, _ = StudySessionSummary.objects.update_or_create(
+        user=user,
+        defaults={
+            'total_sessions': row['sessions'],
+            'total_focus_seconds': row['focus'] or 0,
+            'total_study_seconds': row['study'] or 0,
+            'total_distractions': row['distractions'] or 0,
+            'focus_percentage_sum': row['percentage_sum'] or 0.0,
+        }
+    )
+    return summary
+
+
+def record_session(session):
+    """Call once per saved session, in the same transaction as the insert."""
+    updated = StudySessionSummary.objects.filter(user_id=session.user_id).update(
+        total_sessions=F('total_sessions') + 1,
+        total_focus_seconds=F('total_focus_seconds') + session.focus_duration,
+        total_study_seconds=F('total_study_seconds') + session.total_duration,
+        total_distractions=F('total_distractions') + session.distraction_count,
+        focus_percentage_sum=F('focus_percentage_sum') + session.focus_percentage,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        # The rebuild already sees the new session
+        refresh_summary(session.user)
+
+
+def summary_stats(user, today=None):
+    """Totals from the summary row plus windows from the DailyActivity rollups."""
+    today = today or timezone.localdate()
+    summary = StudySessionSummary.objects.filter(user=user).first() or refresh_summary(user)
+    stats = _totals(
+        summary.total_sessions,
+        summary.total_focus_seconds,
+        summary.total_study_seconds,
+        summary.total_distractions,
+        summary.focus_percentage_sum / summary.total_sessions if summary.total_sessions else None,
+    )
+
+    aggregates = {}
+    for name, days in WINDOWS.items():
+        in_window = Q(date__gte=_window_start(days, today))
+        aggregates[f'{name}_sessions'] = Sum('sessions', filter=in_window)
+        aggregates[f'{name}_focus'] = Sum('focus_seconds', filter=in_window)
+        aggregates[f'{name}_study'] = Sum('study_seconds', filter=in_window)
+        aggregates[f'{name}_distractions'] = Sum('distractions', filter=in_window)
+    row = DailyActivity.objects.filter(
+        user=user, date__gte=_window_start(max(WINDOWS.values()), today)
+    ).aggregate(**aggregates)
+    for name in WINDOWS:
+        stats[name] = _window(
+            row[f'{name}_sessions'], row[f'{name}_focus'], row[f'{name}_study'], row[f'{name}_distractions']
+        )
+    return stats
+
+
+def get_stats(user):
+    if settings.STUDY_STATS_SUMMARY:
+        return summary_stats(user)
+    return aggregate_stats(user)[0]
@@ -0,0 +1,49 @@
+"""
+Race-free UserProgress updates.
+
+A completion bumps the counters and rolls the streak over in one UPDATE whose
+right-hand side only references the row's current values (F-expressions), so
+concurrent completions from two tabs serialize on the row instead of
+overwriting each other's read-modify-write, and only the changed columns are
+written.
+"""
+from datetime import timedelta
+from django.db.models import Case, DateField, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from ..models import UserProgress
+
+
+def _streak_expression(today):
+    """current_streak after activity on `today`: unchanged same day, +1 after yesterday, else 1."""
+    return Case(
+        When(last_activity_date__gte=today, then=F('current_streak')),
+        When(last_activity_date=today - timedelta(days=1), then=F('current_streak') + 1),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+
+
+def record_concept_completed(user, minutes, today=None):
+    """
+    Call once per newly completed concept. Counters, streak rollover and the
+    longest streak are applied in a single UPDATE; the row is created first
+    if the user has none yet.
+    """
+    today = today or timezone.now().date()
+    streak = _streak_expression(today)
+    changes = {
+        'total_concepts_completed': F('total_concepts_completed') + 1,
+        'total_minutes_learned': F('total_minutes_learned') + minutes,
+        'current_streak': streak,
+        # Every assignment sees the pre-update row, so this compares against the new streak
+        'longest_streak': Greatest(F('longest_streak'), streak),
+        'last_activity_date': Case(
+            When(last_activity_date__gt=today, then=F('last_activity_date')),
+            default=Value(today),
+            output_field=DateField(),
+        ),
+    }
+    if not UserProgress.objects.filter(user=user).update(**changes):
+        UserProgress.objects.get_or_create(user=user)
+        UserProgress.objects.filter(user=user).update(**changes)
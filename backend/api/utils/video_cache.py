@@ -0,0 +1,167 @@
+"""
+Two-tier cache for YouTube search results, keyed by normalized query:
+an in-process LRU in front of the VideoSearchCache table.
+Values are the {video_url, thumbnail} dicts returned by YouTubeService.search_video.
+
+Each result has an outcome that sets its TTL: FOUND (a real video,
+YOUTUBE_CACHE_TTL), NOT_FOUND (no results, fallback search URL,
+YOUTUBE_CACHE_NEGATIVE_TTL) or ERROR (API error or network failure, fallback
+search URL, YOUTUBE_CACHE_ERROR_TTL so transient failures are retried soon).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from ..models import VideoSearchCache
+
+FOUND = 'found'
+NOT_FOUND = 'not_found'
+ERROR = 'error'
+
+_lock = threading.Lock()
+_memory = OrderedDict()  # key -> (value, is_fallback, expires_at_monotonic)
+_counters = {
+    'memory_hits': 0,
+    'db_hits': 0,
+    'negative_hits': 0,
+    'misses': 0,
+    'stores': 0,
+}
+
+
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+
+def cache_key(query):
+    return hashlib.sha256(normalize_query(query).encode()).hexdigest()
+
+
+def _count(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def _remember(key, value, is_fallback, ttl_seconds):
+    with _lock:
+        _memory[key] = (value, is_fallback, time.monotonic() + ttl_seconds)
+        _memory.move_to_end(key)
+        while len(_memory) > settings.YOUTUBE_CACHE_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _from_memory(key):
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        value, is_fallback, expires_at = entry
+        if expires_at <= time.monotonic():
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        _counters['memory_hits'] += 1
+        if is_fallback:
+            _counters['negative_hits'] += 1
+        return value
+
+
+def _ttl(outcome):
+    if outcome == FOUND:
+        return settings.YOUTUBE_CACHE_TTL
+    if outcome == NOT_FOUND:
+        return settings.YOUTUBE_CACHE_NEGATIVE_TTL
+    return settings.YOUTUBE_CACHE_ERROR_TTL
+
+
+def lookup_many(queries):
+    """
+    Looks up several queries at once (one DB query for all memory misses).
+    Returns {query: value} for the hits only.
+    """
+    found = {}
+    missing = {}
+    for query in queries:
+        key = cache_key(query)
+        value = _from_memory(key)
+        if value is not None:
+            found[query] = value
+        else:
+            missing.setdefault(key, []).append(query)
+
+    if missing:
+        rows = VideoSearchCache.objects.filter(query_key__in=list(missing), expires_at__gt=timezone.now())
+        for row in rows:
+            value = {'video_url': row.video_url, 'thumbnail': row.thumbnail}
+            remaining = max((row.expires_at - timezone.now()).total_seconds(), 0)
+            _remember(row.query_key, value, row.is_fallback, remaining)
+            for query in missing.pop(row.query_key):
+                found[query] = value
+                _count('db_hits')
+                if row.is_fallback:
+                    _count('negative_hits')
+
+    _count('misses', sum(len(qs) for qs in missing.values()))
+    return found
+
+
+def lookup(query):
+    return lookup_many([query]).get(query)
+
+
+def store_many(results):
+    """
+    Stores {query: (value, outcome)} in both tiers. The table write is one
+    INSERT ... ON CONFLICT DO UPDATE, so concurrent generations that missed
+    on the same query don't collide on the unique query_key.
+    """
+    now = timezone.now()
+    rows = {}
+    for query, (value, outcome) in results.items():
+        key = cache_key(query)
+        ttl = _ttl(outcome)
+        is_fallback = outcome != FOUND
+        _remember(key, value, is_fallback, ttl)
+        rows[key] = VideoSearchCache(
+            query_key=key,
+            query=normalize_query(query),
+            video_url=value['video_url'],
+            thumbnail=value.get('thumbnail', ''),
+            is_fallback=is_fallback,
+            expires_at=now + timedelta(seconds=ttl),
+        )
+    if rows:
+        VideoSearchCache.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['query_key'],
+            update_fields=['query', 'video_url', 'thumbnail', 'is_fallback', 'expires_at'],
+        )
+    _count('stores', len(results))
+
+
+def store(query, value, outcome=FOUND):
+    store_many({query: (value, outcome)})
+
+
+def purge_expired():
+    """Deletes expired rows from the persistent tier. Returns the number removed."""
+    deleted, _ = VideoSearchCache.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def clear_memory():
+    with _lock:
+        _memory.clear()
+
+
+def stats():
+    with _lock:
+        data = dict(_counters)
+        data['memory_entries'] = len(_memory)
+    lookups = data['memory_hits'] + data['db_hits'] + data['misses']
+    data['hit_rate'] = round((data['memory_hits'] + data['db_hits']) / lookups, 3) if lookups else 0.0
+    return data
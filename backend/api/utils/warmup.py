@@ -0,0 +1,178 @@
+"""
+Background warmup of AI notes/quizzes ahead of the learner.
+
+When a roadmap is created (or a concept is completed) the learner's current
+concept and the next WARMUP_LOOKAHEAD concepts get WarmupTask rows; the current
+concept gets the highest priority so it jumps the line. On completion only the
+concepts after the completed one are read (one LIMITed keyset query on chapter
+order, concept order, id), so the cost doesn't grow with the course. `manage.py
+run_warmup_worker` drains the queue highest priority first, spending at most
+WARMUP_RATE_PER_MINUTE Gemini calls per minute. Content that already exists
+(or is being generated by a user request right now) costs no Gemini call.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+from ..models import Concept, ConceptProgress, WarmupTask
+from . import concept_content, single_flight
+
+PRIORITY_CURRENT = 1000  # The concept the learner is on right now
+PRIORITY_AHEAD = 100     # Next concept; each further concept is 2 lower (notes before quiz)
+
+KINDS = {
+    'notes': (concept_content.stored_notes, concept_content.get_or_generate_notes),
+    'quiz': (concept_content.stored_quiz, concept_content.get_or_generate_quiz),
+}
+
+
+def _ordered_concept_ids(course_id):
+    return list(
+        Concept.objects.filter(chapter__course_id=course_id)
+        .order_by('chapter__order', 'order', 'id')
+        .values_list('id', flat=True)
+    )
+
+
+def schedule(priorities):
+    """
+    Queues {(concept_id, kind): priority}. Existing PENDING tasks are only ever
+    raised, never lowered; DONE/RUNNING tasks are left alone.
+    """
+    if not priorities:
+        return
+    concept_ids = {concept_id for concept_id, _ in priorities}
+    existing = {
+        (row['concept_id'], row['kind']): row
+        for row in WarmupTask.objects.filter(concept_id__in=concept_ids).values('id', 'concept_id', 'kind', 'status', 'priority')
+    }
+
+    WarmupTask.objects.bulk_create([
+        WarmupTask(concept_id=concept_id, kind=kind, priority=priority)
+        for (concept_id, kind), priority in priorities.items()
+        if (concept_id, kind) not in existing
+    ], ignore_conflicts=True)
+
+    # One UPDATE per distinct priority value
+    bumps = {}
+    for pair, priority in priorities.items():
+        row = existing.get(pair)
+        if row and row['status'] == 'PENDING' and row['priority'] < priority:
+            bumps.setdefault(priority, []).append(row['id'])
+    for priority, ids in bumps.items():
+        WarmupTask.objects.filter(id__in=ids, status='PENDING', priority__lt=priority).update(
+            priority=priority, updated_at=timezone.now()
+        )
+
+
+def _schedule_upcoming(upcoming):
+    """Queues `upcoming` concept ids in learning order: the first is current, the rest are ahead."""
+    priorities = {}
+    for distance, concept_id in enumerate(upcoming):
+        base = PRIORITY_CURRENT if distance == 0 else PRIORITY_AHEAD - 2 * (distance - 1)
+        priorities[(concept_id, 'notes')] = base
+        priorities[(concept_id, 'quiz')] = base - 1  # The quiz prompt reads the notes
+    schedule(priorities)
+
+
+def schedule_for_roadmap(roadmap, lookahead=None):
+    """Queues the learner's first incomplete concept (top priority) and the next `lookahead` ones."""
+    lookahead = settings.WARMUP_LOOKAHEAD if lookahead is None else lookahead
+    concept_ids = _ordered_concept_ids(roadmap.course_id)
+    completed = set(
+        ConceptProgress.objects.filter(
+            user_id=roadmap.user_id, concept_id__in=concept_ids, completed=True
+        ).values_list('concept_id', flat=True)
+    )
+    _schedule_upcoming([concept_id for concept_id in concept_ids if concept_id not in completed][:lookahead + 1])
+
+
+def schedule_after_completion(user, concept, lookahead=None):
+    """
+    Queues the first `lookahead + 1` incomplete concepts that come after the one
+    the learner just completed. `concept` needs chapter loaded.
+    """
+    lookahead = settings.WARMUP_LOOKAHEAD if lookahead is None else lookahead
+    chapter_order = concept.chapter.order
+    upcoming = (
+        Concept.objects.filter(chapter__course_id=concept.chapter.course_id)
+        .filter(
+            Q(chapter__order__gt=chapter_order)
+            | Q(chapter__order=chapter_order, order__gt=concept.order)
+            | Q(chapter__order=chapter_order, order=concept.order, id__gt=concept.id)
+        )
+        .exclude(Exists(ConceptProgress.objects.filter(user_id=user.id, concept_id=OuterRef('pk'), completed=True)))
+        .order_by('chapter__order', 'order', 'id')
+        .values_list('id', flat=True)[:lookahead + 1]
+    )
+    _schedule_upcoming(list(upcoming))
+
+
+def claim(task):
+    """Atomically moves a PENDING task to RUNNING. Returns False if another worker won."""
+    now = timezone.now()
+    claimed = WarmupTask.objects.filter(pk=task.pk, status='PENDING').update(
+        status='RUNNING', locked_at=now, attempts=F('attempts') + 1, updated_at=now
+    )
+    if claimed:
+        task.refresh_from_db()
+    return bool(claimed)
+
+
+def claim_next_task():
+    """Claims the highest-priority task that is due, or returns None if the queue is empty."""
+    candidates = WarmupTask.objects.filter(
+        status='PENDING', run_after__lte=timezone.now()
+    ).order_by('-priority', 'created_at')[:10]
+    for task in candidates:
+        if claim(task):
+            return task
+    return None
+
+
+def requeue_stale_tasks():
+    """Puts RUNNING tasks whose worker died back into the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.GENERATION_LOCK_TTL)
+    return WarmupTask.objects.filter(status='RUNNING', locked_at__lt=cutoff).update(
+        status='PENDING', locked_at=None, run_after=timezone.now()
+    )
+
+
+def process_task(task, limiter=None):
+    """Generates the task's content unless it already exists. Transient failures are retried."""
+    stored, generate = KINDS[task.kind]
+    try:
+        if stored(task.concept_id) is None:
+            if limiter:
+                limiter.acquire()
+            # wait_timeout=0: if a user request holds the lock it is generating this right now
+            result, outcome = generate(task.concept, wait_timeout=0)
+            if outcome == single_flight.GENERATED and result is None:
+                raise ValueError(f"Gemini returned no {task.kind}")
+        task.status = 'DONE'
+        task.error = ''
+    except Exception as e:
+        print(f"Warmup {task} failed (attempt {task.attempts}/{settings.WARMUP_MAX_ATTEMPTS}): {e}")
+        task.error = str(e)
+        if task.attempts < settings.WARMUP_MAX_ATTEMPTS:
+            task.status = 'PENDING'
+            task.run_after = timezone.now() + timedelta(
+                seconds=settings.WARMUP_RETRY_DELAY * (2 ** (task.attempts - 1))
+            )
+        else:
+            task.status = 'FAILED'
+    task.locked_at = None
+    task.save()
+    return task
+
+
+def run_pending(limit=None, limiter=None):
+    """Processes due tasks until the queue is empty (or `limit` is reached)."""
+    processed = 0
+    while limit is None or processed < limit:
+        task = claim_next_task()
+        if task is None:
+            break
+        process_task(task, limiter)
+        processed += 1
+    return processed
@@ -1,6 +1,6 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
@@ -94,19 +94,29 @@ def hello_world(request):
 # --- New CRUD Views ---
 
 from .models import (
-    LearnerProfile, Course, Chapter, Concept, Roadmap, ConceptProgress,
-    Assessment, AssessmentResult, DailyTask, Notification, UserProgress
+    LearnerProfile, Course, Concept, Roadmap, ConceptProgress,
+    Assessment, AssessmentResult, DailyTask, Notification, UserProgress,
+    RoadmapGenerationJob
 )
 from .serializers import (
     LearnerProfileSerializer, CourseSerializer, RoadmapSerializer,
-    ConceptProgressSerializer, AssessmentSerializer, AssessmentResultSerializer,
-    DailyTaskSerializer, NotificationSerializer, UserProgressSerializer
+    CourseCatalogSerializer, CourseOutlineSerializer, ConceptProgressSerializer, AssessmentSerializer, AssessmentResultSerializer,
+    DailyTaskSerializer, NotificationSerializer, UserProgressSerializer,
+    RoadmapGenerationJobSerializer
 )
-from .utils.notifications import send_email_notification, send_whatsapp_notification
+from .utils.notifications import queue_email_notification, queue_whatsapp_notification
+from .utils import leaderboard, video_cache, roadmap_generation, single_flight, concept_content, warmup, roadmap_progress, user_stats, activity, study_stats, course_cache
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Count, Sum, F
-from .services import ContentDiscoveryService, NotesGeneratorService, QuizGeneratorService
+from django.db.models import Count, Sum, F, Prefetch
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from .pagination import (
+    NewestFirstPagination, RecentlyEndedPagination,
+    SparseFieldsMixin, prune_fields, requested_fields,
+)
 
 class LearnerProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = LearnerProfileSerializer
@@ -116,27 +126,116 @@ class LearnerProfileView(generics.RetrieveUpdateAPIView):
         return LearnerProfile.objects.get_or_create(user=self.request.user)[0]
 
 
-class CourseListView(generics.ListAPIView):
-    queryset = Course.objects.all()
+class CourseListView(SparseFieldsMixin, generics.ListAPIView):
+    """
+    Newest courses first, cursor-paginated. The chapter/concept tree is only
+    prefetched when `chapters` is among ?fields=, concept notes only when
+    `notes` is too (both are included when ?fields= is absent).
+    """
     serializer_class = CourseSerializer
     permission_classes = [AllowAny]
+    pagination_class = NewestFirstPagination
+
+    def get_queryset(self):
+        fields = requested_fields(self.request)
+        queryset = Course.objects.all()
+        if fields is None:
+            return queryset.prefetch_related('chapters__concepts')
+        if 'chapters' in fields:
+            concepts = Concept.objects.all() if 'notes' in fields else Concept.objects.defer('notes')
+            queryset = queryset.prefetch_related('chapters', Prefetch('chapters__concepts', queryset=concepts))
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = requested_fields(self.request)
+        if fields is not None and 'chapters' in fields and 'notes' not in fields:
+            chapter = serializer.child.fields['chapters'].child
+            chapter.fields['concepts'].child.fields.pop('notes')
+        return serializer
+
+
+class CourseCatalogView(generics.ListAPIView):
+    """
+    Course headers only: chapter/concept counts and total minutes are
+    aggregated in the same query, no chapter/concept rows are serialized.
+    """
+    serializer_class = CourseCatalogSerializer
+    permission_classes = [AllowAny]
+    pagination_class = NewestFirstPagination
+
+    def get_queryset(self):
+        return Course.objects.only(
+            'id', 'title', 'description', 'thumbnail', 'difficulty', 'estimated_hours', 'tags', 'created_at'
+        ).annotate(
+            chapter_count=Count('chapters', distinct=True),
+            concept_count=Count('chapters__concepts'),
+            total_minutes=Coalesce(Sum('chapters__concepts__duration'), 0),
+        )
+
+
+class CourseOutlineView(generics.RetrieveAPIView):
+    """One course's chapter/concept tree without concept notes (loaded lazily per course)."""
+    queryset = Course.objects.prefetch_related(
+        'chapters', Prefetch('chapters__concepts', queryset=Concept.objects.defer('notes'))
+    )
+    serializer_class = CourseOutlineSerializer
+    permission_classes = [AllowAny]
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def concept_notes(request, concept_id):
+    """A single concept's markdown notes, fetched on demand."""
+    concept = Concept.objects.filter(id=concept_id).only('id', 'notes').first()
+    if concept is None:
+        return Response({'error': 'Concept not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'id': concept.id, 'notes': concept.notes})
+
+
+def _tree_response(request, data, etag):
+    response = Response(data)
+    etags.set_etag(response, etag, course_cache.CACHE_CONTROL)
+    patch_vary_headers(response, ['Authorization'])
+    return response
 
 
 class CourseDetailView(generics.RetrieveAPIView):
-    queryset = Course.objects.all()
+    """
+    The full course tree, served from the versioned tree cache with the
+    caller's completion flags merged in. Conditional GETs with a current ETag
+    get a 304 without the tree being read or serialized.
+    """
+    queryset = Course.objects.only('id', 'created_at', 'content_version')
     serializer_class = CourseSerializer
     permission_classes = [AllowAny]
 
+    def retrieve(self, request, *args, **kwargs):
+        course = self.get_object()
+        completed = course_cache.completed_ids(request.user, course.id)
+        etag = course_cache.make_etag(course, completed)
+        if etags.if_none_match(request, etag):
+            response = etags.not_modified(etag, course_cache.CACHE_CONTROL)
+            patch_vary_headers(response, ['Authorization'])
+            return response
+        tree = course_cache.with_completion(course_cache.get_tree(course), completed)
+        return _tree_response(request, tree, etag)
+
 
 class RoadmapListCreateView(generics.ListCreateAPIView):
     serializer_class = RoadmapSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Roadmap.objects.filter(user=self.request.user)
+        return Roadmap.objects.filter(user=self.request.user).select_related('course').prefetch_related(
+            'course__chapters__concepts'
+        )
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        roadmap = serializer.save(user=self.request.user)
+        roadmap_progress.initialize(roadmap)
+        leaderboard.record_roadmap_created(self.request.user)
+        warmup.schedule_for_roadmap(roadmap)
 
 
 class RoadmapDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -144,81 +243,86 @@ class RoadmapDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Roadmap.objects.filter(user=self.request.user)
+        return Roadmap.objects.filter(user=self.request.user).select_related('course').prefetch_related(
+            'course__chapters__concepts'
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        # The course tree comes from the versioned cache, so only the roadmap row is loaded here
+        roadmap = get_object_or_404(Roadmap.objects.select_related('course'), pk=kwargs['pk'], user=request.user)
+        completed = course_cache.completed_ids(request.user, roadmap.course_id)
+        etag = course_cache.make_etag(
+            roadmap.course, completed, roadmap.id, roadmap.progress, roadmap.completed_concepts,
+            roadmap.total_concepts, roadmap.current_chapter, roadmap.current_concept,
+            roadmap.last_accessed_at.isoformat() if roadmap.last_accessed_at else '',
+        )
+        if etags.if_none_match(request, etag):
+            response = etags.not_modified(etag, course_cache.CACHE_CONTROL)
+            patch_vary_headers(response, ['Authorization'])
+            return response
+
+        serializer = self.get_serializer(roadmap)
+        serializer.fields.pop('course')
+        data = {}
+        for name, value in serializer.data.items():
+            data[name] = value
+            if name == 'user':
+                data['course'] = course_cache.with_completion(course_cache.get_tree(roadmap.course), completed)
+        return _tree_response(request, data, etag)
+
+    def perform_destroy(self, instance):
+        # Leaderboard and certificate caches are updated by the post_delete signal (api/signals.py)
+        instance.delete()
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def mark_concept_complete(request, concept_id):
     try:
-        concept = Concept.objects.get(id=concept_id)
-        
-        # Get or create progress
-        progress, created = ConceptProgress.objects.get_or_create(
-            user=request.user,
-            concept=concept
-        )
-        
-        # Check if already completed to avoid double counting
-        was_completed = progress.completed
-        
-        progress.completed = True
-        progress.completed_at = timezone.now()
-        progress.save()
-        
-        # --- Update Roadmap Progress ---
+        concept = Concept.objects.select_related('chapter__course').get(id=concept_id)
         course = concept.chapter.course
-        total_concepts = Concept.objects.filter(chapter__course=course).count()
-        completed_concepts_count = ConceptProgress.objects.filter(
-            user=request.user, 
-            concept__chapter__course=course, 
-            completed=True
-        ).count()
-        
-        if total_concepts > 0:
-            roadmap_progress = int((completed_concepts_count / total_concepts) * 100)
-            Roadmap.objects.filter(user=request.user, course=course).update(progress=roadmap_progress)
-
-            # --- Notification Trigger: Course Completion (100%) ---
-            if roadmap_progress == 100:
-                # Set the completion timestamp (Root Fix: Accurate completion date)
-                Roadmap.objects.filter(user=request.user, course=course, completed_at__isnull=True).update(completed_at=timezone.now())
-                
-                print(f"🎉 Triggering Completion Notifications for {request.user.username}")
-                # 1. Email
-                send_email_notification(
-                    user=request.user,
-                    subject=f"Congratulations! You Completed {course.title} 🎓",
-                    message=f"Hi {request.user.username},\n\nFantastic job completing the '{course.title}' course! You have mastered all the concepts.\n\nKeep up the great learning stride!\n\n- The SkillMeter Team"
-                )
-                # 2. WhatsApp
-                send_whatsapp_notification(
-                    user=request.user,
-                    message_body=f"🚀 Milestone Unlocked: You just finished '{course.title}' on SkillMeter! 🎓 Good job!"
-                )
-
-        # --- Update User Global Stats ---
-        if not was_completed:
-            user_stats, _ = UserProgress.objects.get_or_create(user=request.user)
-            user_stats.total_concepts_completed += 1
-            user_stats.total_minutes_learned += concept.duration
-            
-            # Update Streak
-            today = timezone.now().date()
-            if user_stats.last_activity_date != today:
-                one_day_ago = today - timezone.timedelta(days=1)
-                
-                if user_stats.last_activity_date == one_day_ago:
-                    user_stats.current_streak += 1
-                elif user_stats.last_activity_date is None or user_stats.last_activity_date < one_day_ago:
-                    user_stats.current_streak = 1
-                
-                user_stats.last_activity_date = today
-                
-                if user_stats.current_streak > user_stats.longest_streak:
-                    user_stats.longest_streak = user_stats.current_streak
-            
-            user_stats.save()
+
+        with transaction.atomic():
+            # Get or create progress
+            progress, created = ConceptProgress.objects.get_or_create(
+                user=request.user,
+                concept=concept
+            )
+
+            # Only the request that flips completed=False -> True counts (no double counting)
+            newly_completed = ConceptProgress.objects.filter(pk=progress.pk, completed=False).update(
+                completed=True, completed_at=timezone.now()
+            ) == 1
+
+            # --- Update Roadmap Progress (counters, no recount of the course) ---
+            course_finished = newly_completed and roadmap_progress.record_concept_completed(request.user, course.id)
+
+            # --- Update User Global Stats (counters + streak in one UPDATE) ---
+            if newly_completed:
+                user_stats.record_concept_completed(request.user, concept.duration)
+                activity.record_concept_completed(request.user, concept.duration)
+
+        # --- Notification Trigger: Course Completion (100%) ---
+        if course_finished:
+            print(f"🎉 Triggering Completion Notifications for {request.user.username}")
+            # 1. Email
+            queue_email_notification(
+                user=request.user,
+                subject=f"Congratulations! You Completed {course.title} 🎓",
+                message=f"Hi {request.user.username},\n\nFantastic job completing the '{course.title}' course! You have mastered all the concepts.\n\nKeep up the great learning stride!\n\n- The SkillMeter Team"
+            )
+            # 2. WhatsApp
+            queue_whatsapp_notification(
+                user=request.user,
+                message_body=f"🚀 Milestone Unlocked: You just finished '{course.title}' on SkillMeter! 🎓 Good job!"
+            )
+
+        if newly_completed:
+            leaderboard.record_concept_completed(request.user)
+
+            # The learner moves on: warm up the concepts right after this one
+            if Roadmap.objects.filter(user=request.user, course=course).exists():
+                warmup.schedule_after_completion(request.user, concept)
         
         return Response({'status': 'Concept marked as complete'})
     except Concept.DoesNotExist:
@@ -320,9 +424,10 @@ def complete_task(request, task_id):
         return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(SparseFieldsMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NewestFirstPagination
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user).order_by('-created_at')
@@ -345,7 +450,10 @@ class UserStatsView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return UserProgress.objects.get_or_create(user=self.request.user)[0]
+        UserProgress.objects.get_or_create(user=self.request.user)
+        return UserProgress.objects.select_related('user').annotate(
+            courses_enrolled=Count('user__roadmaps')
+        ).get(user=self.request.user)
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -354,45 +462,8 @@ class UserStatsView(generics.RetrieveAPIView):
         
         # Calculate Rank (Consistent with Leaderboard API)
         try:
-            from django.contrib.auth.models import User
-            # Get all users with some progress
-            users_with_progress = User.objects.filter(concept_progress__completed=True).distinct()
-            
-            leaderboard_data = [] # List of dicts {username, points}
-            
-            # 1. Calculate scores for all users
-            for user in users_with_progress:
-                concepts = ConceptProgress.objects.filter(user=user, completed=True).count()
-                roadmaps = Roadmap.objects.filter(user=user).count()
-                score = (concepts * 10) + (roadmaps * 50)
-                
-                leaderboard_data.append({
-                    'username': user.username,
-                    'points': score
-                })
-
-            # Check if current user is in the list, if not add them (score 0 or enrollment only)
-            if not any(u['username'] == request.user.username for u in leaderboard_data):
-                my_roadmaps = Roadmap.objects.filter(user=request.user).count()
-                my_score = (0 * 10) + (my_roadmaps * 50)
-                leaderboard_data.append({
-                    'username': request.user.username,
-                    'points': my_score
-                })
-
-            # 2. Deterministic Sort: Points DESC, then Username ASC
-            # We sort by (-points, username) to achieve Descending Points and Ascending Username
-            leaderboard_data.sort(key=lambda x: (-x['points'], x['username']))
-            
-            # 3. Find my rank
-            rank = 0
-            for i, entry in enumerate(leaderboard_data):
-                if entry['username'] == request.user.username:
-                    rank = i + 1
-                    break
-            
-            data['rank'] = rank
-            
+            # Single COUNT over LeaderboardScore: Points DESC, then Username ASC
+            data['rank'] = leaderboard.get_rank(request.user)
         except Exception as e:
             print(f"Error calculating rank: {e}")
             data['rank'] = 0
@@ -403,51 +474,10 @@ class UserStatsView(generics.RetrieveAPIView):
 @permission_classes([IsAuthenticated])
 def get_leaderboard(request):
     try:
-        from django.contrib.auth.models import User
-        
-        # Calculate leaderboard from actual data:
-        # - concepts_completed: Count of completed ConceptProgress per user
-        # - courses_progress: Sum of progress across Roadmaps
-        
-        leaderboard = []
-        
-        # Get all users who have any learning activity
-        users_with_progress = User.objects.filter(
-            concept_progress__completed=True
-        ).distinct()
-        
-        for user in users_with_progress:
-            # Count completed concepts
-            concepts_completed = ConceptProgress.objects.filter(
-                user=user, completed=True
-            ).count()
-            
-            # Calculate score: concepts * 10 + each course enrollment * 50
-            roadmaps_count = Roadmap.objects.filter(user=user).count()
-            score = (concepts_completed * 10) + (roadmaps_count * 50)
-            
-            leaderboard.append({
-                'rank': 0,
-                'name': f"{user.first_name} {user.last_name}".strip() or user.username,
-                'username': user.username, # Added for sorting stability
-                'points': score,
-                'badge': ''
-            })
-        
-        # Deterministic Sort: Points DESC, then Username ASC
-        # This matches the UserStatsView rank calculation exactly
-        leaderboard.sort(key=lambda x: (-x['points'], x['username']))
-        
-        # Take top 5 and assign ranks/badges
-        top_5 = leaderboard[:5]
-        for i, entry in enumerate(top_5):
-            entry['rank'] = i + 1
-            if i == 0: entry['badge'] = '🥇'
-            elif i == 1: entry['badge'] = '🥈'
-            elif i == 2: entry['badge'] = '🥉'
-            else: entry['badge'] = str(i + 1)
-        
-        return Response(top_5)
+        # Served from the denormalized LeaderboardScore table (see utils/leaderboard.py):
+        # score = concepts_completed * 10 + roadmaps * 50
+        # Deterministic Sort: Points DESC, then Username ASC (matches UserStatsView rank)
+        return Response(leaderboard.get_top(limit=5))
     except Exception as e:
         print(f"Error fetching leaderboard: {e}")
         return Response({'error': str(e)}, status=500)
@@ -459,22 +489,20 @@ def generate_concept_notes(request, concept_id):
     """
     Generates AI notes for a concept on-demand.
     Returns cached notes if already generated.
+    Only one request per concept calls Gemini; concurrent ones wait for it
+    and get 202 {'status': 'pending'} if it takes too long.
     """
     try:
         concept = Concept.objects.get(id=concept_id)
+        notes, outcome = concept_content.get_or_generate_notes(concept)
+        if outcome == single_flight.PENDING:
+            return Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
         
-        # Check if notes already exist (not placeholder)
-        if concept.notes and not concept.notes.endswith('*Notes will be generated when you start this lesson.*'):
-            return Response({'notes': concept.notes, 'cached': True})
+        if notes is None:
+            # Gemini failed: show the placeholder without storing it, so the next request retries
+            return Response({'notes': concept_content.fallback_notes(concept), 'cached': False})
         
-        # Generate notes using AI
-        notes = NotesGeneratorService.generate_notes(concept.title, concept.description)
-        
-        # Save to database
-        concept.notes = notes
-        concept.save()
-        
-        return Response({'notes': notes, 'cached': False})
+        return Response({'notes': notes, 'cached': outcome == single_flight.CACHED})
         
     except Concept.DoesNotExist:
         return Response({'error': 'Concept not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -488,38 +516,21 @@ def generate_concept_quiz(request, concept_id):
     """
     Generates AI quiz for a concept on-demand.
     Returns cached quiz if already generated.
+    Single-flight per concept, like generate_concept_notes.
     """
     try:
         concept = Concept.objects.get(id=concept_id)
+        assessment, outcome = concept_content.get_or_generate_quiz(concept)
+        if outcome == single_flight.PENDING:
+            return Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
         
-        # Check if quiz already exists for this concept
-        existing_assessment = Assessment.objects.filter(concept=concept).first()
-        if existing_assessment and existing_assessment.questions:
-            return Response({
-                'quiz': existing_assessment.questions, 
-                'assessment_id': existing_assessment.id,
-                'cached': True
-            })
-        
-        # Generate quiz using AI
-        quiz_data = QuizGeneratorService.generate_quiz(concept.title, concept.notes or concept.description)
-        
-        if not quiz_data:
+        if assessment is None:
             return Response({'error': 'Failed to generate quiz'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-        # Create or update assessment
-        assessment, created = Assessment.objects.get_or_create(
-            concept=concept,
-            defaults={'questions': quiz_data, 'time_limit': 10}
-        )
-        if not created:
-            assessment.questions = quiz_data
-            assessment.save()
-        
         return Response({
-            'quiz': quiz_data, 
+            'quiz': assessment.questions, 
             'assessment_id': assessment.id,
-            'cached': False
+            'cached': outcome == single_flight.CACHED
         })
         
     except Concept.DoesNotExist:
@@ -531,7 +542,10 @@ def generate_concept_quiz(request, concept_id):
 @permission_classes([IsAuthenticated])
 def generate_roadmap_ai(request):
     """
-    Generates a personalized roadmap using Gemini.
+    Queues a personalized roadmap generation job (Gemini + YouTube).
+    Returns the job immediately; poll roadmap_generation_job for progress.
+    If a fresh course was already generated for this topic/level, the user is
+    enrolled in it and the job comes back already SUCCEEDED (201).
     """
     topic = request.data.get('topic')
     skill_level = request.data.get('skillLevel', 'beginner')
@@ -539,87 +553,33 @@ def generate_roadmap_ai(request):
     if not topic:
         return Response({'error': 'Topic is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    print(f"DEBUG: generate_roadmap_ai called for topic: {topic}")
+    print(f"DEBUG: generate_roadmap_ai queued for topic: {topic}")
+    job = roadmap_generation.enqueue(request.user, topic, skill_level)
     
-    # 1. Discover Content
-    ai_data = ContentDiscoveryService.search_videos(topic, skill_level)
-    print(f"DEBUG: ContentDiscoveryService returned: {ai_data is not None}")
-    
-    if not ai_data:
-        return Response({'error': 'AI Service returned no data.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    serializer = RoadmapGenerationJobSerializer(job, context={'request': request})
+    response_status = status.HTTP_201_CREATED if job.status == 'SUCCEEDED' else status.HTTP_202_ACCEPTED
+    return Response(serializer.data, status=response_status)
 
-    if 'error' in ai_data:
-        return Response({'error': f"AI Generation Failed: {ai_data['error']}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    if 'course' not in ai_data:
-        return Response({'error': 'AI returned invalid format. Try again.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    course_data = ai_data['course']
-    
-    # 2. Create Course Structure
-    course = Course.objects.create(
-        title=course_data.get('title', f"Learn {topic}"),
-        description=course_data.get('description', f"AI-generated course for {topic}"),
-        thumbnail=course_data.get('thumbnail', ''), # Use dynamic thumbnail
-        difficulty=skill_level,
-        estimated_hours=course_data.get('estimated_hours', 10),
-        tags=course_data.get('tags', [topic, 'AI Generated'])
-    )
-    
-    # 3. Create Chapters and Concepts
-    chapters_data = ai_data.get('chapters', [])
-    
-    for i, chap_data in enumerate(chapters_data):
-        chapter = Chapter.objects.create(
-            course=course,
-            title=chap_data.get('title', f"Chapter {i+1}"),
-            order=i+1
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def roadmap_generation_job(request, job_id):
+    """
+    Stage-level progress of a roadmap generation job.
+    Includes the generated roadmap once status is SUCCEEDED.
+    """
+    try:
+        # Polled every 2s; a finished job nests the whole course tree, so fetch it in one prefetch per level
+        job = (
+            RoadmapGenerationJob.objects.select_related('roadmap__course')
+            .prefetch_related('roadmap__course__chapters__concepts')
+            .get(id=job_id, user=request.user)
         )
-        
-        for j, concept_data in enumerate(chap_data.get('concepts', [])):
-            # Skip inline Notes/Quiz generation for speed - generate on demand later
-            # notes = NotesGeneratorService.generate_notes(concept_data['title'], concept_data.get('description', ''))
-            
-            # Construct Search URL for video
-            # Prioritize real video URL from YouTube API
-            if 'video_url' in concept_data and concept_data['video_url']:
-                 video_url = concept_data['video_url']
-            else:
-                 # Fallback to search query
-                 query = concept_data.get('video_search_query', concept_data.get('title', ''))
-                 video_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-            
-            concept = Concept.objects.create(
-                chapter=chapter,
-                title=concept_data['title'],
-                description=concept_data.get('description', ''),
-                video_url=video_url,
-                duration=concept_data.get('duration_minutes', 15),
-                notes=f"# {concept_data['title']}\n\n{concept_data.get('description', '')}\n\n*Notes will be generated when you start this lesson.*",
-                content_type='video',
-                order=j+1
-            )
-            
-            # Skip Quiz generation for speed - can be generated on-demand
-            # if j == 0:
-            #     quiz_data = QuizGeneratorService.generate_quiz(concept_data['title'], notes)
-            #     if quiz_data:
-            #         Assessment.objects.create(
-            #             concept=concept,
-            #             questions=quiz_data,
-            #             time_limit=10
-            #         )
-
-    # 4. Enroll User
-    roadmap = Roadmap.objects.create(
-        user=request.user,
-        course=course,
-        current_chapter=0,
-        current_concept=0
-    )
+    except RoadmapGenerationJob.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    serializer = RoadmapSerializer(roadmap)
-    return Response(serializer.data, status=status.HTTP_201_CREATED)
+    serializer = RoadmapGenerationJobSerializer(job, context={'request': request})
+    return Response(serializer.data)
 
 
 class ActivityLogView(generics.ListAPIView):
@@ -628,22 +588,11 @@ class ActivityLogView(generics.ListAPIView):
     def get(self, request):
         today = timezone.now().date()
         start_date = today - timezone.timedelta(days=365)
-        
-        # intricate query to group by date
-        # For SQLite/Django simplicity, we can just fetch all completed items in range and process in python
-        # OR use values('completed_at__date').annotate(count=Count('id'))
-        
-        activity = ConceptProgress.objects.filter(
-            user=request.user,
-            completed=True,
-            completed_at__date__gte=start_date
-        ).values('completed_at__date').annotate(count=Count('id')).order_by('completed_at__date')
-        
-        # Convert to dictionary for easy lookup
+
+        # At most 366 DailyActivity rollup rows
         activity_dict = {
-            item['completed_at__date'].isoformat(): item['count'] 
-            for item in activity 
-            if item['completed_at__date']
+            date.isoformat(): day['count']
+            for date, day in activity.activity_by_date(request.user, start_date).items()
         }
         
         return Response(activity_dict)
@@ -652,9 +601,11 @@ class ActivityLogView(generics.ListAPIView):
 from .models import Lab
 from .serializers import LabSerializer
 
-class LabListCreateView(generics.ListCreateAPIView):
+class LabListCreateView(SparseFieldsMixin, generics.ListCreateAPIView):
     serializer_class = LabSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NewestFirstPagination  # Not -updated_at: saving a lab mid-walk would move it across pages
+    heavy_fields = {'files': ('files',)}  # ?fields=id,name,language,updated_at skips the file contents
 
     def get_queryset(self):
         return Lab.objects.filter(user=self.request.user)
@@ -672,8 +623,13 @@ class LabDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # Certificate Generation
 from django.http import HttpResponse
-import hashlib
 from datetime import datetime
+from .utils import etags
+
+# Per-user download: browsers may keep it but must revalidate (ETag -> 304)
+CERTIFICATE_CACHE_CONTROL = 'private, no-cache'
+CERTIFICATE_VERIFY_CACHE_CONTROL = 'public, no-cache'  # Cacheable, but always revalidated via the ETag
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def generate_certificate(request, roadmap_id):
@@ -683,36 +639,40 @@ def generate_certificate(request, roadmap_id):
     """
     try:
         roadmap = Roadmap.objects.get(id=roadmap_id, user=request.user)
-        print(f"DEBUG Certificate: Found roadmap {roadmap_id}, progress={roadmap.progress}")
     except Roadmap.DoesNotExist:
-        print(f"DEBUG Certificate: Roadmap {roadmap_id} not found for user {request.user}")
         return Response({'error': 'Roadmap not found'}, status=404)
     
     # Check if course is completed
     if roadmap.progress < 100:
         return Response({'error': 'Course not completed yet. Complete all lessons to get your certificate.'}, status=400)
     
+    # Rendered once per certificate + template version (see utils/certificate_cache.py)
+    from .utils import certificate_cache, certificate_verification
+    from .utils.certificate import make_certificate_id, display_name, certificate_filename
+    
     # Generate or Retrieve unique certificate ID
+    newly_issued = not roadmap.certificate_id
     if roadmap.certificate_id:
         cert_id = roadmap.certificate_id
     else:
-        cert_data = f"{request.user.id}-{roadmap_id}-{roadmap.course.title}"
-        cert_id = hashlib.sha256(cert_data.encode()).hexdigest()[:12].upper()
+        cert_id = make_certificate_id(request.user.id, roadmap_id, roadmap.course.title)
         roadmap.certificate_id = cert_id
         roadmap.save()
+        certificate_verification.invalidate(cert_id)
     
-    # Generate PDF Content using Utility
-    from .utils.certificate import generate_certificate_pdf
+    # Conditional GET: the browser already has this exact PDF
+    stored_etag = certificate_cache.get_etag(cert_id)
+    if etags.if_none_match(request, stored_etag):
+        return etags.not_modified(stored_etag, CERTIFICATE_CACHE_CONTROL)
     
-    user_name = f"{request.user.first_name} {request.user.last_name}".strip() or request.user.username
-    last_accessed = roadmap.last_accessed_at if roadmap.last_accessed_at else datetime.now()
+    completion_date = roadmap.completed_at or roadmap.last_accessed_at or datetime.now()
     
     try:
-        pdf_content = generate_certificate_pdf(
-            user_name=user_name,
+        pdf_content, etag, rendered = certificate_cache.get_or_render(
+            cert_id,
+            user_name=display_name(request.user),
             course_title=roadmap.course.title,
-            completion_date=last_accessed,
-            cert_id=cert_id
+            completion_date=completion_date
         )
     except Exception as e:
         print(f"Error generating certificate PDF: {e}")
@@ -720,24 +680,26 @@ def generate_certificate(request, roadmap_id):
     
     # Create response
     response = HttpResponse(pdf_content, content_type='application/pdf')
-    safe_title = roadmap.course.title.replace(' ', '_')[:30]
-    response['Content-Disposition'] = f'attachment; filename="SkillMeter_Certificate_{safe_title}.pdf"'
+    filename = certificate_filename(roadmap.course.title)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    etags.set_etag(response, etag, CERTIFICATE_CACHE_CONTROL)
     
-    # --- Notification Trigger: Email with Certificate ---
-    try:
-        send_email_notification(
-            user=request.user,
-            subject=f"Your Certificate for {roadmap.course.title}",
-            message="Please find attached your official certificate of completion.",
-            attachment=(f'SkillMeter_Certificate_{safe_title}.pdf', pdf_content, 'application/pdf')
-        )
-        # WhatsApp notification for certificate
-        send_whatsapp_notification(
-            user=request.user,
-            message_body=f"🎓 Your certificate for '{roadmap.course.title}' is ready! Check your email for the PDF. Congrats!"
-        )
-    except Exception as e:
-        print(f"Failed to send certificate notifications: {e}")
+    # --- Notification Trigger: Email with Certificate (first issue only) ---
+    if newly_issued:
+        try:
+            queue_email_notification(
+                user=request.user,
+                subject=f"Your Certificate for {roadmap.course.title}",
+                message="Please find attached your official certificate of completion.",
+                attachment=(filename, pdf_content, 'application/pdf')
+            )
+            # WhatsApp notification for certificate
+            queue_whatsapp_notification(
+                user=request.user,
+                message_body=f"🎓 Your certificate for '{roadmap.course.title}' is ready! Check your email for the PDF. Congrats!"
+            )
+        except Exception as e:
+            print(f"Failed to queue certificate notifications: {e}")
 
     return response
 
@@ -748,25 +710,19 @@ def verify_certificate(request, cert_id):
     """
     Public API to verify a certificate by its unique ID.
     Returns certificate details if valid.
+    Served from a read-through cache (utils/certificate_verification.py) with
+    an ETag. Clients and proxies must revalidate, so a revoked certificate
+    (roadmap deleted, progress below 100%) stops verifying immediately.
     """
-    try:
-        roadmap = Roadmap.objects.get(certificate_id=cert_id)
-        
-        # Ensure it's completed (security check)
-        if roadmap.progress < 100:
-            return Response({'error': 'Certificate invalid'}, status=400)
-            
-        data = {
-            'valid': True,
-            'certificate_id': cert_id,
-            'student_name': f"{roadmap.user.first_name} {roadmap.user.last_name}".strip() or roadmap.user.username,
-            'course_title': roadmap.course.title,
-            'completion_date': roadmap.completed_at or roadmap.last_accessed_at,
-            'issue_date': roadmap.completed_at or roadmap.last_accessed_at,
-        }
-        return Response(data)
-    except Roadmap.DoesNotExist:
-        return Response({'valid': False, 'error': 'Certificate ID not found'}, status=404)
+    from .utils import certificate_verification
+    
+    status_code, data, etag = certificate_verification.lookup(cert_id)
+    cache_control = CERTIFICATE_VERIFY_CACHE_CONTROL
+    
+    if status_code == 200 and etags.if_none_match(request, etag):
+        return etags.not_modified(etag, cache_control)
+    
+    return etags.set_etag(Response(data, status=status_code), etag, cache_control)
 
 
 # ===== Study Room / Study Session API =====
@@ -778,18 +734,23 @@ from .serializers import StudySessionSerializer
 @permission_classes([IsAuthenticated])
 def study_sessions_view(request):
     """
-    GET: List all study sessions for the authenticated user
+    GET: List the authenticated user's study sessions (cursor-paginated)
     POST: Create a new study session
     """
     if request.method == 'GET':
-        sessions = StudySession.objects.filter(user=request.user)
-        serializer = StudySessionSerializer(sessions, many=True)
-        return Response(serializer.data)
+        # Newest first, one cursor page at a time
+        paginator = RecentlyEndedPagination()
+        sessions = paginator.paginate_queryset(StudySession.objects.filter(user=request.user), request)
+        serializer = prune_fields(StudySessionSerializer(sessions, many=True), requested_fields(request))
+        return paginator.get_paginated_response(serializer.data)
     
     elif request.method == 'POST':
         serializer = StudySessionSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            with transaction.atomic():
+                session = serializer.save(user=request.user)
+                activity.record_study_session(session)
+                study_stats.record_session(session)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -799,77 +760,12 @@ def study_sessions_view(request):
 def study_session_stats(request):
     """
     Get aggregated statistics for the user's study sessions.
+    Totals come from the per-user summary row, last7Days/last30Days from the
+    daily rollups (see utils/study_stats.py).
     """
-    from django.db.models import Sum, Avg
-    
-    sessions = StudySession.objects.filter(user=request.user)
-    
-    total_sessions = sessions.count()
-    total_focus_time = sessions.aggregate(total=Sum('focus_duration'))['total'] or 0
-    total_study_time = sessions.aggregate(total=Sum('total_duration'))['total'] or 0
-    total_distractions = sessions.aggregate(total=Sum('distraction_count'))['total'] or 0
-    avg_focus_percentage = sessions.aggregate(avg=Avg('focus_percentage'))['avg'] or 100.0
-    
-    return Response({
-        'totalSessions': total_sessions,
-        'totalFocusTime': total_focus_time,  # in seconds
-        'totalStudyTime': total_study_time,  # in seconds
-        'totalDistractions': total_distractions,
-        'averageFocusPercentage': round(avg_focus_percentage, 1),
-    })
+    return Response(study_stats.get_stats(request.user))
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def get_leaderboard(request):
-    try:
-        from django.contrib.auth.models import User
-        
-        # Calculate leaderboard from actual data:
-        # - concepts_completed: Count of completed ConceptProgress per user
-        # - courses_progress: Sum of progress across Roadmaps
-        
-        leaderboard = []
-        
-        # Get all users who have any learning activity
-        users_with_progress = User.objects.filter(
-            concept_progress__completed=True
-        ).distinct()
-        
-        for user in users_with_progress:
-            # Count completed concepts
-            concepts_completed = ConceptProgress.objects.filter(
-                user=user, completed=True
-            ).count()
-            
-            # Calculate score: concepts * 10 + each course enrollment * 50
-            roadmaps_count = Roadmap.objects.filter(user=user).count()
-            score = (concepts_completed * 10) + (roadmaps_count * 50)
-            
-            leaderboard.append({
-                'rank': 0,
-                'name': f"{user.first_name} {user.last_name}".strip() or user.username,
-                'points': score,
-                'badge': ''
-            })
-        
-        # Sort by points descending
-        leaderboard.sort(key=lambda x: x['points'], reverse=True)
-        
-        # Take top 5 and assign ranks/badges
-        top_5 = leaderboard[:5]
-        for i, entry in enumerate(top_5):
-            entry['rank'] = i + 1
-            if i == 0: entry['badge'] = '🥇'
-            elif i == 1: entry['badge'] = '🥈'
-            elif i == 2: entry['badge'] = '🥉'
-            else: entry['badge'] = str(i + 1)
-        
-        return Response(top_5)
-    except Exception as e:
-        print(f"Error fetching leaderboard: {e}")
-        return Response({'error': str(e)}, status=500)
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_trending_topics(request):
@@ -899,6 +795,28 @@ def get_trending_topics(request):
         return Response({'error': str(e)}, status=500)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def video_cache_stats(request):
+    """
+    Hit/miss counters for the YouTube search cache.
+    Memory-tier counters are per process; dbEntries covers the shared table.
+    """
+    from .models import VideoSearchCache
+    
+    stats = video_cache.stats()
+    return Response({
+        'memoryHits': stats['memory_hits'],
+        'dbHits': stats['db_hits'],
+        'negativeHits': stats['negative_hits'],
+        'misses': stats['misses'],
+        'stores': stats['stores'],
+        'hitRate': stats['hit_rate'],
+        'memoryEntries': stats['memory_entries'],
+        'dbEntries': VideoSearchCache.objects.filter(expires_at__gt=timezone.now()).count(),
+    })
+
+
 # ===== Mentor Connect API =====
 
 from .models import MentorProfile, MentorSlot, Booking
@@ -939,28 +857,30 @@ class BookingCreateView(generics.CreateAPIView):
         # Auto-assign learner
         serializer.save(learner=self.request.user)
 
-class BookingListView(generics.ListAPIView):
+class BookingListView(SparseFieldsMixin, generics.ListAPIView):
     """
     Get My Sessions (as Learner)
     """
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NewestFirstPagination
     
     def get_queryset(self):
-        return Booking.objects.filter(learner=self.request.user).order_by('-created_at')
+        return Booking.objects.filter(learner=self.request.user).select_related('mentor__user', 'learner')
 
-class MentorDashboardBookingListView(generics.ListAPIView):
+class MentorDashboardBookingListView(SparseFieldsMixin, generics.ListAPIView):
     """
     Get My Sessions (as Mentor)
     """
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NewestFirstPagination
     
     def get_queryset(self):
         # Assuming user has a mentor profile
         if not hasattr(self.request.user, 'mentor_profile'):
             return Booking.objects.none()
-        return Booking.objects.filter(mentor=self.request.user.mentor_profile).order_by('-created_at')
+        return Booking.objects.filter(mentor=self.request.user.mentor_profile).select_related('mentor__user', 'learner')
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
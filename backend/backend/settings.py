@@ -30,6 +30,36 @@ SECRET_KEY = 'django-insecure-++q+!-b5r!^#u9n&#p8(#)%uzf=r@7coa*j9n=)_*v5-n)a61#
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
 
+# Roadmap video enrichment: concurrent YouTube lookups and per-roadmap deadline (seconds)
+YOUTUBE_ENRICH_WORKERS = int(os.getenv('YOUTUBE_ENRICH_WORKERS', 8))
+YOUTUBE_ENRICH_DEADLINE = float(os.getenv('YOUTUBE_ENRICH_DEADLINE', 20))
+
+# YouTube search cache (seconds). Fallback search URLs are cached for the shorter negative TTL
+# (no results) or error TTL (API/network failure, retried soon).
+YOUTUBE_CACHE_TTL = int(os.getenv('YOUTUBE_CACHE_TTL', 60 * 60 * 24 * 7))
+YOUTUBE_CACHE_NEGATIVE_TTL = int(os.getenv('YOUTUBE_CACHE_NEGATIVE_TTL', 60 * 60))
+YOUTUBE_CACHE_ERROR_TTL = int(os.getenv('YOUTUBE_CACHE_ERROR_TTL', 60))
+YOUTUBE_CACHE_MAX_ENTRIES = int(os.getenv('YOUTUBE_CACHE_MAX_ENTRIES', 2048))
+
+# Roadmap generation jobs (run `python manage.py run_roadmap_worker`)
+ROADMAP_JOBS_EAGER = os.getenv('ROADMAP_JOBS_EAGER', 'False') == 'True'  # Run inline, no worker needed
+ROADMAP_JOB_MAX_ATTEMPTS = int(os.getenv('ROADMAP_JOB_MAX_ATTEMPTS', 3))
+ROADMAP_JOB_RETRY_DELAY = int(os.getenv('ROADMAP_JOB_RETRY_DELAY', 5))  # Seconds, doubled per attempt
+ROADMAP_JOB_STALE_AFTER = int(os.getenv('ROADMAP_JOB_STALE_AFTER', 600))  # Requeue RUNNING jobs older than this
+ROADMAP_JOB_COALESCE_DELAY = int(os.getenv('ROADMAP_JOB_COALESCE_DELAY', 3))  # Recheck interval for jobs waiting on an identical one
+ROADMAP_CACHE_MAX_AGE = int(os.getenv('ROADMAP_CACHE_MAX_AGE', 60 * 60 * 24 * 30))  # Reuse generated courses this fresh (seconds, 0 = off)
+
+# Single-flight notes/quiz generation (seconds)
+GENERATION_LOCK_TTL = int(os.getenv('GENERATION_LOCK_TTL', 120))  # Lock expiry if the holder dies
+GENERATION_WAIT_TIMEOUT = float(os.getenv('GENERATION_WAIT_TIMEOUT', 25))  # How long waiters block before "pending"
+GENERATION_POLL_INTERVAL = float(os.getenv('GENERATION_POLL_INTERVAL', 0.5))
+
+# Notes/quiz warmup ahead of the learner (run `python manage.py run_warmup_worker`)
+WARMUP_LOOKAHEAD = int(os.getenv('WARMUP_LOOKAHEAD', 3))  # Concepts pre-generated past the current one
+WARMUP_RATE_PER_MINUTE = int(os.getenv('WARMUP_RATE_PER_MINUTE', 10))  # Gemini calls the worker may spend per minute
+WARMUP_MAX_ATTEMPTS = int(os.getenv('WARMUP_MAX_ATTEMPTS', 3))
+WARMUP_RETRY_DELAY = int(os.getenv('WARMUP_RETRY_DELAY', 30))  # Seconds, doubled per attempt
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
@@ -92,10 +122,40 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock when a transaction starts: with the default DEFERRED
+        # mode two requests that read then write (e.g. concurrent concept
+        # completions) deadlock on the lock upgrade and fail with "database is locked"
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
+        # File-backed test DB for the whole suite. SingleFlightGenerationTests and
+        # ConcurrentCompletionTests write from several threads; the default
+        # shared-cache in-memory DB uses table locks without a busy timeout, so
+        # those writers fail with "database table is locked" instead of waiting.
+        # Django creates one test DB per run before any test class starts, so
+        # the setting can't be scoped to those classes. The file is created and
+        # destroyed by the test runner (and git-ignored).
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
 
+# Cache
+# Shared Redis when REDIS_URL is set (needs the `redis` package), else per-process memory
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -153,6 +213,10 @@ REST_FRAMEWORK = {
     ),
 }
 
+# List endpoints (cursor pagination, see api/pagination.py)
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 200))  # Cap for ?page_size=
+
 # Simple JWT settings
 from datetime import timedelta
 
@@ -176,3 +240,34 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_WHATSAPP_NUMBER = os.getenv('TWILIO_WHATSAPP_NUMBER')
+TWILIO_TIMEOUT = float(os.getenv('TWILIO_TIMEOUT', 10))  # Seconds per API call
+
+# Notification outbox (run `python manage.py dispatch_notifications`)
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', 100))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', 5))
+NOTIFICATION_RETRY_DELAY = int(os.getenv('NOTIFICATION_RETRY_DELAY', 30))  # Seconds, doubled per attempt
+NOTIFICATION_RETRY_MAX_DELAY = int(os.getenv('NOTIFICATION_RETRY_MAX_DELAY', 3600))
+NOTIFICATION_STALE_AFTER = int(os.getenv('NOTIFICATION_STALE_AFTER', 300))  # Requeue SENDING rows older than this
+NOTIFICATION_WHATSAPP_WORKERS = int(os.getenv('NOTIFICATION_WHATSAPP_WORKERS', 8))  # Concurrent Twilio calls per batch
+
+# Daily reminder campaign (run `python manage.py send_daily_reminders` once a day)
+REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', 1000))  # Users per resumable batch
+REMINDER_SMTP_BATCH = int(os.getenv('REMINDER_SMTP_BATCH', 100))  # Emails per SMTP connection
+REMINDER_EMAIL_WORKERS = int(os.getenv('REMINDER_EMAIL_WORKERS', 4))  # Parallel SMTP connections
+REMINDER_EMAIL_RATE_PER_MINUTE = int(os.getenv('REMINDER_EMAIL_RATE_PER_MINUTE', 12000))  # 0 = unlimited
+REMINDER_WHATSAPP_RATE_PER_MINUTE = int(os.getenv('REMINDER_WHATSAPP_RATE_PER_MINUTE', 3000))  # 0 = unlimited
+REMINDER_CAMPAIGN_STALE_AFTER = int(os.getenv('REMINDER_CAMPAIGN_STALE_AFTER', 600))  # Another run may take over a campaign lease older than this (keep above one batch's send time)
+
+# Bulk certificate issuing (`python manage.py generate_certificates`)
+CERTIFICATE_BATCH_WORKERS = int(os.getenv('CERTIFICATE_BATCH_WORKERS', 0))  # Render processes, 0 = CPU count
+
+# Public certificate verification (QR scans)
+CERTIFICATE_VERIFY_CACHE_TTL = int(os.getenv('CERTIFICATE_VERIFY_CACHE_TTL', 60 * 60 * 24 * 7))  # Dropped when a roadmap is deleted or falls below 100%
+CERTIFICATE_VERIFY_NEGATIVE_TTL = int(os.getenv('CERTIFICATE_VERIFY_NEGATIVE_TTL', 300))  # Unknown/invalid IDs
+CERTIFICATE_VERIFY_LOCAL_TTL = int(os.getenv('CERTIFICATE_VERIFY_LOCAL_TTL', 60))  # Cap for per-process caches (no REDIS_URL): revokes only reach the worker that made them
+
+# Study Room stats
+STUDY_STATS_SUMMARY = os.getenv('STUDY_STATS_SUMMARY', 'True') == 'True'  # Serve totals from StudySessionSummary rows
+
+# Course tree cache (keyed by Course.content_version, so edits never serve stale trees)
+COURSE_TREE_CACHE_TTL = int(os.getenv('COURSE_TREE_CACHE_TTL', 60 * 60 * 24))
@@ -0,0 +1,97 @@
+"""
+Benchmark: certificates/sec with the original per-call renderer (full-size PNGs
+from disk, PNG-encoded QR, ASCII85 streams) vs generate_certificate_pdf
+(assets decoded once, zlib-only streams, vector QR).
+
+Run: python bench_certificates.py [--count 50]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+import qrcode
+from reportlab import rl_config
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+from api.utils import certificate
+from api.utils.certificate import (
+    ASSETS, PAGE_WIDTH, PAGE_HEIGHT, STATIC_IMAGES_DIR,
+    draw_static_layer, format_completion_date, generate_certificate_pdf, verification_url,
+)
+
+
+def render_legacy(user_name, course_title, completion_date, cert_id):
+    """The pre-cache path: images re-read from disk and the QR round-tripped through PNG on every call."""
+    use_a85 = rl_config.useA85
+    rl_config.useA85 = 1
+    try:
+        buffer = io.BytesIO()
+        p = canvas.Canvas(buffer, pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
+        draw_static_layer(p, {
+            name: os.path.join(STATIC_IMAGES_DIR, filename)
+            for name, (filename, *_) in ASSETS.items()
+            if os.path.exists(os.path.join(STATIC_IMAGES_DIR, filename))
+        })
+        p.setFont("Helvetica-Bold", 32)
+        p.drawCentredString(PAGE_WIDTH / 2, PAGE_HEIGHT - 210, user_name)
+        p.setFont("Helvetica-Bold", 24)
+        p.drawCentredString(PAGE_WIDTH / 2, PAGE_HEIGHT - 305, f'"{course_title}"')
+        p.setFont("Helvetica", 14)
+        p.drawCentredString(PAGE_WIDTH / 2, PAGE_HEIGHT - 350, f"Completed on {format_completion_date(completion_date)}")
+        p.setFont("Helvetica", 10)
+        p.drawCentredString(PAGE_WIDTH / 2, 80, f"Certificate ID: {cert_id}")
+
+        qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_H, box_size=10, border=1)
+        qr.add_data(verification_url(cert_id))
+        qr.make(fit=True)
+        qr_buffer = io.BytesIO()
+        qr.make_image(fill_color="black", back_color="white").save(qr_buffer, format="PNG")
+        qr_buffer.seek(0)
+        p.drawImage(ImageReader(qr_buffer), 50, 50, width=80, height=80, preserveAspectRatio=True, mask='auto')
+
+        p.showPage()
+        p.save()
+        return buffer.getvalue()
+    finally:
+        rl_config.useA85 = use_a85
+
+
+def throughput(render, count):
+    sizes = []
+    started = time.perf_counter()
+    for i in range(count):
+        sizes.append(len(render(f"Learner {i}", "Full-Stack Web Development", "January 01, 2026", f"BENCH{i:07d}")))
+    elapsed = time.perf_counter() - started
+    return count / elapsed, elapsed * 1000 / count, sum(sizes) // len(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=50)
+    args = parser.parse_args()
+
+    # First call pays the one-time asset decode; report it separately
+    started = time.perf_counter()
+    certificate.get_assets()
+    print(f"asset preload: {(time.perf_counter() - started) * 1000:.1f} ms (once per process)\n")
+
+    print(f"{'renderer':>9} | {'certs/sec':>9} | {'ms/cert':>8} | {'avg KB':>7}")
+    print('-' * 44)
+    results = {}
+    for label, render in (('legacy', render_legacy), ('cached', generate_certificate_pdf)):
+        results[label] = throughput(render, args.count)
+        per_sec, ms, size = results[label]
+        print(f"{label:>9} | {per_sec:>9.1f} | {ms:>8.1f} | {size / 1024:>7.0f}")
+    print(f"\nspeedup: {results['cached'][0] / results['legacy'][0]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
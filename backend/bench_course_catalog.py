@@ -0,0 +1,85 @@
+"""
+Benchmark: the full course list (every chapter, concept and markdown note)
+vs the catalog endpoint (course headers with annotated counts), plus the
+lazy per-course outline, through the full Django stack against a throwaway
+test database.
+
+Run: python bench_course_catalog.py [--courses 50] [--chapters 8] [--concepts 10] [--notes-kb 6] [--rounds 20]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from api.models import Course, Chapter, Concept
+
+
+def seed(courses, chapters, concepts, notes_kb):
+    notes = '# Notes\n\n' + 'Lorem ipsum dolor sit amet. ' * (notes_kb * 1024 // 28)
+    for c in range(courses):
+        course = Course.objects.create(title=f'Course {c}', description='Benchmark course ' * 5, tags=['bench'])
+        chapter_rows = Chapter.objects.bulk_create([
+            Chapter(course=course, title=f'Chapter {i}', order=i) for i in range(chapters)
+        ])
+        Concept.objects.bulk_create([
+            Concept(chapter=chapter, title=f'Concept {j}', order=j, duration=15, notes=notes,
+                    video_url='https://www.youtube.com/embed/bench')
+            for chapter in chapter_rows for j in range(concepts)
+        ])
+    return Course.objects.order_by('id').values_list('id', flat=True).first()
+
+
+def measure(client, url, rounds):
+    latencies = []
+    for _ in range(rounds):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+    return len(response.content), statistics.median(latencies), len(ctx.captured_queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--courses', type=int, default=50)
+    parser.add_argument('--chapters', type=int, default=8)
+    parser.add_argument('--concepts', type=int, default=10)
+    parser.add_argument('--notes-kb', type=int, default=6)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        course_id = seed(args.courses, args.chapters, args.concepts, args.notes_kb)
+        client = Client()
+        page = f'?page_size={args.courses}'
+
+        print(f"{'endpoint':>28} | {'bytes':>10} | {'p50 ms':>8} | {'queries':>7}")
+        print('-' * 62)
+        for label, url in [
+            ('full list (all trees)', f'/api/courses/{page}'),
+            ('catalog (headers)', f'/api/courses/catalog/{page}'),
+            ('one course, full', f'/api/courses/{course_id}/'),
+            ('one course, outline', f'/api/courses/{course_id}/outline/'),
+        ]:
+            size, p50, queries = measure(client, url, args.rounds)
+            print(f"{label:>28} | {size:>10,} | {p50:>8.2f} | {queries:>7}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
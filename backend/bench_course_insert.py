@@ -0,0 +1,86 @@
+"""
+Benchmark: per-row objects.create() vs create_course_tree() (bulk_create per level).
+Runs against a throwaway test database, so the dev DB is never touched.
+
+Run: python bench_course_insert.py [--sizes 10 100 1000] [--runs 5]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.db import connection
+from api.models import Course, Chapter, Concept
+from api.utils.course_tree import create_course_tree
+
+CONCEPTS_PER_CHAPTER = 10
+
+
+def make_tree(concept_count):
+    chapters = []
+    for i in range(max(1, concept_count // CONCEPTS_PER_CHAPTER)):
+        size = min(CONCEPTS_PER_CHAPTER, concept_count - i * CONCEPTS_PER_CHAPTER)
+        chapters.append({
+            'title': f"Chapter {i + 1}",
+            'concepts': [
+                {
+                    'title': f"Concept {i + 1}.{j + 1}",
+                    'description': 'Benchmark concept',
+                    'video_url': 'https://www.youtube.com/embed/bench',
+                    'notes': '# Notes\n\n*Notes will be generated when you start this lesson.*',
+                }
+                for j in range(size)
+            ],
+        })
+    return {'title': 'Benchmark Course', 'description': 'Bench'}, chapters
+
+
+def insert_per_row(course_fields, chapters):
+    """The old generate_roadmap_ai path: one INSERT per row, autocommit."""
+    course = Course.objects.create(**course_fields)
+    for i, chap in enumerate(chapters):
+        chapter = Chapter.objects.create(course=course, title=chap['title'], order=i + 1)
+        for j, concept_data in enumerate(chap['concepts']):
+            Concept.objects.create(chapter=chapter, order=j + 1, **concept_data)
+    return course
+
+
+def time_it(fn, concept_count, runs):
+    samples = []
+    for _ in range(runs):
+        course_fields, chapters = make_tree(concept_count)
+        started = time.perf_counter()
+        course = fn(course_fields, chapters)
+        samples.append((time.perf_counter() - started) * 1000)
+        course.delete()
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"{'concepts':>9} | {'per-row ms':>11} | {'bulk ms':>9} | {'speedup':>7}")
+        print('-' * 46)
+        for size in args.sizes:
+            per_row = time_it(insert_per_row, size, args.runs)
+            bulk = time_it(create_course_tree, size, args.runs)
+            print(f"{size:>9} | {per_row:>11.2f} | {bulk:>9.2f} | {per_row / bulk:>6.1f}x")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
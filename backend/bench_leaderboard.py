@@ -0,0 +1,81 @@
+"""
+Benchmark for the leaderboard top-K query (api/utils/leaderboard.py).
+Runs against a throwaway test database, so the dev DB is never touched.
+
+Run: python bench_leaderboard.py [--sizes 1000 10000 100000 1000000] [--runs 20]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.db import connection
+from django.contrib.auth.models import User
+from api.models import LeaderboardScore
+from api.utils.leaderboard import get_top
+
+
+def grow_to(size, batch_size=5000):
+    """Adds users + score rows until the table holds `size` users."""
+    current = User.objects.count()
+    while current < size:
+        chunk = min(batch_size, size - current)
+        users = User.objects.bulk_create([
+            User(username=f"bench_{current + i:08d}", password='!')
+            for i in range(chunk)
+        ])
+        if users[0].pk is None:
+            users = list(User.objects.filter(username__in=[u.username for u in users]))
+        scores = []
+        for user in users:
+            concepts = random.randint(0, 200)
+            roadmaps = random.randint(0, 5)
+            scores.append(LeaderboardScore(
+                user=user,
+                username=user.username,
+                concepts_completed=concepts,
+                roadmaps_count=roadmaps,
+                points=concepts * LeaderboardScore.CONCEPT_POINTS + roadmaps * LeaderboardScore.ROADMAP_POINTS,
+            ))
+        LeaderboardScore.objects.bulk_create(scores, batch_size=batch_size)
+        current += chunk
+
+
+def time_top(runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        get_top(limit=5)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"{'users':>10} | {'median ms':>10} | {'max ms':>10}")
+        print('-' * 36)
+        for size in sorted(args.sizes):
+            grow_to(size)
+            median, worst = time_top(args.runs)
+            print(f"{size:>10} | {median:>10.3f} | {worst:>10.3f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
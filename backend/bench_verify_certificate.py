@@ -0,0 +1,113 @@
+"""
+Load test: public certificate verification (QR scans) through the full Django
+stack (django.test.Client, no network), against a throwaway test database.
+
+Hot IDs are requested from several threads; every DB query is counted, so the
+report shows whether scans of already-verified certificates touch the database.
+
+Run: python bench_verify_certificate.py [--certificates 1000] [--hot 20] [--threads 8] [--requests 5000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+import threading
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+from api.models import Course, Roadmap
+
+
+def seed(count):
+    course = Course.objects.create(title='Load Test Course', description='Bench')
+    users = User.objects.bulk_create([User(username=f'scan{i}', first_name='Learner', last_name=str(i)) for i in range(count)])
+    Roadmap.objects.bulk_create([
+        Roadmap(user=user, course=course, progress=100, completed_at=timezone.now(), certificate_id=f'CERT{i:08d}')
+        for i, user in enumerate(users)
+    ])
+    return [f'CERT{i:08d}' for i in range(count)]
+
+
+def scan(ids, requests, latencies, queries, sequential=False):
+    """One scanner thread: GET random (or consecutive) IDs, recording latency and DB queries."""
+    client = Client()
+    counted = []
+
+    def count(execute, sql, params, many, context):
+        counted.append(sql)
+        return execute(sql, params, many, context)
+
+    try:
+        with connection.execute_wrapper(count):
+            for i in range(requests):
+                cert_id = ids[i % len(ids)] if sequential else random.choice(ids)
+                started = time.perf_counter()
+                response = client.get(f'/api/certificates/verify/{cert_id}/')
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.status_code
+    finally:
+        queries.append(len(counted))
+        connections.close_all()
+
+
+def run_phase(label, ids, threads, requests, sequential=False):
+    latencies, queries = [], []
+    per_thread = max(1, requests // threads)
+    workers = [
+        threading.Thread(target=scan, args=(ids, per_thread, latencies, queries, sequential))
+        for _ in range(threads)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(
+        f"{label:>10} | {len(latencies) / elapsed:>8.0f} | {statistics.median(latencies):>7.2f} | "
+        f"{latencies[int(len(latencies) * 0.99) - 1]:>7.2f} | {sum(queries):>10}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--certificates', type=int, default=1000)
+    parser.add_argument('--hot', type=int, default=20, help='Distinct IDs in the hot set')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        ids = seed(args.certificates)
+        hot = ids[:args.hot]
+        cache.clear()
+
+        print(f"{'phase':>10} | {'req/s':>8} | {'p50 ms':>7} | {'p99 ms':>7} | {'DB queries':>10}")
+        print('-' * 56)
+        # Cold: every request is a distinct, never-seen ID (one joined query each)
+        run_phase('cold', ids[args.hot:], 1, min(args.requests, args.certificates - args.hot), sequential=True)
+        # Hot: scanners hammering a small set of IDs; the first touch of each fills the cache
+        run_phase('hot warmup', hot, 1, args.hot, sequential=True)
+        run_phase('hot', hot, args.threads, args.requests)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -68,4 +68,14 @@ api.interceptors.response.use(
     }
 );
 
+// Cursor-paginated lists come back as { next, previous, results }. Fetches one
+// page; pass `next` back in to load the following one on demand (it is absolute
+// and already carries the query params).
+export const getPage = async (url, params) => {
+    const response = await api.get(url, { params });
+    const data = response.data;
+    if (!Array.isArray(data.results)) return { items: data, next: null }; // Not paginated
+    return { items: data.results, next: data.next };
+};
+
 export default api;
@@ -1,15 +1,28 @@
-import api from './api';
+import api, { getPage } from './api';
 
-export const fetchLabs = async () => {
+// Sidebar listing, newest first: skips the (large) file contents, see fetchLab.
+// Returns { items, next }; pass `next` to load the following page.
+export const fetchLabs = async (next = null) => {
     try {
-        const response = await api.get('/labs/');
-        return response.data;
+        return next
+            ? await getPage(next)
+            : await getPage('/labs/', { fields: 'id,name,language,updated_at' });
     } catch (error) {
         console.error('Error fetching labs:', error);
         throw error;
     }
 };
 
+export const fetchLab = async (id) => {
+    try {
+        const response = await api.get(`/labs/${id}/`);
+        return response.data;
+    } catch (error) {
+        console.error('Error fetching lab:', error);
+        throw error;
+    }
+};
+
 export const createLab = async (name, language, files) => {
     try {
         const response = await api.post('/labs/', { name, language, files });
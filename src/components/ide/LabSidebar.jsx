@@ -19,6 +19,7 @@ import { fetchLabs, createLab, deleteLab } from "@/api/labs";
 
 export function LabSidebar({ currentLabId, onSelectLab, onNewLab, onSaveLab }) {
     const [labs, setLabs] = useState([]);
+    const [nextPage, setNextPage] = useState(null);
     const [isLoading, setIsLoading] = useState(false);
     const [isCreateOpen, setIsCreateOpen] = useState(false);
     const [newLabName, setNewLabName] = useState("");
@@ -26,8 +27,22 @@ export function LabSidebar({ currentLabId, onSelectLab, onNewLab, onSaveLab }) {
     const loadLabs = async () => {
         setIsLoading(true);
         try {
-            const data = await fetchLabs();
-            setLabs(data);
+            const { items, next } = await fetchLabs();
+            setLabs(items);
+            setNextPage(next);
+        } catch (error) {
+            toast.error("Failed to load labs");
+        } finally {
+            setIsLoading(false);
+        }
+    };
+
+    const loadMoreLabs = async () => {
+        setIsLoading(true);
+        try {
+            const { items, next } = await fetchLabs(nextPage);
+            setLabs(prev => [...prev, ...items]);
+            setNextPage(next);
         } catch (error) {
             toast.error("Failed to load labs");
         } finally {
@@ -149,6 +164,17 @@ export function LabSidebar({ currentLabId, onSelectLab, onNewLab, onSaveLab }) {
                             No saved labs yet.
                         </div>
                     )}
+                    {nextPage && (
+                        <Button
+                            size="sm"
+                            variant="ghost"
+                            className="w-full rounded-none text-sm"
+                            onClick={loadMoreLabs}
+                            disabled={isLoading}
+                        >
+                            {isLoading ? "Loading..." : "Load more"}
+                        </Button>
+                    )}
                 </div>
             </ScrollArea>
         </div>
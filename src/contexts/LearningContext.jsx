@@ -4,6 +4,17 @@ import { useAuth } from './AuthContext';
 const LearningContext = createContext(undefined);
 const API_URL = 'http://localhost:8001/api';
 
+// Paginated lists come back as { next, previous, results }: fetches one page
+// as { items, next } (null if the request fails). `next` loads the following
+// page on demand.
+const fetchPage = async (fetcher, url) => {
+    const res = await fetcher(url);
+    if (!res.ok) return null;
+    const data = await res.json();
+    if (!Array.isArray(data.results)) return { items: data, next: null }; // Not paginated
+    return { items: data.results, next: data.next };
+};
+
 export function LearningProvider({ children }) {
     const { user, authFetch } = useAuth();
     const [courses, setCourses] = useState([]);
@@ -11,6 +22,8 @@ export function LearningProvider({ children }) {
     const [currentRoadmap, setCurrentRoadmap] = useState(null);
     const [userProgress, setUserProgress] = useState(null);
     const [notifications, setNotifications] = useState([]);
+    const [coursesNext, setCoursesNext] = useState(null);
+    const [notificationsNext, setNotificationsNext] = useState(null);
     const [tasks, setTasks] = useState([]);
     const [loading, setLoading] = useState(true);
 
@@ -27,20 +40,23 @@ export function LearningProvider({ children }) {
         try {
             setLoading(true);
             const [
-                coursesRes,
+                coursesPage,
                 roadmapsRes,
                 progressRes,
-                notifRes,
+                notifPage,
                 tasksRes
             ] = await Promise.all([
-                fetch(`${API_URL}/courses/`), // Public
+                fetchPage(fetch, `${API_URL}/courses/catalog/`), // Public: headers only, trees load per course
                 authFetch(`${API_URL}/roadmaps/`),
                 authFetch(`${API_URL}/progress/`),
-                authFetch(`${API_URL}/notifications/`),
+                fetchPage(authFetch, `${API_URL}/notifications/`),
                 authFetch(`${API_URL}/tasks/`)
             ]);
 
-            if (coursesRes.ok) setCourses(await coursesRes.json());
+            if (coursesPage) {
+                setCourses(coursesPage.items);
+                setCoursesNext(coursesPage.next);
+            }
 
             if (roadmapsRes.ok) {
                 const roadmapsData = await roadmapsRes.json();
@@ -52,7 +68,10 @@ export function LearningProvider({ children }) {
             }
 
             if (progressRes.ok) setUserProgress(await progressRes.json());
-            if (notifRes.ok) setNotifications(await notifRes.json());
+            if (notifPage) {
+                setNotifications(notifPage.items);
+                setNotificationsNext(notifPage.next);
+            }
             if (tasksRes.ok) setTasks(await tasksRes.json());
 
         } catch (error) {
@@ -77,7 +96,20 @@ export function LearningProvider({ children }) {
                 throw new Error(error.error || 'Failed to generate roadmap');
             }
 
-            const newRoadmap = await response.json();
+            // Generation runs in a background job; poll until it finishes
+            let job = await response.json();
+            while (job.status === 'PENDING' || job.status === 'RUNNING') {
+                await new Promise(resolve => setTimeout(resolve, 2000));
+                const jobRes = await authFetch(`${API_URL}/roadmaps/jobs/${job.id}/`);
+                if (!jobRes.ok) throw new Error('Failed to check roadmap generation status');
+                job = await jobRes.json();
+            }
+
+            if (job.status !== 'SUCCEEDED' || !job.roadmap) {
+                throw new Error(job.error || 'Failed to generate roadmap');
+            }
+
+            const newRoadmap = job.roadmap;
             setRoadmaps(prev => [newRoadmap, ...prev]);
             setCurrentRoadmap(newRoadmap);
             return newRoadmap;
@@ -143,6 +175,24 @@ export function LearningProvider({ children }) {
         }
     };
 
+    const loadMoreCourses = async () => {
+        if (!coursesNext) return;
+        const page = await fetchPage(fetch, coursesNext);
+        if (page) {
+            setCourses(prev => [...prev, ...page.items]);
+            setCoursesNext(page.next);
+        }
+    };
+
+    const loadMoreNotifications = async () => {
+        if (!notificationsNext) return;
+        const page = await fetchPage(authFetch, notificationsNext);
+        if (page) {
+            setNotifications(prev => [...prev, ...page.items]);
+            setNotificationsNext(page.next);
+        }
+    };
+
     const markNotificationRead = async (id) => {
         try {
             const response = await authFetch(`${API_URL}/notifications/${id}/read/`, {
@@ -194,10 +244,14 @@ export function LearningProvider({ children }) {
     return (
         <LearningContext.Provider value={{
             courses,
+            hasMoreCourses: Boolean(coursesNext),
+            loadMoreCourses,
             roadmaps,
             currentRoadmap,
             userProgress,
             notifications,
+            hasMoreNotifications: Boolean(notificationsNext),
+            loadMoreNotifications,
             unreadNotifications,
             tasks,
             todaysTasks,
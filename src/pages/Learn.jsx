@@ -35,6 +35,24 @@ const convertToEmbedUrl = (url) => {
   return url; // Return as-is for other URLs
 };
 
+// 202 = another learner is generating this right now: ask again with backoff,
+// giving up after ~40s so a stuck generation lock can't keep us polling forever
+const PENDING_MAX_ATTEMPTS = 7;
+const PENDING_MAX_DELAY_MS = 8000;
+
+const postUntilReady = async (authFetch, url) => {
+  let delay = 1000;
+  for (let attempt = 1; ; attempt++) {
+    const response = await authFetch(url, { method: 'POST' });
+    if (response.status !== 202) return response;
+    if (attempt >= PENDING_MAX_ATTEMPTS) {
+      throw new Error('Still generating. Please try again in a minute.');
+    }
+    await new Promise(resolve => setTimeout(resolve, delay));
+    delay = Math.min(delay * 2, PENDING_MAX_DELAY_MS);
+  }
+};
+
 export default function Learn() {
   const { currentRoadmap, markConceptComplete, selectConcept } = useLearning();
   const { authFetch } = useAuth();
@@ -55,9 +73,7 @@ export default function Learn() {
     if (notes || notesLoading) return; // Already loaded or loading
     setNotesLoading(true);
     try {
-      const response = await authFetch(`${API_URL}/concepts/${conceptId}/generate-notes/`, {
-        method: 'POST',
-      });
+      const response = await postUntilReady(authFetch, `${API_URL}/concepts/${conceptId}/generate-notes/`);
       if (response.ok) {
         const data = await response.json();
         setNotes(data.notes);
@@ -80,9 +96,7 @@ export default function Learn() {
     if (quiz || quizLoading) return; // Already loaded or loading
     setQuizLoading(true);
     try {
-      const response = await authFetch(`${API_URL}/concepts/${conceptId}/generate-quiz/`, {
-        method: 'POST',
-      });
+      const response = await postUntilReady(authFetch, `${API_URL}/concepts/${conceptId}/generate-quiz/`);
       if (response.ok) {
         const data = await response.json();
         setQuiz(data.quiz);
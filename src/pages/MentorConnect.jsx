@@ -118,10 +118,20 @@ const INTERVIEW_TOPICS = [
 
 
 
-import api from '../api/api';
+import api, { getPage } from '../api/api';
 
 // ... (imports remain)
 
+// Map backend booking data to the session cards
+const mapMySession = (b) => ({
+    id: b.id,
+    mentor_name: b.mentorName || "Unknown Mentor",
+    topic: b.topic,
+    created_at: b.created_at,
+    status: b.status,
+    meeting_link: b.meetingLink
+});
+
 export default function MentorConnect() {
     const navigate = useNavigate();
     const [activeTab, setActiveTab] = useState('find-mentors');
@@ -158,6 +168,7 @@ export default function MentorConnect() {
 
     // My Sessions State
     const [mySessions, setMySessions] = useState([]);
+    const [mySessionsNext, setMySessionsNext] = useState(null);
 
     // Booking Modal State
     const [isBookingOpen, setIsBookingOpen] = useState(false);
@@ -206,17 +217,10 @@ export default function MentorConnect() {
     useEffect(() => {
         const fetchMySessions = async () => {
             try {
-                const res = await api.get('/bookings/my-sessions/');
-                // Map backend data
-                const mapped = res.data.map(b => ({
-                    id: b.id,
-                    mentor_name: b.mentorName || "Unknown Mentor",
-                    topic: b.topic,
-                    created_at: b.created_at,
-                    status: b.status,
-                    meeting_link: b.meetingLink
-                }));
-                setMySessions(mapped);
+                // First page of the cursor-paginated list; "Load more" fetches the rest
+                const { items, next } = await getPage('/bookings/my-sessions/');
+                setMySessions(items.map(mapMySession));
+                setMySessionsNext(next);
             } catch (err) {
                 console.error("Failed to fetch my sessions", err);
             }
@@ -227,6 +231,17 @@ export default function MentorConnect() {
         }
     }, [activeTab]);
 
+    const loadMoreMySessions = async () => {
+        try {
+            const { items, next } = await getPage(mySessionsNext);
+            setMySessions(prev => [...prev, ...items.map(mapMySession)]);
+            setMySessionsNext(next);
+        } catch (err) {
+            console.error("Failed to fetch my sessions", err);
+            toast.error("Could not load more sessions.");
+        }
+    };
+
     const handleConnect = (mentor) => {
         setSelectedMentor(mentor);
         setIsBookingOpen(true);
@@ -667,6 +682,15 @@ export default function MentorConnect() {
                                                     </Card>
                                                 ))
                                             )}
+                                            {mySessionsNext && (
+                                                <Button
+                                                    variant="outline"
+                                                    onClick={loadMoreMySessions}
+                                                    className="rounded-none border-2 border-black font-bold uppercase"
+                                                >
+                                                    Load more
+                                                </Button>
+                                            )}
                                         </div>
                                     </div>
                                 </div>
@@ -20,7 +20,17 @@ import {
     Search
 } from 'lucide-react';
 import { toast } from 'sonner';
-import api from '../api/api';
+import api, { getPage } from '../api/api';
+
+// Map backend booking data to the session rows
+const mapSession = (b) => ({
+    id: b.id,
+    student: b.learnerName || "Unknown Student",
+    topic: b.topic,
+    time: new Date(b.created_at).toLocaleString(),
+    status: b.status.toLowerCase(),
+    amount: `₹${b.amountPaid}`
+});
 
 export default function MentorDashboard() {
     const [activeTab, setActiveTab] = useState('overview');
@@ -35,6 +45,7 @@ export default function MentorDashboard() {
 
     // Real Sessions State
     const [sessions, setSessions] = useState([]);
+    const [sessionsNext, setSessionsNext] = useState(null);
     const [loading, setLoading] = useState(true);
 
     // Real Availability State
@@ -71,16 +82,10 @@ export default function MentorDashboard() {
     useEffect(() => {
         const fetchSessions = async () => {
             try {
-                const res = await api.get('/bookings/mentor-sessions/');
-                const mapped = res.data.map(b => ({
-                    id: b.id,
-                    student: b.learnerName || "Unknown Student",
-                    topic: b.topic,
-                    time: new Date(b.created_at).toLocaleString(),
-                    status: b.status.toLowerCase(),
-                    amount: `₹${b.amountPaid}`
-                }));
-                setSessions(mapped);
+                // First page of the cursor-paginated list; "Load more" fetches the rest
+                const { items, next } = await getPage('/bookings/mentor-sessions/');
+                setSessions(items.map(mapSession));
+                setSessionsNext(next);
             } catch (err) {
                 console.error("Failed to fetch sessions", err);
                 toast.error("Could not load sessions.");
@@ -94,6 +99,17 @@ export default function MentorDashboard() {
         }
     }, [activeTab]);
 
+    const loadMoreSessions = async () => {
+        try {
+            const { items, next } = await getPage(sessionsNext);
+            setSessions(prev => [...prev, ...items.map(mapSession)]);
+            setSessionsNext(next);
+        } catch (err) {
+            console.error("Failed to fetch sessions", err);
+            toast.error("Could not load more sessions.");
+        }
+    };
+
     // Fetch Availability
     useEffect(() => {
         const fetchAvailability = async () => {
@@ -444,6 +460,17 @@ export default function MentorDashboard() {
                                             ))}
                                         </tbody>
                                     </table>
+                                    {sessionsNext && (
+                                        <div className="p-4 text-center">
+                                            <Button
+                                                variant="outline"
+                                                onClick={loadMoreSessions}
+                                                className="rounded-none border-2 border-black font-bold uppercase"
+                                            >
+                                                Load more
+                                            </Button>
+                                        </div>
+                                    )}
                                 </div>
                             </CardContent>
                         </Card>
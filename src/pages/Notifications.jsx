@@ -1,4 +1,5 @@
 import { DashboardLayout } from '@/components/layout/DashboardLayout';
+import { Button } from '@/components/ui/button';
 import { Card, CardContent } from '@/components/ui/card';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { useLearning } from '@/contexts/LearningContext';
@@ -7,7 +8,7 @@ import { motion } from 'framer-motion';
 import { cn } from '@/lib/utils';
 import { formatDistanceToNow } from 'date-fns';
 export default function Notifications() {
-    const { notifications, markNotificationRead } = useLearning();
+    const { notifications, hasMoreNotifications, loadMoreNotifications, markNotificationRead } = useLearning();
     const icons = { reminder: Bell, achievement: Trophy, missed: AlertCircle, system: Info };
     const colors = { reminder: 'text-primary', achievement: 'text-yellow-500', missed: 'text-destructive', system: 'text-muted-foreground' };
     const filterByType = (type) => type ? notifications.filter(n => n.type === type) : notifications;
@@ -46,6 +47,7 @@ export default function Notifications() {
                   </Card>);
             })}
               {filterByType(tab === 'all' ? undefined : tab).length === 0 && (<p className="text-center text-muted-foreground py-8">No notifications</p>)}
+              {hasMoreNotifications && (<Button variant="outline" className="w-full" onClick={loadMoreNotifications}>Load more</Button>)}
             </TabsContent>))}
         </Tabs>
       </div>
@@ -4,7 +4,7 @@ import { CodeEditor } from "@/components/ide/CodeEditor";
 import { LabSidebar } from "@/components/ide/LabSidebar";
 import { FocusPanel } from "@/components/ide/FocusPanel";
 import { CODE_SNIPPETS } from "@/api/piston";
-import { createLab, updateLab } from "@/api/labs";
+import { createLab, fetchLab, updateLab } from "@/api/labs";
 import { toast } from "sonner";
 
 export default function PracticeLab() {
@@ -15,7 +15,16 @@ export default function PracticeLab() {
         { name: "main.js", language: "javascript", content: CODE_SNIPPETS["javascript"] }
     ]);
 
-    const handleSelectLab = (lab) => {
+    const handleSelectLab = async (lab) => {
+        if (lab && !lab.files) {
+            // The sidebar list doesn't carry file contents; load the full lab
+            try {
+                lab = await fetchLab(lab.id);
+            } catch (error) {
+                toast.error("Failed to load lab");
+                return;
+            }
+        }
         if (!lab) {
             // Reset to default
             setCurrentLabId(null);